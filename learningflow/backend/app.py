@@ -1,30 +1,34 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Blueprint, current_app, request, jsonify, send_from_directory, Response, stream_with_context
 from flask_cors import CORS
 from flask_bcrypt import Bcrypt
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity, verify_jwt_in_request
 import os
-from werkzeug.utils import secure_filename
-import PyPDF2
 import google.generativeai as genai
 from dotenv import load_dotenv
 import json
 import re
-from models import db, User, LearningSession
-from datetime import timedelta
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.enums import TA_LEFT, TA_CENTER
-from io import BytesIO
+import threading
+from models import db, User, LearningSession, LearningSessionData, WrongAnswer
+from jobs import submit_job, get_job, update_job
+from result_cache import ResultCache, make_cache_key
+from text_store import save_text, load_text, delete_text, index_path, load_page_text, save_page_text
+from blob_store import store_stream, unpin, is_pinned, blob_lock, is_blob_filename
+from question_bank import QuestionBank
+from single_flight import SingleFlight
+from gemini_dispatch import Dispatcher, GovernedModel, GeminiUnavailable, INTERACTIVE, BULK
+from pdf_extract import extract_pdf_text
+from map_reduce import split_into_chunks, map_concurrently
+from retrieval import ChunkIndex, build_chat_context
+from datetime import datetime, timedelta
+import base64
+from sqlalchemy import and_, or_, insert
+from report_pdf import REPORT_CACHE_DIR, resolve_report_font, render_report_file, report_cache_path, save_report_cache, delete_report_cache
 
 # .env 파일에서 환경 변수 로드
 load_dotenv()
 
-app = Flask(__name__)
-CORS(app)
+# 모든 라우트는 api 블루프린트에 등록하고, create_app()에서 앱에 연결
+api = Blueprint('api', __name__)
 
 # 데이터베이스 설정
 mysql_user = os.getenv('MYSQL_USER', 'root')
@@ -33,23 +37,54 @@ mysql_host = os.getenv('MYSQL_HOST', 'localhost')
 mysql_port = os.getenv('MYSQL_PORT', '3306')
 mysql_database = os.getenv('MYSQL_DATABASE', 'learningflow')
 
-app.config['SQLALCHEMY_DATABASE_URI'] = f'mysql+pymysql://{mysql_user}:{mysql_password}@{mysql_host}:{mysql_port}/{mysql_database}'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'your-secret-key-change-this')
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
-app.config['JWT_COOKIE_CSRF_PROTECT'] = False  # CSRF 보호 비활성화
+# DATABASE_URL을 지정하면 MySQL 설정 대신 사용 (예: 부하 테스트용 sqlite:///bench.db)
+DATABASE_URL = os.getenv('DATABASE_URL') or f'mysql+pymysql://{mysql_user}:{mysql_password}@{mysql_host}:{mysql_port}/{mysql_database}'
 
-# 확장 기능 초기화
-db.init_app(app)
-bcrypt = Bcrypt(app)
-jwt = JWTManager(app)
+# 커넥션 풀 설정 (워커 프로세스마다 pool_size + max_overflow개까지 연결)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))  # 풀이 가득 찼을 때 연결을 기다리는 시간(초)
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))  # MySQL wait_timeout보다 짧게 유지
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')  # 끊긴 연결 자동 교체
 
-# Gemini API 설정
+def engine_options(database_url):
+    """SQLAlchemy 엔진 옵션 (SQLite는 풀 크기 옵션을 지원하지 않으므로 pre-ping만 적용)"""
+    if database_url.startswith('sqlite'):
+        return {'pool_pre_ping': DB_POOL_PRE_PING}
+    return {
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': DB_POOL_PRE_PING,
+    }
+
+# 확장 기능 (create_app()에서 앱에 연결)
+bcrypt = Bcrypt()
+jwt = JWTManager()
+
+# Gemini 모델/프롬프트 버전 (프롬프트를 바꾸면 PROMPT_VERSION을 올려 캐시 무효화)
+GEMINI_MODEL_NAME = os.getenv('GEMINI_MODEL_NAME', 'gemini-2.0-flash')
+PROMPT_VERSION = 2
+UPLOAD_QUIZ_COUNT = 5  # 업로드할 때 요약과 함께 생성하는 퀴즈 수
+
+# 모든 엔드포인트가 공유하는 생성 설정 (환경 변수로 지정한 값만 적용)
+GENERATION_CONFIG = {}
+if os.getenv('GEMINI_TEMPERATURE'):
+    GENERATION_CONFIG['temperature'] = float(os.getenv('GEMINI_TEMPERATURE'))
+if os.getenv('GEMINI_MAX_OUTPUT_TOKENS'):
+    GENERATION_CONFIG['max_output_tokens'] = int(os.getenv('GEMINI_MAX_OUTPUT_TOKENS'))
+
+# Gemini API 설정 (시작 시 한 번만)
+GEMINI_ENABLED = False
 api_key = os.getenv("GEMINI_API_KEY")
+# gevent 워커에서는 'rest'를 사용해야 Gemini 호출 중에도 다른 요청을 처리할 수 있음 (gunicorn.conf.py 참고)
+GEMINI_TRANSPORT = os.getenv('GEMINI_TRANSPORT') or None
 if api_key and api_key != "YOUR_API_KEY_HERE":
     try:
-        genai.configure(api_key=api_key)
-        print("✅ Gemini API 키가 설정되었습니다.")
+        genai.configure(api_key=api_key, transport=GEMINI_TRANSPORT)
+        GEMINI_ENABLED = True
+        print(f"✅ Gemini API 키가 설정되었습니다. (모델: {GEMINI_MODEL_NAME})")
     except Exception as e:
         print(f"⚠️  API 키 설정 중 오류 발생: {e}")
         print("📝 모의 데이터 모드로 실행됩니다.")
@@ -57,32 +92,104 @@ else:
     print("⚠️  Gemini API 키가 설정되지 않았습니다.")
     print("📝 모의 데이터 모드로 실행됩니다.")
 
+_models = {}
+_models_lock = threading.Lock()
+
+# 모든 Gemini 호출이 거치는 공용 디스패처 (동시 호출 수, 모델별 호출 속도, 우선순위, 429/5xx 재시도, 서킷 브레이커)
+gemini_dispatcher = Dispatcher()
+
+# 용도별 Gemini 호출 1회의 시간 예산(초). 대기열 대기와 재시도를 포함하며 GEMINI_DEADLINE_<용도>로 변경
+LLM_DEADLINES = {
+    name: float(os.getenv(f'GEMINI_DEADLINE_{name.upper()}', default))
+    for name, default in {
+        'explain': '15',
+        'chat': '45',
+        'feedback': '30',
+        'quiz': '60',
+        'summary': '180',
+        'translate': '180',
+        'bank': '120',
+    }.items()
+}
+GEMINI_HEDGE_DELAY = float(os.getenv('GEMINI_HEDGE_DELAY', '3'))  # /explain 응답이 이 시간(초)보다 늦으면 같은 요청을 한 번 더 보냄
+# 브레이커가 열렸을 때 /health가 503을 반환할지 (로드 밸런서가 이 워커를 잠시 빼도록)
+HEALTH_FAIL_WHEN_DEGRADED = os.getenv('HEALTH_FAIL_WHEN_DEGRADED', '').lower() in ('1', 'true', 'yes')
+
+def load_model(model_name=None):
+    """모델 이름별로 GenerativeModel을 한 번만 만들어 재사용 (연결 재사용)"""
+    model_name = model_name or GEMINI_MODEL_NAME
+    with _models_lock:
+        model = _models.get(model_name)
+        if model is None:
+            model = genai.GenerativeModel(model_name, generation_config=GENERATION_CONFIG or None)
+            _models[model_name] = model
+        return model
+
+def get_model(model_name=None, priority=INTERACTIVE, purpose=None, hedge_after=None):
+    """디스패처를 거쳐 호출하는 모델 반환
+
+    사용자가 응답을 기다리는 호출은 INTERACTIVE(기본값), 백그라운드 작업은 BULK로 요청한다.
+    purpose(LLM_DEADLINES의 키)를 지정하면 호출마다 해당 시간 예산을 적용하고,
+    hedge_after(초)를 지정하면 그 시간 안에 응답이 없을 때 헤지 요청을 보낸다.
+    """
+    model_name = model_name or GEMINI_MODEL_NAME
+    return GovernedModel(load_model(model_name), gemini_dispatcher, model_name, priority,
+                         budget=LLM_DEADLINES.get(purpose), hedge_after=hedge_after)
+
+QUIZ_EXCLUDE_LIMIT = 40  # 문제 은행 보충 시 프롬프트에 넣을 기존 질문 수
+
+# 긴 문서 분할 요약(map-reduce) 설정
+MAP_REDUCE_THRESHOLD = int(os.getenv('MAP_REDUCE_THRESHOLD', '30000'))  # 이보다 긴 문서는 조각별로 요약
+MAP_CHUNK_CHARS = int(os.getenv('MAP_CHUNK_CHARS', '12000'))  # 조각당 최대 글자 수
+SUMMARY_MAP_WORKERS = int(os.getenv('SUMMARY_MAP_WORKERS', '4'))  # 조각 요약 동시 호출 수
+SUMMARY_CHUNK_RETRIES = int(os.getenv('SUMMARY_CHUNK_RETRIES', '2'))  # 실패한 조각 요약 재시도 횟수
+
+# 일괄 채점 설정
+FEEDBACK_BATCH_SIZE = int(os.getenv('FEEDBACK_BATCH_SIZE', '10'))  # 프롬프트 하나에 넣을 서술형 답안 수
+FEEDBACK_BATCH_WORKERS = int(os.getenv('FEEDBACK_BATCH_WORKERS', '3'))  # 배치 프롬프트 동시 호출 수
+
+# 동일 문서/파라미터에 대한 생성 결과 캐시
+result_cache = ResultCache(
+    max_entries=int(os.getenv('GEMINI_CACHE_SIZE', '256')),
+    ttl_seconds=int(os.getenv('GEMINI_CACHE_TTL', '86400')),
+    cache_dir=os.getenv('GEMINI_CACHE_DIR') or None  # 지정하면 재시작 후에도 캐시 유지
+)
+
+# 분할 요약의 조각별 결과 캐시 (조각 텍스트 해시 기반). 수정된 문서는 바뀐 조각만 다시 요약
+chunk_summary_cache = ResultCache(
+    max_entries=int(os.getenv('GEMINI_CHUNK_CACHE_SIZE', '2048')),
+    ttl_seconds=int(os.getenv('GEMINI_CACHE_TTL', '86400')),
+    cache_dir=os.path.join(os.getenv('GEMINI_CACHE_DIR'), 'chunks') if os.getenv('GEMINI_CACHE_DIR') else None
+)
+
+# 문서별 문제 은행 (업로드 후 미리 생성한 문제에서 퀴즈를 뽑아 바로 응답)
+question_bank = QuestionBank(version=f'{GEMINI_MODEL_NAME}-{PROMPT_VERSION}')
+
+# 진행 중인 동일 생성/번역 요청 합치기 (캐시 키 기준, 같은 문서가 동시에 여러 번 업로드된 경우)
+gemini_flight = SingleFlight('gemini')
+
 # 설정
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'txt', 'pdf'}
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
-
 # uploads 디렉토리 생성
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# /uploads 파일 전송 설정
+UPLOADS_MAX_AGE = int(os.getenv('UPLOADS_MAX_AGE', str(365 * 24 * 3600)))  # 해시 이름 파일의 브라우저 캐시 시간(초)
+# 빈 값: Flask가 직접 전송, x-sendfile: Apache/lighttpd X-Sendfile, x-accel: nginx X-Accel-Redirect
+UPLOADS_SENDFILE = os.getenv('UPLOADS_SENDFILE', '').lower()
+UPLOADS_ACCEL_PREFIX = os.getenv('UPLOADS_ACCEL_PREFIX', '/protected-uploads/')  # nginx internal location
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 def extract_text_from_pdf(file_path):
-    """PDF에서 텍스트 추출"""
+    """PDF에서 텍스트 추출 (큰 문서는 페이지 범위를 나눠 병렬 추출, 이전에 추출한 페이지는 재사용)"""
     try:
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        return text
+        return extract_pdf_text(file_path, load_page=load_page_text, save_page=save_page_text)
     except Exception as e:
         raise Exception(f"PDF 읽기 오류: {str(e)}")
 
@@ -101,7 +208,7 @@ def extract_text_from_txt(file_path):
 def translate_to_korean(text):
     """영어 텍스트를 한국어로 번역 (Gemini API 사용)"""
     try:
-        model = genai.GenerativeModel('gemini-2.0-flash')
+        model = get_model(priority=BULK, purpose='translate')  # 업로드 처리 중 호출 (일괄)
         
         prompt = f"""다음 영어 텍스트를 자연스러운 한국어로 번역해주세요.
 전문적인 내용도 이해하기 쉽게 번역하되, 원문의 의미를 정확히 전달해주세요.
@@ -183,189 +290,615 @@ def generate_mock_summary(text, quiz_count=5):
         "quizData": quiz_data
     }
 
-def generate_gemini_content(text, quiz_count=5, quiz_type='objective'):
-    """Gemini API를 사용하여 요약, 키워드, 퀴즈 생성"""
-    api_key = os.getenv("GEMINI_API_KEY")
+def parse_json_response(response_text):
+    """Gemini 응답에서 JSON 부분만 추출하여 파싱"""
+    json_text = re.search(r'```json\n({.*?})\n```', response_text, re.DOTALL)
+    if json_text:
+        clean_response = json_text.group(1)
+    else:
+        clean_response = response_text
+    return json.loads(clean_response)
+
+def summarize_chunk(model, chunk, index, total):
+    """map 단계: 문서 조각 하나를 섹션별로 요약
+
+    결과는 조각 텍스트로 캐시한다 (조각 위치는 프롬프트 문구에만 쓰이므로 키에 넣지 않음).
+    """
+    cache_key = make_cache_key('chunk', chunk, GEMINI_MODEL_NAME, PROMPT_VERSION)
+    cached = chunk_summary_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    prompt = f"""
+    다음은 긴 문서를 나눈 {total}개 부분 중 {index + 1}번째 부분이야.
+    이 부분의 중요한 내용을 빠짐없이 정리해서 아래 JSON 형식으로만 응답해 줘. 다른 설명은 포함하지 마.
+
+    --- 텍스트 시작 ---
+    {chunk}
+    --- 텍스트 끝 ---
+
+    --- JSON 형식 ---
+    {{
+      "sections": [
+        {{
+          "mainTitle": "이 부분에서 다루는 주제",
+          "content": ["주제에 대한 상세한 설명 문장 1", "주제에 대한 상세한 설명 문장 2", "주제에 대한 상세한 설명 문장 3"]
+        }}
+      ],
+      "keywords": ["이 부분의 핵심 키워드"]
+    }}
+
+    모든 내용은 한국어로 작성해야 해.
+    """
+    response = model.generate_content(prompt)
+    partial = parse_json_response(response.text)
+    chunk_summary_cache.set(cache_key, partial)
+    return partial
+
+def render_partial_summaries(partials):
+    """부분 요약들을 reduce 단계 프롬프트에 넣을 텍스트로 변환"""
+    lines = []
+    for index, partial in enumerate(partials, 1):
+        lines.append(f"[부분 {index}]")
+        for section in partial.get('sections', []):
+            lines.append(f"## {section.get('mainTitle', '')}")
+            lines.extend(f"- {sentence}" for sentence in section.get('content', []))
+        if partial.get('keywords'):
+            lines.append(f"키워드: {', '.join(partial['keywords'])}")
+        lines.append("")
+    return "\n".join(lines)
+
+def summarize_in_chunks(model, text):
+    """긴 문서를 섹션/문단 경계로 나눠 병렬 요약하고, 합친 요약문 반환
+
+    합친 요약문도 MAP_REDUCE_THRESHOLD를 넘으면 한 번 더 나눠 요약한다.
+    """
+    source = text
+    for _ in range(3):
+        chunks = split_into_chunks(source, MAP_CHUNK_CHARS)
+        print(f"🧩 분할 요약: {len(chunks)}개 조각, 동시 {SUMMARY_MAP_WORKERS}개 호출")
+        partials = map_concurrently(
+            lambda index, chunk: summarize_chunk(model, chunk, index, len(chunks)),
+            chunks,
+            SUMMARY_MAP_WORKERS
+        )
+        # 실패한 조각은 다시 시도하고, 그래도 빠진 조각이 있으면 일부 내용이 없는 요약을 만들지 않고 실패 처리
+        for _ in range(SUMMARY_CHUNK_RETRIES):
+            failed = [index for index, partial in enumerate(partials) if not partial]
+            if not failed:
+                break
+            print(f"🔁 조각 요약 재시도: {len(failed)}개")
+            for index in failed:
+                try:
+                    partials[index] = summarize_chunk(model, chunks[index], index, len(chunks))
+                except Exception as e:
+                    print(f"⚠️ {index + 1}번째 조각 재시도 실패: {type(e).__name__}: {e}")
+        missing = [index + 1 for index, partial in enumerate(partials) if not partial]
+        if missing:
+            raise Exception(f'문서 {len(chunks)}개 부분 중 {len(missing)}개 부분({", ".join(map(str, missing[:10]))}번) 요약에 실패했습니다.')
+        source = render_partial_summaries(partials)
+        if len(source) <= MAP_REDUCE_THRESHOLD:
+            break
+    return source[:MAP_REDUCE_THRESHOLD]
+
+def summary_settings(text_length):
+    """텍스트 길이별 요약 설정: (섹션 수, 상세도, 프롬프트에 넣을 최대 글자 수)"""
+    if text_length < 2000:
+        return 3, "간단하게", 4000
+    elif text_length < 5000:
+        return 5, "보통 수준으로", 8000
+    elif text_length < 10000:
+        return 7, "상세하게", 15000
+    else:
+        return 10, "매우 상세하고 길게", 30000
+
+def quiz_format(quiz_type):
+    """퀴즈 유형별 (설명, 문제 예시)"""
+    if quiz_type == 'objective':
+        return "4지선다형 객관식 문제", '''{
+            "id": 1,
+            "question": "텍스트 내용을 바탕으로 한 질문",
+            "options": ["선택지1", "선택지2", "선택지3", "선택지4"],
+            "answer": "정답 선택지"
+          }'''
+    elif quiz_type == 'truefalse':
+        return "참/거짓(O/X) 문제. options는 반드시 ['O', 'X']만 사용하고, answer도 'O' 또는 'X'만 사용", '''{
+            "id": 1,
+            "question": "텍스트 내용에 대한 참/거짓 질문",
+            "options": ["O", "X"],
+            "answer": "O"
+          }'''
+    else:  # short
+        return "주관식/서술형 문제. options는 빈 배열 []로 설정하고, answer에는 모범 답안을 작성", '''{
+            "id": 1,
+            "question": "텍스트 내용에 대한 서술형 질문",
+            "options": [],
+            "answer": "모범 답안을 자세하게 작성"
+          }'''
+
+def prepare_source(model, text, max_text):
+    """프롬프트에 넣을 (본문, 안내 문구). 긴 문서는 조각별로 병렬 요약(map)한 내용을 사용"""
+    if len(text) > MAP_REDUCE_THRESHOLD:
+        source_note = "아래 텍스트는 전체 문서를 부분별로 요약한 내용이야. 모든 부분의 내용이 결과에 골고루 반영되어야 해."
+        return summarize_in_chunks(model, text), source_note
+    return text[:max_text], ""
+
+def render_summary_grounding(summary):
+    """저장된 요약(fullSummary/structuredSummary/keywords)을 퀴즈 프롬프트의 근거 텍스트로 변환"""
+    lines = []
+    for section in summary.get('fullSummary') or []:
+        lines.append(f"## {section.get('mainTitle', '')}")
+        lines.extend(f"- {sentence}" for sentence in section.get('content', []))
+    for concept in summary.get('structuredSummary') or []:
+        lines.append(f"* {concept.get('title', '')}: {concept.get('content', '')}")
+    if summary.get('keywords'):
+        lines.append(f"키워드: {', '.join(summary['keywords'])}")
+    return "\n".join(lines)
+
+def summary_prompt_part(summary_sections, detail_level):
+    """요약/키워드/예상 질문 부분: (JSON 필드, 지침 목록)"""
+    fields = f'''"fullSummary": [
+        {{
+          "mainTitle": "1. 첫 번째 주제",
+          "content": [
+            "첫 번째 주제에 대한 상세한 설명 문장 1",
+            "첫 번째 주제에 대한 상세한 설명 문장 2",
+            "첫 번째 주제에 대한 상세한 설명 문장 3",
+            "첫 번째 주제에 대한 추가 설명 문장 4",
+            "첫 번째 주제에 대한 추가 설명 문장 5"
+          ]
+        }},
+        {{
+          "mainTitle": "2. 두 번째 주제",
+          "content": [
+            "두 번째 주제에 대한 상세한 설명 문장 1",
+            "두 번째 주제에 대한 상세한 설명 문장 2",
+            "두 번째 주제에 대한 상세한 설명 문장 3"
+          ]
+        }}
+        ... (문서 내용에 따라 {summary_sections}개 이상의 섹션으로 나눠서 작성)
+      ],
+      "structuredSummary": [
+        {{
+          "title": "핵심 개념 1",
+          "content": "개념에 대한 상세한 설명"
+        }},
+        {{
+          "title": "핵심 개념 2",
+          "content": "개념에 대한 상세한 설명"
+        }},
+        {{
+          "title": "핵심 개념 3",
+          "content": "개념에 대한 상세한 설명"
+        }}
+      ],
+      "keywords": ["핵심 키워드를 5~10개 추출하여 배열로 만들어 줘"],
+      "expectedQuestions": [
+        {{
+          "question": "이 내용과 관련해서 자주 나올 수 있는 질문 1",
+          "answer": "질문에 대한 상세한 답변"
+        }},
+        {{
+          "question": "이 내용과 관련해서 자주 나올 수 있는 질문 2",
+          "answer": "질문에 대한 상세한 답변"
+        }},
+        {{
+          "question": "이 내용과 관련해서 자주 나올 수 있는 질문 3",
+          "answer": "질문에 대한 상세한 답변"
+        }}
+      ]'''
+    rules = [
+        f"fullSummary는 반드시 {summary_sections}개 이상의 섹션으로 나누고, 각 섹션은 mainTitle과 content로 구성해야 해.",
+        "content는 각각 3~5개 이상의 상세한 문장으로 구성된 배열이어야 해.",
+        "문서가 길수록 더 많은 섹션과 더 상세한 설명이 필요해. 절대 생략하지 마.",
+        "structuredSummary는 주요 개념을 3~5개로 정리해.",
+        "keywords는 5~10개 정도 추출해.",
+        "expectedQuestions는 3~5개의 예상 질문과 답변을 작성해.",
+    ]
+    return fields, rules
+
+def quiz_prompt_part(quiz_count, quiz_type):
+    """퀴즈 부분: (JSON 필드, 지침 목록)"""
+    quiz_description, quiz_example = quiz_format(quiz_type)
+    fields = f'''"quizData": {{
+        "questions": [
+          {quiz_example}
+          ... (총 {quiz_count}개의 {quiz_description} 문제를 위 형식에 맞춰 생성해야 함)
+        ]
+      }}'''
+    rules = [f"퀴즈는 {quiz_description} 형식으로 정확히 {quiz_count}개를 생성해야 해."]
+    return fields, rules
+
+def compose_prompt(instructions, source_text, parts):
+    """안내 문구 + 본문 + 요청할 JSON 필드들 + 번호 붙인 지침으로 프롬프트 구성"""
+    fields = ",\n      ".join(part[0] for part in parts if part[0])
+    rules = [rule for part in parts for rule in part[1]] + ["모든 내용은 한국어로 작성해야 해."]
+    numbered_rules = "\n    ".join(f"{index}. {rule}" for index, rule in enumerate(rules, 1))
+    return f"""
+    {instructions}
+
+    --- 텍스트 시작 ---
+    {source_text} 
+    --- 텍스트 끝 ---
+
+    --- JSON 형식 ---
+    {{
+      {fields}
+    }}
+    
+    중요 지침: 
+    {numbered_rules}
+    """
+
+def build_content_prompt(model, text, quiz_count=5, quiz_type='objective'):
+    """요약/키워드/퀴즈 생성 프롬프트 구성 (긴 문서는 분할 요약을 먼저 수행)"""
+    # 텍스트 길이에 따라 요약 상세도 조정
+    text_length = len(text)
+    print(f"📏 텍스트 길이: {text_length}자")
+    summary_sections, detail_level, max_text = summary_settings(text_length)
+    print(f"📊 요약 설정: {summary_sections}개 섹션, {detail_level}")
+    
+    source_text, source_note = prepare_source(model, text, max_text)
+    instructions = f"""다음 텍스트를 분석하여 아래의 JSON 형식에 맞춰 내용을 생성해 줘.
+    반드시 유효한 JSON 형식으로만 응답해야 하며, 다른 설명은 포함하지 마.
+    퀴즈 문제는 정확히 {quiz_count}개를 생성해야 해.
     
+    ⚠️ 중요: 이 문서는 {text_length}자 분량의 내용이므로, fullSummary를 {summary_sections}개 이상의 섹션으로 나누고, 
+    각 섹션마다 충분히 {detail_level} 설명해야 해. 절대 간략하게 요약하지 말고, 모든 중요한 내용을 빠짐없이 포함해야 해.
+    각 섹션의 content 배열에는 최소 3~5개 이상의 상세한 문장이 들어가야 해.
+    {source_note}"""
+    return compose_prompt(instructions, source_text, [
+        summary_prompt_part(summary_sections, detail_level),
+        quiz_prompt_part(quiz_count, quiz_type),
+    ])
+
+def exclude_prompt_part(questions):
+    """이미 만든 문제와 겹치지 않게 하는 지침: (JSON 필드 없음, 지침 목록)"""
+    listed = "\n".join(f"       - {question}" for question in questions[-QUIZ_EXCLUDE_LIMIT:])
+    return None, [f"아래 문제들과 같거나 비슷한 문제는 만들지 마.\n{listed}"]
+
+def build_quiz_prompt(model, text, quiz_count=5, quiz_type='objective', grounding=None, exclude=None):
+    """퀴즈만 생성하는 프롬프트 구성. 저장된 요약(grounding)이 있으면 원문 대신 근거로 사용
+
+    exclude에 질문 목록을 주면 그 질문들과 겹치지 않는 새 문제를 요청한다 (문제 은행 보충).
+    """
+    if grounding:
+        source_text = grounding
+        source_note = "아래 텍스트는 학습 문서의 요약이야. 요약에 있는 내용만으로 문제를 만들어야 해."
+    else:
+        _, _, max_text = summary_settings(len(text))
+        source_text, source_note = prepare_source(model, text, max_text)
+    instructions = f"""다음 텍스트를 바탕으로 학습용 퀴즈를 아래의 JSON 형식에 맞춰 생성해 줘.
+    반드시 유효한 JSON 형식으로만 응답해야 하며, 다른 설명은 포함하지 마.
+    퀴즈 문제는 정확히 {quiz_count}개를 생성해야 하고, 문서의 여러 부분을 골고루 다뤄야 해.
+    {source_note}"""
+    parts = [quiz_prompt_part(quiz_count, quiz_type)]
+    if exclude:
+        parts.append(exclude_prompt_part(exclude))
+    return compose_prompt(instructions, source_text, parts)
+
+def generation_cache_key(text, quiz_count, quiz_type, source_key=None):
+    """생성 결과 캐시 키. 문서 키(내용 해시)가 있으면 텍스트 대신 사용"""
+    if source_key:
+        return make_cache_key('doc', source_key, quiz_count, quiz_type, GEMINI_MODEL_NAME, PROMPT_VERSION)
+    return make_cache_key(text, quiz_count, quiz_type, GEMINI_MODEL_NAME, PROMPT_VERSION)
+
+def generate_gemini_content(text, quiz_count=5, quiz_type='objective', source_key=None):
+    """Gemini API를 사용하여 요약, 키워드, 퀴즈 생성
+
+    API 키가 없을 때만 모의 데이터를 반환하고, 호출에 실패하면 예외를 그대로 전달한다.
+    """
     # API 키가 없거나 기본값인 경우 모의 데이터 반환
-    if not api_key or api_key == "YOUR_API_KEY_HERE":
+    if not GEMINI_ENABLED:
         print("⚠️  Gemini API 키가 설정되지 않아 모의 데이터를 반환합니다.")
         return generate_mock_summary(text, quiz_count)
     
-    try:
-        print(f"🔍 Gemini API 호출 시작...")
-        
-        # 텍스트 길이에 따라 요약 상세도 조정
-        text_length = len(text)
-        print(f"📏 텍스트 길이: {text_length}자")
-        
-        # 텍스트 길이별 요약 설정
-        if text_length < 2000:
-            summary_sections = 3
-            detail_level = "간단하게"
-            max_text = 4000
-        elif text_length < 5000:
-            summary_sections = 5
-            detail_level = "보통 수준으로"
-            max_text = 8000
-        elif text_length < 10000:
-            summary_sections = 7
-            detail_level = "상세하게"
-            max_text = 15000
-        else:
-            summary_sections = 10
-            detail_level = "매우 상세하고 길게"
-            max_text = 30000
-        
-        print(f"📊 요약 설정: {summary_sections}개 섹션, {detail_level}")
-        
-        # 사용 가능한 모델 확인
+    cache_key = generation_cache_key(text, quiz_count, quiz_type, source_key)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        print(f"⚡ 캐시된 생성 결과 사용 (키: {cache_key[:12]})")
+        return cached
+    
+    def generate():
         try:
-            available_models = genai.list_models()
-            print(f"사용 가능한 모델들:")
-            for m in available_models:
-                if 'generateContent' in m.supported_generation_methods:
-                    print(f"  - {m.name}")
-        except:
-            pass
-        
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        
-        # 퀴즈 유형별 설명과 예시
-        if quiz_type == 'objective':
-            quiz_description = "4지선다형 객관식 문제"
-            quiz_example = '''{
-                "id": 1,
-                "question": "텍스트 내용을 바탕으로 한 질문",
-                "options": ["선택지1", "선택지2", "선택지3", "선택지4"],
-                "answer": "정답 선택지"
-              }'''
-        elif quiz_type == 'truefalse':
-            quiz_description = "참/거짓(O/X) 문제. options는 반드시 ['O', 'X']만 사용하고, answer도 'O' 또는 'X'만 사용"
-            quiz_example = '''{
-                "id": 1,
-                "question": "텍스트 내용에 대한 참/거짓 질문",
-                "options": ["O", "X"],
-                "answer": "O"
-              }'''
-        else:  # short
-            quiz_description = "주관식/서술형 문제. options는 빈 배열 []로 설정하고, answer에는 모범 답안을 작성"
-            quiz_example = '''{
-                "id": 1,
-                "question": "텍스트 내용에 대한 서술형 질문",
-                "options": [],
-                "answer": "모범 답안을 자세하게 작성"
-              }'''
-        
-        prompt = f"""
-        다음 텍스트를 분석하여 아래의 JSON 형식에 맞춰 내용을 생성해 줘.
-        반드시 유효한 JSON 형식으로만 응답해야 하며, 다른 설명은 포함하지 마.
-        퀴즈 문제는 정확히 {quiz_count}개를 생성해야 해.
-        
-        ⚠️ 중요: 이 문서는 {text_length}자 분량의 내용이므로, fullSummary를 {summary_sections}개 이상의 섹션으로 나누고, 
-        각 섹션마다 충분히 {detail_level} 설명해야 해. 절대 간략하게 요약하지 말고, 모든 중요한 내용을 빠짐없이 포함해야 해.
-        각 섹션의 content 배열에는 최소 3~5개 이상의 상세한 문장이 들어가야 해.
-
-        --- 텍스트 시작 ---
-        {text[:max_text]} 
-        --- 텍스트 끝 ---
-
-        --- JSON 형식 ---
-        {{
-          "fullSummary": [
-            {{
-              "mainTitle": "1. 첫 번째 주제",
-              "content": [
-                "첫 번째 주제에 대한 상세한 설명 문장 1",
-                "첫 번째 주제에 대한 상세한 설명 문장 2",
-                "첫 번째 주제에 대한 상세한 설명 문장 3",
-                "첫 번째 주제에 대한 추가 설명 문장 4",
-                "첫 번째 주제에 대한 추가 설명 문장 5"
-              ]
-            }},
-            {{
-              "mainTitle": "2. 두 번째 주제",
-              "content": [
-                "두 번째 주제에 대한 상세한 설명 문장 1",
-                "두 번째 주제에 대한 상세한 설명 문장 2",
-                "두 번째 주제에 대한 상세한 설명 문장 3"
-              ]
-            }}
-            ... (문서 내용에 따라 {summary_sections}개 이상의 섹션으로 나눠서 작성)
-          ],
-          "structuredSummary": [
-            {{
-              "title": "핵심 개념 1",
-              "content": "개념에 대한 상세한 설명"
-            }},
-            {{
-              "title": "핵심 개념 2",
-              "content": "개념에 대한 상세한 설명"
-            }},
-            {{
-              "title": "핵심 개념 3",
-              "content": "개념에 대한 상세한 설명"
-            }}
-          ],
-          "keywords": ["핵심 키워드를 5~10개 추출하여 배열로 만들어 줘"],
-          "expectedQuestions": [
-            {{
-              "question": "이 내용과 관련해서 자주 나올 수 있는 질문 1",
-              "answer": "질문에 대한 상세한 답변"
-            }},
-            {{
-              "question": "이 내용과 관련해서 자주 나올 수 있는 질문 2",
-              "answer": "질문에 대한 상세한 답변"
-            }},
-            {{
-              "question": "이 내용과 관련해서 자주 나올 수 있는 질문 3",
-              "answer": "질문에 대한 상세한 답변"
-            }}
-          ],
-          "quizData": {{
-            "questions": [
-              {quiz_example}
-              ... (총 {quiz_count}개의 {quiz_description} 문제를 위 형식에 맞춰 생성해야 함)
-            ]
-          }}
-        }}
+            print(f"🔍 Gemini API 호출 시작...")
         
-        중요 지침: 
-        1. fullSummary는 반드시 {summary_sections}개 이상의 섹션으로 나누고, 각 섹션은 mainTitle과 content로 구성해야 해.
-        2. content는 각각 3~5개 이상의 상세한 문장으로 구성된 배열이어야 해.
-        3. 문서가 길수록 더 많은 섹션과 더 상세한 설명이 필요해. 절대 생략하지 마.
-        4. structuredSummary는 주요 개념을 3~5개로 정리해.
-        5. keywords는 5~10개 정도 추출해.
-        6. expectedQuestions는 3~5개의 예상 질문과 답변을 작성해.
-        7. 퀴즈는 {quiz_description} 형식으로 정확히 {quiz_count}개를 생성해야 해.
-        8. 모든 내용은 한국어로 작성해야 해.
-        """
-        
-        print(f"📤 Gemini에게 요청 전송 중...")
-        response = model.generate_content(prompt)
-        print(f"📥 Gemini 응답 받음")
-        print(f"응답 내용: {response.text[:200]}...")
+            model = get_model(priority=BULK, purpose='summary')  # 업로드 처리 중 호출 (일괄)
+            prompt = build_content_prompt(model, text, quiz_count, quiz_type)
         
-        # Gemini 응답에서 JSON 부분만 추출
-        json_text = re.search(r'```json\n({.*?})\n```', response.text, re.DOTALL)
-        if json_text:
-            clean_response = json_text.group(1)
-        else:
-            clean_response = response.text
+            print(f"📤 Gemini에게 요청 전송 중...")
+            response = model.generate_content(prompt)
+            print(f"📥 Gemini 응답 받음")
+            print(f"응답 내용: {response.text[:200]}...")
+        
+            # Gemini 응답에서 JSON 부분만 추출
+            result = parse_json_response(response.text)
+            print(f"✅ JSON 파싱 성공!")
+            result_cache.set(cache_key, result)
+            return result
+        except Exception as e:
+            print(f"⚠️  Gemini API 호출 중 오류 발생: {type(e).__name__}: {str(e)}")
+            if not isinstance(e, GeminiUnavailable):
+                import traceback
+                print(traceback.format_exc())
+            raise
+    
+    # 같은 문서·조건의 생성이 이미 진행 중이면 (SINGLE_FLIGHT_DIR이 있으면 다른 워커 포함) 그 결과를 함께 사용
+    return gemini_flight.do(cache_key, generate, lookup=lambda: result_cache.get(cache_key),
+                            timeout=LLM_DEADLINES['summary'])
+
+def stream_gemini_content(text, quiz_count=5, quiz_type='objective', source_key=None):
+    """generate_gemini_content의 스트리밍 버전
 
-        result = json.loads(clean_response)
-        print(f"✅ JSON 파싱 성공!")
-        return result
+    ('delta', 텍스트 조각)을 생성되는 대로 반환하고, 마지막에 ('result', 결과 dict)를 반환한다.
+    """
+    if not GEMINI_ENABLED:
+        yield 'result', generate_mock_summary(text, quiz_count)
+        return
+    
+    cache_key = generation_cache_key(text, quiz_count, quiz_type, source_key)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        yield 'result', cached
+        return
+    
+    try:
+        model = get_model(purpose='summary')
+        prompt = build_content_prompt(model, text, quiz_count, quiz_type)
+        
+        parts = []
+        for chunk in model.generate_content(prompt, stream=True):
+            if chunk.text:
+                parts.append(chunk.text)
+                yield 'delta', chunk.text
+        
+        result = parse_json_response(''.join(parts))
+        result_cache.set(cache_key, result)
+        yield 'result', result
     except Exception as e:
-        print(f"⚠️  Gemini API 호출 중 오류 발생: {type(e).__name__}: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
-        print("📝 모의 데이터를 반환합니다.")
-        return generate_mock_summary(text, quiz_count)
+        print(f"⚠️  Gemini 스트리밍 중 오류 발생: {type(e).__name__}: {str(e)}")
+        raise
+
+def quiz_cache_key(text, quiz_count, quiz_type, source_key=None, grounding=None):
+    """퀴즈 전용 생성 결과 캐시 키 (전체 생성 결과 키와 구분)"""
+    source = ('doc', source_key) if source_key else ('text', text)
+    return make_cache_key('quiz', *source, grounding or '', quiz_count, quiz_type, GEMINI_MODEL_NAME, PROMPT_VERSION)
+
+def generate_quiz_content(text, quiz_count=5, quiz_type='objective', source_key=None, grounding=None):
+    """퀴즈만 생성하여 {'quizData': ...} 반환
+
+    요약까지 만드는 generate_gemini_content보다 출력이 훨씬 짧다.
+    grounding(저장된 요약 텍스트)이 있으면 원문 대신 근거로 사용한다.
+    """
+    if not GEMINI_ENABLED:
+        print("⚠️  Gemini API 키가 설정되지 않아 모의 데이터를 반환합니다.")
+        return {'quizData': generate_mock_summary(text, quiz_count)['quizData']}
+    
+    # 같은 조건의 전체 생성 결과(업로드 시 생성)가 있으면 그 퀴즈를 그대로 사용
+    full_result = result_cache.get(generation_cache_key(text, quiz_count, quiz_type, source_key))
+    if full_result is not None and full_result.get('quizData'):
+        print(f"⚡ 캐시된 생성 결과의 퀴즈 사용")
+        return {'quizData': full_result['quizData']}
+    
+    cache_key = quiz_cache_key(text, quiz_count, quiz_type, source_key, grounding)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        print(f"⚡ 캐시된 퀴즈 사용 (키: {cache_key[:12]})")
+        return cached
+    
+    def generate():
+        try:
+            model = get_model(purpose='quiz')
+            prompt = build_quiz_prompt(model, text, quiz_count, quiz_type, grounding)
+            print(f"📤 Gemini에게 퀴즈 생성 요청 ({'요약 근거' if grounding else '원문'})")
+            response = model.generate_content(prompt)
+            quiz_data = parse_json_response(response.text).get('quizData')
+            if not quiz_data or not quiz_data.get('questions'):
+                raise ValueError('응답에 quizData가 없습니다.')
+            result = {'quizData': quiz_data}
+            result_cache.set(cache_key, result)
+            return result
+        except Exception as e:
+            print(f"⚠️  Gemini 퀴즈 생성 중 오류 발생: {type(e).__name__}: {str(e)}")
+            raise
+    
+    return gemini_flight.do(cache_key, generate, lookup=lambda: result_cache.get(cache_key),
+                            timeout=LLM_DEADLINES['quiz'])
+
+def fill_question_bank(key, text, grounding=None, count=0):
+    """문서의 문제 은행이 부족하면 백그라운드에서 유형별 문제 생성 (모의 데이터 모드에서는 생성하지 않음)"""
+    if not GEMINI_ENABLED or not key:
+        return False
+
+    def generate(quiz_type, batch_count, existing):
+        model = get_model(priority=BULK, purpose='bank')
+        prompt = build_quiz_prompt(model, text, batch_count, quiz_type, grounding,
+                                   exclude=[question.get('question', '') for question in existing])
+        quiz_data = parse_json_response(model.generate_content(prompt).text).get('quizData') or {}
+        return quiz_data.get('questions', [])
+
+    return question_bank.schedule_fill(str(key), generate, count)
+
+def sse_event(data, event=None):
+    """Server-Sent Events 형식 문자열 생성"""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def sse_response(events):
+    return Response(stream_with_context(events), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # nginx 프록시 버퍼링 방지
+    })
+
+
+def translate_document(content_hash, text):
+    """문서 번역 (같은 내용의 문서는 번역 결과 재사용)"""
+    cache_key = make_cache_key('translate', content_hash, GEMINI_MODEL_NAME, PROMPT_VERSION)
+    cached = result_cache.get(cache_key) if GEMINI_ENABLED else None
+    if cached is not None:
+        print(f"⚡ 캐시된 번역 결과 사용 (키: {cache_key[:12]})")
+        return cached
+    
+    def translate():
+        translated = translate_to_korean(text)
+        if GEMINI_ENABLED and translated != text:
+            result_cache.set(cache_key, translated)
+        return translated
+    
+    # 같은 문서의 번역이 이미 진행 중이면 새로 번역하지 않고 그 결과를 함께 사용
+    return gemini_flight.do(cache_key, translate, lookup=lambda: result_cache.get(cache_key) if GEMINI_ENABLED else None,
+                            timeout=LLM_DEADLINES['translate'])
+
+def release_upload(content_hash, file_path, keep_text=False):
+    """참조하는 세션도, (어느 워커에서든) 처리 중인 업로드도 없으면 저장된 파일(과 추출 텍스트) 삭제
+
+    확인과 삭제는 blob_lock 안에서 하므로 같은 내용을 새로 업로드해 pin하는 워커와 엇갈리지 않는다.
+    """
+    if not content_hash:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        return
+    folder = os.path.dirname(file_path)
+    with blob_lock(folder, content_hash):
+        if is_pinned(folder, content_hash) or LearningSession.query.filter_by(content_hash=content_hash).count():
+            return
+        if os.path.exists(file_path):
+            os.remove(file_path)
+            print(f"🧹 참조가 없는 업로드 파일 삭제: {os.path.basename(file_path)}")
+        if not keep_text:
+            delete_text(content_hash)
+            question_bank.delete(content_hash)
+
+def process_upload(job_id, flask_app, file_path, content_hash, category, session_id):
+    """업로드된 파일의 텍스트 추출 → (영어면) 번역 → 요약/퀴즈 생성 (백그라운드 작업)
+
+    추출 텍스트, 검색 인덱스, 번역, 생성 결과는 모두 파일 내용 해시를 키로 저장해
+    같은 문서가 다시 업로드되면 재사용한다.
+    """
+    filename = os.path.basename(file_path)
+    failed = False
+    with flask_app.app_context():
+        try:
+            update_job(job_id, stage='extracting')
+            text = load_text(content_hash)
+            if text is not None:
+                print(f"⚡ 저장된 추출 텍스트 사용 (해시: {content_hash[:12]})")
+            else:
+                if filename.lower().endswith('.pdf'):
+                    text = extract_text_from_pdf(file_path)
+                else:
+                    text = extract_text_from_txt(file_path)
+
+                if not text.strip():
+                    raise ValueError('파일에서 텍스트를 추출할 수 없습니다.')
+
+                # 추출 텍스트와 채팅 검색 인덱스를 내용 해시로 보관 (로그인 사용자는 세션 ID로 참조)
+                save_text(content_hash, text)
+                ChunkIndex.build(text).save(index_path(content_hash))
 
+            # 영어 카테고리일 경우 번역 추가
+            translated_text = None
+            if category == '영어':
+                update_job(job_id, stage='translating')
+                print("🌐 영어 카테고리 선택됨 - 한국어 번역 시작...")
+                translated_text = translate_document(content_hash, text)
 
-@app.route('/upload', methods=['POST'])
+            # Gemini API를 사용하여 콘텐츠 생성 (기본 5개 퀴즈)
+            # 영어 카테고리인 경우 번역된 텍스트로 요약 생성
+            update_job(job_id, stage='generating')
+            source_key = f'{content_hash}-ko' if translated_text else content_hash
+            result = generate_gemini_content(translated_text if translated_text else text, UPLOAD_QUIZ_COUNT, source_key=source_key)
+
+            # 번역 결과를 result에 추가
+            if translated_text:
+                result['translatedText'] = translated_text
+
+            # PDF 파일인 경우 저장하고 URL 반환
+            pdf_url = None
+            if filename.lower().endswith('.pdf'):
+                # 파일을 uploads 폴더에 유지하고 URL 제공
+                pdf_url = f'/uploads/{filename}'
+
+            # 로그인 사용자의 문서는 퀴즈 재생성에 쓸 문제 은행을 생성된 요약을 근거로 미리 채움
+            if session_id:
+                fill_question_bank(content_hash, translated_text or text, render_summary_grounding(result))
+
+            result['pdfUrl'] = pdf_url
+            if not session_id:
+                result['pdfText'] = text  # 세션이 없는 비로그인 사용자만 원본 텍스트를 받아 채팅에 사용
+            result['sessionId'] = session_id  # 세션 ID 반환
+            return result
+        except Exception:
+            # 처리 실패 시 세션 정리
+            failed = True
+            if session_id:
+                learning_session = LearningSession.query.get(session_id)
+                if learning_session:
+                    db.session.delete(learning_session)
+                    db.session.commit()
+            raise
+        finally:
+            # 파일은 다른 세션이 참조하지 않을 때만 삭제
+            unpin(os.path.dirname(file_path), content_hash)
+            if failed:
+                release_upload(content_hash, file_path)
+            elif not filename.lower().endswith('.pdf'):
+                # TXT 원본은 보관할 필요가 없음 (추출 텍스트는 재업로드 시 재사용하도록 유지)
+                release_upload(content_hash, file_path, keep_text=True)
+
+
+def get_session_document(session_id):
+    """세션에 저장된 (추출 텍스트, 문서 키) 조회 (본인 세션이 아니거나 없으면 (None, None))
+
+    문서 키는 파일 내용 해시이며, 해시가 없는 이전 세션은 세션 ID를 사용한다.
+    """
+    try:
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+    except Exception:
+        return None, None
+    if not user_id:
+        return None, None
+    
+    session = LearningSession.query.filter_by(
+        id=session_id,
+        user_id=int(user_id),
+        is_wrong=False
+    ).first()
+    if not session:
+        return None, None
+    key = session.content_hash or session.id
+    text = load_text(key)
+    return (text, key) if text is not None else (None, None)
+
+def get_session_summary(session_id, source_key):
+    """퀴즈 근거로 쓸 세션 요약 텍스트 (없으면 None)
+
+    저장된 학습 세션의 summary_data를 먼저 보고, 없으면 업로드 때 생성되어 캐시에 남은 결과를 사용한다.
+    세션 소유자 확인은 get_session_document에서 끝난 뒤에 호출한다.
+    """
+    summary = None
+    data = db.session.get(LearningSessionData, session_id)
+    if data is not None and data.summary_data is not None:
+        summary = data.summary_data.value
+        if isinstance(summary, str):  # 문자열로 한 번 더 인코딩해 저장된 이전 데이터
+            try:
+                summary = json.loads(summary)
+            except ValueError:
+                summary = None
+    if not (isinstance(summary, dict) and summary.get('fullSummary')):
+        summary = None
+        for key in (f'{source_key}-ko', source_key):  # 영어 문서는 번역본으로 생성한 결과
+            cached = result_cache.get(generation_cache_key(None, UPLOAD_QUIZ_COUNT, 'objective', key))
+            if cached and cached.get('fullSummary'):
+                summary = cached
+                break
+    return render_summary_grounding(summary) if summary else None
+
+
+@api.route('/upload', methods=['POST'])
 def upload_file():
+    """파일을 저장하고 처리 작업을 등록한 뒤 작업 ID를 바로 반환"""
     print("=" * 50)
     print("🎯 /upload 요청 받음!")
     print("=" * 50)
@@ -393,24 +926,11 @@ def upload_file():
         else:
             display_filename = original_filename
         
-        # 실제 저장할 파일명 (보안을 위해 secure_filename 사용)
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
-        
-        # 파일 크기 확인
-        file_size = os.path.getsize(file_path)
+        # 내용 해시를 파일명으로 저장 (같은 내용은 한 번만 저장하고 세션끼리 공유)
+        # 저장한 파일은 pin된 상태로 반환되어 처리가 끝날 때까지 다른 워커에서도 삭제되지 않음
+        content_hash, file_path, file_size = store_stream(file.stream, current_app.config['UPLOAD_FOLDER'], file_extension)
         file_type = file_extension
         
-        if filename.lower().endswith('.pdf'):
-            text = extract_text_from_pdf(file_path)
-        else:
-            text = extract_text_from_txt(file_path)
-        
-        if not text.strip():
-            os.remove(file_path)
-            return jsonify({'error': '파일에서 텍스트를 추출할 수 없습니다.'}), 400
-        
         # 로그인한 사용자인 경우 파일 정보를 데이터베이스에 저장
         user_id = None
         try:
@@ -433,6 +953,7 @@ def upload_file():
                 custom_filename=display_filename,  # 사용자가 입력한 이름
                 original_filename=file.filename,  # 원본 파일명
                 file_path=file_path,
+                content_hash=content_hash,
                 file_size=file_size,
                 file_type=file_type,
                 category=category,  # 카테고리 저장
@@ -447,54 +968,89 @@ def upload_file():
             session_id = None
             print(f"✅ 파일 저장 완료 - 비로그인 사용자, 표시명: {display_filename}, 카테고리: {category}")
         
-        # 영어 카테고리일 경우 번역 추가
-        translated_text = None
-        if category == '영어':
-            print("🌐 영어 카테고리 선택됨 - 한국어 번역 시작...")
-            translated_text = translate_to_korean(text)
-        
-        # Gemini API를 사용하여 콘텐츠 생성 (기본 5개 퀴즈)
-        # 영어 카테고리인 경우 번역된 텍스트로 요약 생성
-        result = generate_gemini_content(translated_text if translated_text else text, 5)
-        
-        # 번역 결과를 result에 추가
-        if translated_text:
-            result['translatedText'] = translated_text
-        
-        # PDF 파일인 경우 저장하고 URL 반환
-        pdf_url = None
-        if filename.lower().endswith('.pdf'):
-            # 파일을 uploads 폴더에 유지하고 URL 제공
-            pdf_url = f'/uploads/{filename}'
-        else:
-            # TXT 파일은 삭제 (필요시 저장하도록 변경 가능)
-            os.remove(file_path)
-        
-        result['pdfUrl'] = pdf_url
-        result['pdfText'] = text  # 채팅에 사용할 원본 텍스트 추가
-        result['sessionId'] = session_id  # 세션 ID 반환
+        # 추출/번역/생성은 워커 풀에서 처리
+        job_id = submit_job(process_upload, current_app._get_current_object(), file_path, content_hash, category, session_id)
+        print(f"📋 처리 작업 등록 - 작업ID: {job_id}")
         
-        return jsonify(result)
+        return jsonify({
+            'jobId': job_id,
+            'status': 'queued',
+            'sessionId': session_id
+        }), 202
     
     except Exception as e:
-        # 파일 경로가 정의되어 있을 경우에만 삭제 시도
-        if 'file_path' in locals() and os.path.exists(file_path):
-            os.remove(file_path)
+        # 파일이 저장된 경우, 다른 세션이 참조하지 않을 때만 삭제
+        if 'content_hash' in locals():
+            unpin(os.path.dirname(file_path), content_hash)
+            release_upload(content_hash, file_path)
         print(f"❌ 업로드 오류: {str(e)}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': f'파일 처리 중 오류가 발생했습니다: {str(e)}'}), 500
 
-@app.route('/health', methods=['GET'])
+@api.route('/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """업로드 처리 작업의 상태/결과 조회"""
+    job = get_job(job_id)
+    if not job:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    
+    response = {
+        'jobId': job['id'],
+        'status': job['status'],  # queued, running, done, failed
+        'stage': job['stage']
+    }
+    if job['status'] == 'done':
+        response['result'] = job['result']
+    elif job['status'] == 'failed':
+        response['error'] = job['error']
+    return jsonify(response)
+
+@api.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'healthy', 'message': 'API 서버가 정상적으로 실행 중입니다.'})
+    """서버 상태. Gemini 서킷 브레이커가 열려 있으면 status가 degraded"""
+    degraded = gemini_dispatcher.circuit_open()
+    response = jsonify({
+        'status': 'degraded' if degraded else 'healthy',
+        'message': 'AI 서버 응답이 원활하지 않습니다.' if degraded else 'API 서버가 정상적으로 실행 중입니다.',
+        'gemini': gemini_dispatcher.stats(),  # 대기열 길이, 처리 중인 호출 수, 재시도 횟수, 브레이커 상태
+        'single_flight': gemini_flight.stats()  # 진행 중인 동일 요청에 합쳐진 호출 수
+    })
+    if degraded and HEALTH_FAIL_WHEN_DEGRADED:
+        return response, 503
+    return response
 
-@app.route('/uploads/<filename>')
+@api.route('/uploads/<filename>')
 def uploaded_file(filename):
-    """업로드된 PDF 파일 제공"""
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    """업로드된 PDF 파일 제공
+
+    Range 요청(206), ETag/Last-Modified 조건부 요청(304)을 지원해 PDF 뷰어가 필요한 부분만 받아 간다.
+    해시 이름 파일은 내용이 바뀌지 않으므로 immutable로 오래 캐시한다.
+    """
+    folder = os.path.abspath(current_app.config['UPLOAD_FOLDER'])  # 업로드 저장 위치와 같은 기준(작업 디렉토리)
+    immutable = is_blob_filename(filename)
+
+    if UPLOADS_SENDFILE == 'x-accel':
+        # 파일 전송, Range, 조건부 요청은 nginx가 처리
+        if not os.path.isfile(os.path.join(folder, os.path.basename(filename))):
+            return jsonify({'error': '파일을 찾을 수 없습니다.'}), 404
+        response = Response(mimetype='application/pdf' if filename.lower().endswith('.pdf') else 'text/plain')
+        response.headers['X-Accel-Redirect'] = UPLOADS_ACCEL_PREFIX + os.path.basename(filename)
+    else:
+        # x-sendfile이면 USE_X_SENDFILE 설정에 따라 웹 서버가 파일을 보냄
+        response = send_from_directory(folder, filename, conditional=True, etag=True)
 
-@app.route('/feedback', methods=['POST'])
+    if immutable:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = UPLOADS_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True  # 기존 이름 파일은 매번 ETag로 확인
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
+
+@api.route('/feedback', methods=['POST'])
 def feedback():
     """퀴즈 답변에 대한 피드백 제공"""
     try:
@@ -516,11 +1072,8 @@ def feedback():
             # 서술형 문제인 경우 AI로 채점 (답변이 짧은 문자열이 아니고 길이가 20자 이상인 경우)
             if len(user_answer) > 20:
                 try:
-                    api_key = os.getenv("GEMINI_API_KEY")
-                    if api_key and api_key != "YOUR_API_KEY_HERE":
-                        import google.generativeai as genai
-                        genai.configure(api_key=api_key)
-                        model = genai.GenerativeModel('gemini-2.0-flash')
+                    if GEMINI_ENABLED:
+                        model = get_model(purpose='feedback')
                         
                         ai_prompt = f"""
 다음 문제와 정답, 그리고 사용자의 답변을 비교하여 채점해주세요.
@@ -540,8 +1093,6 @@ def feedback():
 """
                         
                         response = model.generate_content(ai_prompt)
-                        import json
-                        import re
                         
                         # JSON 부분만 추출
                         json_match = re.search(r'\{[^}]+\}', response.text, re.DOTALL)
@@ -570,7 +1121,118 @@ def feedback():
     except Exception as e:
         return jsonify({'error': f'피드백 생성 중 오류가 발생했습니다: {str(e)}'}), 500
 
-@app.route('/wrongnotes', methods=['POST'])
+def grade_locally(user_answer, correct_answer):
+    """정확히 일치하는지로 채점. AI 채점이 필요한 서술형 답안이면 None 반환"""
+    if user_answer == correct_answer:
+        return {'is_correct': True, 'feedback': "정답입니다! 잘하셨어요."}
+    if GEMINI_ENABLED and len(user_answer or '') > 20:
+        return None
+    return {'is_correct': False, 'feedback': f"정답은 '{correct_answer}'입니다. 다시 한 번 복습해보세요."}
+
+def grade_with_ai_batch(items):
+    """서술형 답안 여러 개를 프롬프트 하나로 채점하여 items 순서대로 결과 반환"""
+    numbered = "\n\n".join(
+        f"""[{index}]
+문제: {item.get('question')}
+정답: {item.get('correct_answer')}
+사용자 답변: {item.get('user_answer')}"""
+        for index, item in enumerate(items, 1)
+    )
+    ai_prompt = f"""
+다음 문제들 각각에 대해 정답과 사용자의 답변을 비교하여 채점해주세요.
+
+{numbered}
+
+사용자의 답변이 정답의 핵심 내용을 포함하고 있는지 판단해주세요.
+완전히 일치하지 않아도, 의미가 같거나 핵심 내용이 맞다면 정답으로 인정합니다.
+
+응답 형식 (JSON, 모든 번호에 대해 작성):
+{{
+  "results": [
+    {{"id": 1, "is_correct": true 또는 false, "feedback": "채점 결과에 대한 설명"}}
+  ]
+}}
+"""
+    response = get_model(purpose='feedback').generate_content(ai_prompt)
+    graded = {entry.get('id'): entry for entry in parse_json_response(response.text).get('results', [])}
+    
+    results = []
+    for index, item in enumerate(items, 1):
+        entry = graded.get(index)
+        if entry is None:
+            results.append({'is_correct': False, 'feedback': f"정답은 '{item.get('correct_answer')}'입니다. 다시 한 번 복습해보세요."})
+        else:
+            results.append({'is_correct': bool(entry.get('is_correct', False)), 'feedback': entry.get('feedback', '')})
+    return results
+
+@api.route('/feedback/batch', methods=['POST'])
+def feedback_batch():
+    """퀴즈 전체 답안을 한 번에 채점
+
+    객관식/참거짓은 서버에서 바로 채점하고, 서술형 답안만 모아 FEEDBACK_BATCH_SIZE개씩
+    묶어 Gemini에 보낸다. 결과는 요청의 answers 순서와 같다.
+    """
+    try:
+        data = request.get_json() or {}
+        answers = data.get('answers') or []
+        if not isinstance(answers, list) or not all(isinstance(item, dict) for item in answers):
+            return jsonify({'error': '답안 형식이 올바르지 않습니다.'}), 400
+        
+        results = [grade_locally(item.get('user_answer'), item.get('correct_answer')) for item in answers]
+        pending = [index for index, result in enumerate(results) if result is None]
+        print(f"📝 일괄 채점 요청: {len(answers)}문항 (AI 채점 {len(pending)}문항)")
+        
+        if pending:
+            batches = [pending[i:i + FEEDBACK_BATCH_SIZE] for i in range(0, len(pending), FEEDBACK_BATCH_SIZE)]
+            graded = map_concurrently(
+                lambda _, batch: grade_with_ai_batch([answers[index] for index in batch]),
+                batches,
+                FEEDBACK_BATCH_WORKERS
+            )
+            for batch, batch_results in zip(batches, graded):
+                for index, result in zip(batch, batch_results or [None] * len(batch)):
+                    if result is None:
+                        # AI 채점 실패 시 정답 안내로 대체
+                        correct_answer = answers[index].get('correct_answer')
+                        result = {'is_correct': False, 'feedback': f"정답은 '{correct_answer}'입니다. 다시 한 번 복습해보세요."}
+                    results[index] = result
+        
+        return jsonify({'results': results})
+    except Exception as e:
+        return jsonify({'error': f'피드백 생성 중 오류가 발생했습니다: {str(e)}'}), 500
+
+def find_base_session(user_id, session_id=None):
+    """오답을 연결할 파일 세션 조회 (session_id가 없거나 찾지 못하면 가장 최근 업로드)"""
+    base_session = None
+    if session_id:
+        base_session = LearningSession.query.filter_by(id=session_id, user_id=user_id, is_wrong=False).first()
+    if not base_session:
+        base_session = LearningSession.query.filter_by(user_id=user_id, is_wrong=False).order_by(LearningSession.created_at.desc()).first()
+    return base_session
+
+def insert_wrong_answers(rows):
+    """오답 여러 건을 한 번의 bulk INSERT로 저장하고 새 ID를 입력 순서대로 반환 (커밋은 호출한 쪽에서)
+
+    RETURNING도 MySQL도 아닌 DB에서는 행마다 INSERT한다.
+    """
+    dialect = db.session.get_bind().dialect
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        result = db.session.execute(insert(WrongAnswer).returning(WrongAnswer.id, sort_by_parameter_order=True), rows)
+        return list(result.scalars())
+
+    if dialect.name == 'mysql':
+        # RETURNING이 없는 MySQL: 여러 행 VALUES로 한 번에 넣고 LAST_INSERT_ID(첫 행 ID)부터 행 수만큼 ID 계산
+        # (InnoDB는 행 수가 정해진 INSERT 하나에 연속된 auto-increment 값을 할당, auto_increment_increment=1 기준)
+        result = db.session.execute(insert(WrongAnswer.__table__).values(rows))
+        first_id = result.lastrowid
+        return list(range(first_id, first_id + result.rowcount))
+
+    objs = [WrongAnswer(**row) for row in rows]
+    db.session.add_all(objs)
+    db.session.flush()
+    return [obj.id for obj in objs]
+
+@api.route('/wrongnotes', methods=['POST'])
 @jwt_required()
 def save_wrongnote():
     """오답노트 저장 - 로그인 필요"""
@@ -580,30 +1242,21 @@ def save_wrongnote():
             return jsonify({'error': '인증 정보가 없습니다.'}), 401
 
         data = request.get_json() or {}
-        print(f"📝 오답 저장 요청 사용자:{current_user_id} 데이터:{data}")
-
-        session_id = data.get('session_id')
+        print(f"📝 오답 저장 요청 사용자:{current_user_id} 세션ID:{data.get('session_id')}")
 
-        base_session = None
-        if session_id:
-            base_session = LearningSession.query.filter_by(id=session_id, user_id=int(current_user_id), is_wrong=False).first()
-        if not base_session:
-            base_session = LearningSession.query.filter_by(user_id=int(current_user_id), is_wrong=False).order_by(LearningSession.created_at.desc()).first()
+        base_session = find_base_session(int(current_user_id), data.get('session_id'))
         if not base_session:
             return jsonify({'error': '연결할 파일 세션을 찾을 수 없습니다.'}), 404
 
-        new_wrong = LearningSession(
+        new_wrong = WrongAnswer(
             user_id=int(current_user_id),
+            session_id=base_session.id,
             custom_filename=base_session.custom_filename,
             original_filename=base_session.original_filename,
-            file_path=base_session.file_path,
-            file_size=base_session.file_size,
-            file_type=base_session.file_type,
             question=data.get('question'),
             user_answer=data.get('user_answer'),
             correct_answer=data.get('correct_answer'),
-            explanation=data.get('explanation', ''),
-            is_wrong=True
+            explanation=data.get('explanation', '')
         )
         db.session.add(new_wrong)
         db.session.commit()
@@ -614,20 +1267,106 @@ def save_wrongnote():
         print(f"⚠️ 오답 저장 오류: {e}")
         return jsonify({'error': f'오답 저장 중 오류 발생: {str(e)}'}), 500
 
-@app.route('/wrongnotes', methods=['GET'])
+@api.route('/wrongnotes/bulk', methods=['POST'])
+@jwt_required()
+def save_wrongnotes_bulk():
+    """퀴즈 한 번의 오답 여러 건을 한 트랜잭션으로 저장 - 로그인 필요
+
+    요청: {session_id, wrong_notes: [{question, user_answer, correct_answer, explanation}]}
+    응답: {wrongnote_ids: [...]} (요청 순서와 같음)
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        if not current_user_id:
+            return jsonify({'error': '인증 정보가 없습니다.'}), 401
+
+        data = request.get_json() or {}
+        notes = data.get('wrong_notes')
+        if not isinstance(notes, list) or not notes:
+            return jsonify({'error': '저장할 오답이 없습니다.'}), 400
+        if not all(isinstance(note, dict) for note in notes):
+            return jsonify({'error': '오답 형식이 올바르지 않습니다.'}), 400
+
+        user_id = int(current_user_id)
+        base_session = find_base_session(user_id, data.get('session_id'))
+        if not base_session:
+            return jsonify({'error': '연결할 파일 세션을 찾을 수 없습니다.'}), 404
+
+        created_at = datetime.utcnow()
+        rows = [{
+            'user_id': user_id,
+            'session_id': base_session.id,
+            'custom_filename': base_session.custom_filename,
+            'original_filename': base_session.original_filename,
+            'question': note.get('question'),
+            'user_answer': note.get('user_answer'),
+            'correct_answer': note.get('correct_answer'),
+            'explanation': note.get('explanation', ''),
+            'created_at': created_at
+        } for note in notes]
+        wrongnote_ids = insert_wrong_answers(rows)
+        db.session.commit()
+        print(f"✅ 오답 {len(rows)}건 일괄 저장 완료 사용자:{current_user_id} 세션ID:{base_session.id}")
+        return jsonify({'message': '오답 저장 완료', 'wrongnote_ids': wrongnote_ids}), 201
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️ 오답 일괄 저장 오류: {e}")
+        return jsonify({'error': f'오답 저장 중 오류 발생: {str(e)}'}), 500
+
+PAGE_SIZE_DEFAULT = 20
+PAGE_SIZE_MAX = 100
+
+def encode_cursor(row):
+    raw = f"{row.created_at.isoformat()}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """커서를 (created_at, id)로 변환. 형식이 잘못되면 ValueError"""
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise ValueError('잘못된 커서입니다.')
+
+def paginate(query, model):
+    """created_at/id 기준 최신순 키셋 페이지네이션
+
+    요청 파라미터 limit, cursor를 사용하며 (행 목록, 다음 커서)를 반환한다.
+    """
+    limit = min(max(request.args.get('limit', PAGE_SIZE_DEFAULT, type=int), 1), PAGE_SIZE_MAX)
+    cursor = request.args.get('cursor')
+    
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < row_id)
+        ))
+    
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+@api.route('/wrongnotes', methods=['GET'])
 @jwt_required()
 def get_wrongnotes():
     """사용자의 오답노트 조회"""
     try:
         current_user_id = get_jwt_identity()
-        wrong_notes = LearningSession.query.filter_by(user_id=int(current_user_id), is_wrong=True).order_by(LearningSession.created_at.desc()).all()
+        query = WrongAnswer.query.filter_by(user_id=int(current_user_id))
+        wrong_notes, next_cursor = paginate(query, WrongAnswer)
         print(f"📊 오답노트 {len(wrong_notes)}건 사용자:{current_user_id}")
-        return jsonify([note.to_dict() for note in wrong_notes]), 200
+        return jsonify({
+            'items': [note.to_dict() for note in wrong_notes],
+            'next_cursor': next_cursor
+        }), 200
+    except ValueError:
+        return jsonify({'error': '잘못된 페이지 정보입니다.'}), 400
     except Exception as e:
         print(f"⚠️ 오답노트 조회 오류: {e}")
         return jsonify({'error': f'오답노트 조회 중 오류 발생: {str(e)}'}), 500
 
-@app.route('/study/save', methods=['POST'])
+@api.route('/study/save', methods=['POST'])
 @jwt_required()
 def save_study_summary():
     """요약/퀴즈/오답 정보를 한 번에 저장"""
@@ -648,9 +1387,12 @@ def save_study_summary():
         if not session:
             return jsonify({'error': '해당 세션을 찾을 수 없습니다.'}), 404
 
-        session.summary_data = json.dumps(data.get('summary_data'), ensure_ascii=False) if data.get('summary_data') is not None else None
-        session.quiz_data = json.dumps(data.get('quiz_data'), ensure_ascii=False) if data.get('quiz_data') is not None else None
-        session.wrong_notes_data = json.dumps(data.get('wrong_notes'), ensure_ascii=False) if data.get('wrong_notes') is not None else None
+        if session.data is None:
+            session.data = LearningSessionData()
+        # 값은 저장 시 압축 JSON으로 인코딩됨 (blob_codec.CompressedJSON)
+        session.data.summary_data = data.get('summary_data')
+        session.data.quiz_data = data.get('quiz_data')
+        session.data.wrong_notes_data = data.get('wrong_notes')
         session.is_saved = True
 
         db.session.commit()
@@ -663,52 +1405,75 @@ def save_study_summary():
         print(f"⚠️ 학습 세션 저장 오류: {e}")
         return jsonify({'error': f'학습 세션 저장 중 오류 발생: {str(e)}'}), 500
 
-@app.route('/generate-quiz', methods=['POST'])
+@api.route('/generate-quiz', methods=['POST'])
 def generate_quiz():
     """선택한 개수만큼 퀴즈 생성"""
     try:
         data = request.get_json()
-        text = data.get('text', '')
+        session_id = data.get('session_id')
         quiz_count = data.get('quiz_count', 5)
         quiz_type = data.get('quiz_type', 'objective')  # 퀴즈 유형 추가
         
         print(f"🎯 퀴즈 생성 요청: {quiz_count}개, 유형: {quiz_type}")
         
-        # Gemini로 퀴즈만 생성
-        result = generate_gemini_content(text, quiz_count, quiz_type)
+        # 세션 ID가 있으면 서버에 저장된 텍스트와 요약 사용, 없으면 요청 본문의 텍스트 사용
+        source_key = None
+        grounding = None
+        if session_id:
+            text, source_key = get_session_document(session_id)
+            if text is None:
+                return jsonify({'error': '세션의 문서 텍스트를 찾을 수 없습니다.'}), 404
+            
+            # 문제 은행에 충분한 문제가 있으면 바로 뽑아서 응답하고, 부족해지면 백그라운드에서 보충
+            questions = question_bank.sample(str(source_key), quiz_type, int(quiz_count))
+            if questions is not None:
+                print(f"🏦 문제 은행에서 퀴즈 제공 ({len(questions)}개)")
+                if question_bank.needs_fill(str(source_key), int(quiz_count)):
+                    fill_question_bank(source_key, text, get_session_summary(session_id, source_key), int(quiz_count))
+                return jsonify({'quizData': {'questions': questions}})
+            grounding = get_session_summary(session_id, source_key)
+        else:
+            text = data.get('text', '')
+        
+        # Gemini로 퀴즈만 생성 (요약은 요청하지 않음)
+        result = generate_quiz_content(text, quiz_count, quiz_type, source_key=source_key, grounding=grounding)
+        if source_key:
+            fill_question_bank(source_key, text, grounding, int(quiz_count))
         
         return jsonify({'quizData': result.get('quizData')})
+    except GeminiUnavailable as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': f'퀴즈 생성 중 오류가 발생했습니다: {str(e)}'}), 500
 
-@app.route('/chat', methods=['POST'])
-def chat():
-    """PDF 내용 기반 채팅"""
-    try:
-        data = request.get_json()
-        question = data.get('question')
+def prepare_chat_prompt(data):
+    """채팅 요청에서 프롬프트 생성. (프롬프트, 오류 응답) 반환"""
+    question = data.get('question')
+    session_id = data.get('session_id')
+    
+    print(f"📥 /chat 요청 - 질문: {question}")
+    
+    if not question:
+        return None, (jsonify({'error': '질문이 제공되지 않았습니다.'}), 400)
+    
+    # 세션 ID가 있으면 서버에 저장된 텍스트와 검색 인덱스 사용, 없으면 요청 본문의 텍스트 사용
+    index = None
+    if session_id:
+        pdf_text, key = get_session_document(session_id)
+        if pdf_text is None:
+            return None, (jsonify({'error': '세션의 문서 텍스트를 찾을 수 없습니다.'}), 404)
+        index = ChunkIndex.load(index_path(key))
+    else:
         pdf_text = data.get('pdfText', '')
-        
-        print(f"📥 /chat 요청 - 질문: {question}")
-        print(f"📄 PDF 텍스트 길이: {len(pdf_text)}자")
-        print(f"📝 PDF 텍스트 미리보기: {pdf_text[:200]}...")
-        
-        if not question:
-            return jsonify({'error': '질문이 제공되지 않았습니다.'}), 400
-        
-        # Gemini API로 답변 생성
-        api_key = os.getenv("GEMINI_API_KEY")
-        
-        if not api_key or api_key == "YOUR_API_KEY_HERE":
-            return jsonify({'answer': '죄송합니다. API 키가 설정되지 않아 답변을 제공할 수 없습니다.'})
-        
-        try:
-            model = genai.GenerativeModel('gemini-2.0-flash')
-            
-            prompt = f"""
-            다음은 PDF 문서의 내용입니다:
+    print(f"📄 PDF 텍스트 길이: {len(pdf_text)}자")
+    
+    # 문서 전체가 아니라 질문과 관련된 조각만 프롬프트에 포함
+    context = build_chat_context(pdf_text, question, index)
+    
+    prompt = f"""
+            다음은 PDF 문서에서 질문과 관련된 부분입니다:
             
-            {pdf_text[:8000]}
+            {context}
             
             위 문서 내용을 바탕으로 다음 질문에 답변해주세요:
             질문: {question}
@@ -716,14 +1481,31 @@ def chat():
             답변은 한국어로, 친절하고 명확하게 작성해주세요.
             문서에 관련 내용이 없다면, "문서에서 관련 내용을 찾을 수 없습니다"라고 답변해주세요.
             """
-            
+    return prompt, None
+
+def strip_markdown(answer):
+    """마크다운 기호 제거"""
+    answer = answer.replace('**', '')
+    answer = answer.replace('##', '')
+    answer = answer.replace('###', '')
+    return answer
+
+@api.route('/chat', methods=['POST'])
+def chat():
+    """PDF 내용 기반 채팅"""
+    try:
+        prompt, error = prepare_chat_prompt(request.get_json())
+        if error:
+            return error
+        
+        # Gemini API로 답변 생성
+        if not GEMINI_ENABLED:
+            return jsonify({'answer': '죄송합니다. API 키가 설정되지 않아 답변을 제공할 수 없습니다.'})
+        
+        try:
+            model = get_model(purpose='chat')
             response = model.generate_content(prompt)
-            answer = response.text
-            
-            # 마크다운 기호 제거
-            answer = answer.replace('**', '')
-            answer = answer.replace('##', '')
-            answer = answer.replace('###', '')
+            answer = strip_markdown(response.text)
             
             return jsonify({'answer': answer})
         except Exception as e:
@@ -732,8 +1514,79 @@ def chat():
     except Exception as e:
         return jsonify({'error': f'채팅 처리 중 오류가 발생했습니다: {str(e)}'}), 500
 
+@api.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """PDF 내용 기반 채팅 (SSE로 답변을 생성되는 대로 전송)"""
+    try:
+        prompt, error = prepare_chat_prompt(request.get_json())
+        if error:
+            return error
+    except Exception as e:
+        return jsonify({'error': f'채팅 처리 중 오류가 발생했습니다: {str(e)}'}), 500
+    
+    def events():
+        if not GEMINI_ENABLED:
+            yield sse_event({'text': '죄송합니다. API 키가 설정되지 않아 답변을 제공할 수 없습니다.'})
+            yield sse_event({}, event='done')
+            return
+        
+        try:
+            model = get_model(purpose='chat')
+            pending = ''
+            for chunk in model.generate_content(prompt, stream=True):
+                # 조각 경계에서 '**', '##'가 잘리지 않도록 끝의 기호는 다음 조각과 합쳐서 처리
+                text = pending + (chunk.text or '')
+                cut = len(text.rstrip('*#'))
+                pending = text[cut:]
+                if cut:
+                    yield sse_event({'text': strip_markdown(text[:cut])})
+            if pending:
+                yield sse_event({'text': strip_markdown(pending)})
+            yield sse_event({}, event='done')
+        except Exception as e:
+            print(f"⚠️ Gemini API 오류: {e}")
+            yield sse_event({'message': '죄송합니다. 답변 생성 중 오류가 발생했습니다.'}, event='error')
+    
+    return sse_response(events())
+
+@api.route('/summary/stream', methods=['POST'])
+def summary_stream():
+    """요약/퀴즈 생성 (SSE로 모델 출력을 생성되는 대로 전송하고 마지막에 결과 JSON 전송)"""
+    try:
+        data = request.get_json() or {}
+        session_id = data.get('session_id')
+        quiz_count = data.get('quiz_count', 5)
+        quiz_type = data.get('quiz_type', 'objective')
+        
+        # 세션 ID가 있으면 서버에 저장된 텍스트 사용, 없으면 요청 본문의 텍스트 사용
+        source_key = None
+        if session_id:
+            text, source_key = get_session_document(session_id)
+            if text is None:
+                return jsonify({'error': '세션의 문서 텍스트를 찾을 수 없습니다.'}), 404
+        else:
+            text = data.get('text', '')
+        if not text.strip():
+            return jsonify({'error': '요약할 텍스트가 없습니다.'}), 400
+    except Exception as e:
+        return jsonify({'error': f'요약 생성 중 오류가 발생했습니다: {str(e)}'}), 500
+    
+    def events():
+        try:
+            for kind, payload in stream_gemini_content(text, quiz_count, quiz_type, source_key=source_key):
+                if kind == 'delta':
+                    yield sse_event({'text': payload})
+                else:
+                    yield sse_event(payload, event='result')
+        except GeminiUnavailable as e:
+            yield sse_event({'message': str(e)}, event='error')
+        except Exception:
+            yield sse_event({'message': '요약 생성 중 오류가 발생했습니다. 잠시 후 다시 시도해 주세요.'}, event='error')
+    
+    return sse_response(events())
+
 # 인증 API
-@app.route('/auth/signup', methods=['POST'])
+@api.route('/auth/signup', methods=['POST'])
 def signup():
     """회원가입"""
     try:
@@ -775,7 +1628,7 @@ def signup():
         print(f"⚠️ 회원가입 오류: {e}")
         return jsonify({'error': f'회원가입 중 오류가 발생했습니다: {str(e)}'}), 500
 
-@app.route('/auth/login', methods=['POST'])
+@api.route('/auth/login', methods=['POST'])
 def login():
     """로그인"""
     try:
@@ -807,7 +1660,7 @@ def login():
         print(f"⚠️ 로그인 오류: {e}")
         return jsonify({'error': f'로그인 중 오류가 발생했습니다: {str(e)}'}), 500
 
-@app.route('/auth/me', methods=['GET'])
+@api.route('/auth/me', methods=['GET'])
 @jwt_required()
 def get_current_user():
     """현재 로그인한 사용자 정보 조회"""
@@ -822,7 +1675,7 @@ def get_current_user():
     except Exception as e:
         return jsonify({'error': f'사용자 정보 조회 중 오류가 발생했습니다: {str(e)}'}), 500
 
-@app.route('/mypage/files', methods=['GET'])
+@api.route('/mypage/files', methods=['GET'])
 @jwt_required()
 def get_my_files():
     """사용자가 업로드한 파일 목록 조회"""
@@ -830,17 +1683,44 @@ def get_my_files():
         current_user_id = get_jwt_identity()
         
         # 사용자가 업로드한 파일만 조회 (is_wrong=False인 것만)
-        files = LearningSession.query.filter_by(
+        query = LearningSession.query.filter_by(
             user_id=int(current_user_id),
             is_wrong=False
-        ).order_by(LearningSession.created_at.desc()).all()
+        )
+        files, next_cursor = paginate(query, LearningSession)
         
-        return jsonify([file.to_dict() for file in files]), 200
+        return jsonify({
+            'items': [file.to_list_dict() for file in files],
+            'next_cursor': next_cursor
+        }), 200
+    except ValueError:
+        return jsonify({'error': '잘못된 페이지 정보입니다.'}), 400
     except Exception as e:
         print(f"⚠️ 파일 목록 조회 오류: {e}")
         return jsonify({'error': f'파일 목록 조회 중 오류가 발생했습니다: {str(e)}'}), 500
 
-@app.route('/mypage/files/<int:file_id>', methods=['DELETE'])
+@api.route('/mypage/files/<int:file_id>', methods=['GET'])
+@jwt_required()
+def get_my_file(file_id):
+    """파일 하나의 저장된 요약/퀴즈/오답 정보 조회"""
+    try:
+        current_user_id = get_jwt_identity()
+        
+        file = LearningSession.query.filter_by(
+            id=file_id,
+            user_id=int(current_user_id),
+            is_wrong=False
+        ).first()
+        
+        if not file:
+            return jsonify({'error': '파일을 찾을 수 없거나 권한이 없습니다.'}), 404
+        
+        return jsonify(file.to_dict()), 200
+    except Exception as e:
+        print(f"⚠️ 파일 조회 오류: {e}")
+        return jsonify({'error': f'파일 조회 중 오류가 발생했습니다: {str(e)}'}), 500
+
+@api.route('/mypage/files/<int:file_id>', methods=['DELETE'])
 @jwt_required()
 def delete_my_file(file_id):
     """사용자가 업로드한 파일 삭제"""
@@ -857,20 +1737,24 @@ def delete_my_file(file_id):
         if not file:
             return jsonify({'error': '파일을 찾을 수 없거나 권한이 없습니다.'}), 404
         
-        # 실제 파일 삭제
-        if os.path.exists(file.file_path):
-            os.remove(file.file_path)
+        content_hash, file_path = file.content_hash, file.file_path
+        if not content_hash:
+            delete_text(file.id)  # 해시가 없는 이전 세션은 세션 ID로 텍스트 저장
+        delete_report_cache(file.id)
         
         # 데이터베이스에서 삭제
         db.session.delete(file)
         db.session.commit()
         
+        # 같은 내용을 참조하는 다른 세션이 없을 때만 실제 파일과 추출 텍스트 삭제
+        release_upload(content_hash, file_path)
+        
         return jsonify({'message': '파일이 삭제되었습니다.'}), 200
     except Exception as e:
         print(f"⚠️ 파일 삭제 오류: {e}")
         return jsonify({'error': f'파일 삭제 중 오류가 발생했습니다: {str(e)}'}), 500
 
-@app.route('/explain', methods=['POST'])
+@api.route('/explain', methods=['POST'])
 def explain_text():
     """PDF에서 선택한 텍스트를 Gemini로 간단하게 설명"""
     try:
@@ -905,8 +1789,8 @@ def explain_text():
   "example": ""         // 간단한 예시 (없으면 빈 문자열)
 }}"""
 
-        # Gemini API 호출
-        model = genai.GenerativeModel('gemini-2.0-flash')
+        # Gemini API 호출 (응답이 늦으면 헤지 요청을 보내 먼저 온 응답 사용)
+        model = get_model(purpose='explain', hedge_after=GEMINI_HEDGE_DELAY)
         response = model.generate_content(prompt)
         result_text = response.text.strip()
         
@@ -930,137 +1814,80 @@ def explain_text():
         print(f"⚠️ JSON 파싱 오류: {e}")
         print(f"응답 내용: {result_text}")
         return jsonify({'error': 'AI 응답 형식 오류'}), 500
+    except GeminiUnavailable as e:
+        print(f"⚠️ 텍스트 설명 실패: {e}")
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         print(f"⚠️ 텍스트 설명 오류: {e}")
         return jsonify({'error': f'설명 생성 중 오류가 발생했습니다: {str(e)}'}), 500
 
-@app.route('/pdf', methods=['POST'])
+REPORT_STREAM_CHUNK = 64 * 1024  # PDF 응답을 나눠 보내는 단위
+
+def stream_report(file, size):
+    """PDF 파일 객체를 Content-Length와 함께 조각 단위로 전송 (응답이 끝나면 파일을 닫음)"""
+    def chunks():
+        while True:
+            data = file.read(REPORT_STREAM_CHUNK)
+            if not data:
+                break
+            yield data
+    
+    response = Response(chunks(), mimetype='application/pdf', direct_passthrough=True, headers={
+        'Content-Length': str(size),
+        'Content-Disposition': 'attachment; filename=learning_result.pdf'
+    })
+    response.call_on_close(file.close)
+    return response
+
+def find_report_cache_path(data):
+    """저장된 학습 세션의 리포트 요청이면 세션 버전별 캐시 경로 반환 (아니면 None)
+
+    요청 본문도 키에 포함해 같은 버전이라도 다른 내용으로 요청하면 새로 생성한다.
+    """
+    session_id = data.get('session_id')
+    if not session_id or not REPORT_CACHE_DIR:
+        return None
+    try:
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+    except Exception:
+        return None  # 만료되었거나 잘못된 토큰은 비로그인 요청으로 처리
+    if not user_id:
+        return None
+    session = LearningSession.query.filter_by(id=session_id, user_id=int(user_id), is_wrong=False).first()
+    if not session or not session.data:
+        return None
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False)
+    # 마이그레이션으로 만든 행은 updated_at이 비어 있을 수 있음 (이후 수정되면 onupdate로 채워져 버전이 바뀜)
+    updated_at = session.data.updated_at or session.created_at
+    version = make_cache_key(session.id, updated_at.isoformat() if updated_at else '', payload)
+    return report_cache_path(session.id, version)
+
+@api.route('/pdf', methods=['POST'])
 def generate_pdf():
-    """저장된 학습 세션을 PDF로 생성"""
+    """학습 결과를 PDF로 생성 (임시 파일에 렌더링한 뒤 나눠서 전송)
+
+    session_id를 함께 보내면 REPORT_CACHE_DIR에 세션 버전별로 저장해 두고 재다운로드 시 그대로 전송한다.
+    """
     try:
-        data = request.json
-        print(f"📥 받은 데이터 키: {list(data.keys())}")
-        print(f"📥 데이터 내용: {data}")
+        data = request.json or {}
         
-        summary_data = data.get('summary', {})
-        quiz_data = data.get('quiz_results', [])
-        wrong_notes_data = data.get('wrong_notes', {})
+        summary_data = data.get('summary') or {}
+        quiz_data = data.get('quiz_results') or []
+        wrong_notes_data = data.get('wrong_notes') or {}
+        print(f"📥 PDF 생성 요청 - 요약 {len(summary_data.get('sections', []))}개 섹션, "
+              f"퀴즈 {len(quiz_data)}문항, 오답 {len(wrong_notes_data.get('wrong_answers', []))}개")
         
-        print(f"Summary sections: {summary_data.get('sections', [])[:1] if summary_data else 'None'}")
-        print(f"Quiz data length: {len(quiz_data)}")
-        print(f"Wrong notes: {wrong_notes_data}")
+        cache_path = find_report_cache_path(data)
+        if cache_path and os.path.exists(cache_path):
+            print(f"📦 캐시된 PDF 전송: {cache_path}")
+            return stream_report(open(cache_path, 'rb'), os.path.getsize(cache_path))
         
-        # BytesIO 버퍼에 PDF 생성
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
-        story = []
-        
-        # 한글 폰트 등록 (Windows 기본 폰트 사용)
-        try:
-            font_path = 'C:/Windows/Fonts/malgun.ttf'  # 맑은 고딕
-            pdfmetrics.registerFont(TTFont('Malgun', font_path))
-            font_name = 'Malgun'
-        except Exception as e:
-            print(f"⚠️ 한글 폰트 로드 실패: {e}")
-            font_name = 'Helvetica'
-        
-        # 스타일 정의
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontName=font_name,
-            fontSize=24,
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontName=font_name,
-            fontSize=16,
-            spaceAfter=12,
-            spaceBefore=12
-        )
-        body_style = ParagraphStyle(
-            'CustomBody',
-            parent=styles['Normal'],
-            fontName=font_name,
-            fontSize=11,
-            leading=16,
-            spaceAfter=10
-        )
-        
-        # 제목
-        story.append(Paragraph("학습 결과 리포트", title_style))
-        story.append(Spacer(1, 0.3*inch))
-        
-        # 1. 요약 섹션
-        if summary_data:
-            story.append(Paragraph("요약", heading_style))
-            story.append(Spacer(1, 0.1*inch))
-            
-            sections = summary_data.get('sections', [])
-            for section in sections:
-                section_title = section.get('title', '')
-                section_content = section.get('content', '')
-                
-                if section_title:
-                    story.append(Paragraph(f"<b>{section_title}</b>", body_style))
-                if section_content:
-                    story.append(Paragraph(section_content.replace('\n', '<br/>'), body_style))
-                story.append(Spacer(1, 0.15*inch))
-        
-        story.append(PageBreak())
-        
-        # 2. 퀴즈 섹션
-        if quiz_data:
-            story.append(Paragraph("퀴즈", heading_style))
-            story.append(Spacer(1, 0.1*inch))
-            
-            for idx, quiz_item in enumerate(quiz_data, 1):
-                question = quiz_item.get('question', '')
-                user_answer = quiz_item.get('userAnswer', '')
-                correct_answer = quiz_item.get('correctAnswer', '')
-                
-                if question:
-                    story.append(Paragraph(f"<b>문제 {idx}. {question}</b>", body_style))
-                    story.append(Paragraph(f"내 답: {user_answer}", body_style))
-                    story.append(Paragraph(f"정답: {correct_answer}", body_style))
-                    story.append(Spacer(1, 0.2*inch))
-        
-        story.append(PageBreak())
-        
-        # 3. 오답노트 섹션
-        if wrong_notes_data:
-            story.append(Paragraph("오답노트", heading_style))
-            story.append(Spacer(1, 0.1*inch))
-            
-            wrong_answers = wrong_notes_data.get('wrong_answers', [])
-            if wrong_answers:
-                for idx, item in enumerate(wrong_answers, 1):
-                    question_num = item.get('question_number', idx)
-                    user_answer = item.get('user_answer', '')
-                    correct_answer = item.get('correct_answer', '')
-                    explanation = item.get('explanation', '')
-                    
-                    story.append(Paragraph(f"<b>문제 {question_num}</b>", body_style))
-                    story.append(Paragraph(f"내 답: {user_answer}", body_style))
-                    story.append(Paragraph(f"정답: {correct_answer}", body_style))
-                    if explanation:
-                        story.append(Paragraph(f"해설: {explanation}", body_style))
-                    story.append(Spacer(1, 0.2*inch))
-            else:
-                story.append(Paragraph("모든 문제를 맞췄습니다!", body_style))
-        
-        # PDF 빌드
-        doc.build(story)
-        buffer.seek(0)
-        
-        return buffer.getvalue(), 200, {
-            'Content-Type': 'application/pdf',
-            'Content-Disposition': 'attachment; filename=learning_result.pdf'
-        }
+        # 폰트/스타일은 report_pdf에서 한 번만 준비
+        output, size = render_report_file(summary_data, quiz_data, wrong_notes_data)
+        if cache_path:
+            save_report_cache(cache_path, output)
+        return stream_report(output, size)
         
     except Exception as e:
         print(f"⚠️ PDF 생성 오류: {e}")
@@ -1068,7 +1895,38 @@ def generate_pdf():
         traceback.print_exc()
         return jsonify({'error': f'PDF 생성 중 오류가 발생했습니다: {str(e)}'}), 500
 
+def create_app(config=None):
+    """Flask 앱 생성 (gunicorn은 wsgi.py를 통해 워커마다 한 번 호출)"""
+    app = Flask(__name__)
+    # pdf.js가 다른 origin에서 Range 요청할 때 응답 헤더를 읽을 수 있도록 노출
+    CORS(app, expose_headers=['Accept-Ranges', 'Content-Range', 'Content-Length', 'ETag'])
+
+    app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(DATABASE_URL)
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'your-secret-key-change-this')
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
+    app.config['JWT_COOKIE_CSRF_PROTECT'] = False  # CSRF 보호 비활성화
+    app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+    app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
+    app.config['USE_X_SENDFILE'] = UPLOADS_SENDFILE == 'x-sendfile'
+    if config:
+        app.config.update(config)
+        if 'SQLALCHEMY_DATABASE_URI' in config and 'SQLALCHEMY_ENGINE_OPTIONS' not in config:
+            app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(config['SQLALCHEMY_DATABASE_URI'])
+
+    # 확장 기능 초기화
+    db.init_app(app)
+    bcrypt.init_app(app)
+    jwt.init_app(app)
+
+    app.register_blueprint(api)
+    resolve_report_font()  # 첫 PDF 요청이 폰트 파싱을 기다리지 않도록 미리 등록
+    return app
+
 if __name__ == '__main__':
+    # 개발용 서버. 운영 환경에서는 gunicorn -c gunicorn.conf.py wsgi:app
+    app = create_app()
     with app.app_context():
         db.create_all()
         print("✅ 데이터베이스 테이블이 생성되었습니다.")
@@ -0,0 +1,366 @@
+"""주요 엔드포인트 부하 테스트
+
+가짜 Gemini 서버(fake_server.py)를 띄우고 시나리오별로 동시 요청을 보내
+p50/p95/p99 지연 시간, 처리량, 서버 최대 RSS를 출력한다.
+
+사용법 (backend 디렉토리에서):
+    python benchmarks/bench_load.py
+    python benchmarks/bench_load.py --scenarios chat feedback --concurrency 16 --requests 200 --latency 1.0
+    DATABASE_URL=mysql+pymysql://root:pw@localhost/learningflow_bench python benchmarks/bench_load.py
+    python benchmarks/bench_load.py --base-url http://127.0.0.1:8000 --server-pid 1234  # 이미 실행 중인 서버
+    python benchmarks/bench_load.py --json results.json  # 결과를 파일로 저장해 회귀 비교
+
+시나리오: upload, generate-quiz, chat, feedback, wrongnotes, pdf, mixed
+upload은 202 응답이 아니라 작업이 끝날 때까지(/jobs 폴링)의 시간을 측정한다.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from corpus import build_corpus
+
+SCENARIOS = ('upload', 'generate-quiz', 'chat', 'feedback', 'wrongnotes', 'pdf', 'mixed')
+JOB_POLL_INTERVAL = 0.1
+REQUEST_TIMEOUT = 300
+
+QUESTIONS = ['엔트로피란 무엇인가요?', '열역학 제2법칙을 설명해 주세요.', '정보 이론에서 불확실성은 어떻게 측정하나요?']
+LONG_ANSWER = '고립계에서는 엔트로피가 감소하지 않으며 시간이 지날수록 무질서도가 커지는 방향으로 변화합니다.'
+
+
+class Client:
+    """urllib 기반의 간단한 JSON/멀티파트 HTTP 클라이언트"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.token = None
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        data = None
+        if body is not None and not isinstance(body, bytes):
+            data = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        elif body is not None:
+            data = body
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def json(self, method, path, body=None):
+        status, payload = self.request(method, path, body)
+        try:
+            return status, json.loads(payload or b'null')
+        except ValueError:
+            return status, None
+
+    def upload(self, file_path, category='일반'):
+        boundary = uuid.uuid4().hex
+        marker = uuid.uuid4().hex
+        name, ext = os.path.splitext(os.path.basename(file_path))
+        filename = f'{name}_{marker[:8]}{ext}'
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        # 업로드는 내용 해시로 중복 제거되므로, 같은 바이트를 다시 보내면 추출·요약을 건너뛴 시간만 측정된다.
+        # 요청마다 끝에 고유한 줄을 붙여 매번 새 문서로 처리되게 함 (PDF는 %%EOF 뒤 주석 줄이라 페이지 내용은 같아 페이지 텍스트 캐시는 적중할 수 있음)
+        content += f'\n%{marker}\n'.encode('ascii') if ext.lower() == '.pdf' else f'\n{marker}\n'.encode('ascii')
+        body = b''.join([
+            f'--{boundary}\r\nContent-Disposition: form-data; name="category"\r\n\r\n{category}\r\n'.encode('utf-8'),
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode('utf-8'),
+            content,
+            f'\r\n--{boundary}--\r\n'.encode('utf-8'),
+        ])
+        status, payload = self.request('POST', '/upload', body, {'Content-Type': f'multipart/form-data; boundary={boundary}'})
+        if status != 202:
+            return status, None
+        job_id = json.loads(payload)['jobId']
+        while True:
+            status, job = self.json('GET', f'/jobs/{job_id}')
+            if status != 200 or job['status'] in ('done', 'failed'):
+                return (200 if job and job['status'] == 'done' else 500), job
+            time.sleep(JOB_POLL_INTERVAL)
+
+
+def process_tree_rss(pid):
+    """pid와 자식 프로세스들의 RSS 합계(바이트). 측정할 수 없으면 None"""
+    try:
+        import psutil
+        process = psutil.Process(pid)
+        return sum(p.memory_info().rss for p in [process] + process.children(recursive=True))
+    except ImportError:
+        pass
+    except Exception:
+        return None
+
+    def children(p):
+        found = []
+        try:
+            for task in os.listdir(f'/proc/{p}/task'):
+                with open(f'/proc/{p}/task/{task}/children') as f:
+                    found.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+        return found
+
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            if current == pid:
+                return None
+            continue
+        pending.extend(children(current))
+    return total
+
+
+class RssSampler:
+    """시나리오 실행 중 서버 RSS를 주기적으로 측정해 최대값 기록"""
+
+    def __init__(self, pid, interval=0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        if self.pid:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = process_tree_rss(self.pid)
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+            self._stop.wait(self.interval)
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class Scenarios:
+    """시나리오별 요청 1회. (HTTP 상태 코드) 반환"""
+
+    def __init__(self, client, session_ids, corpus, upload_files):
+        self.client = client
+        self.session_ids = session_ids
+        self.corpus = corpus
+        self.upload_files = upload_files
+
+    def upload(self, i):
+        status, _ = self.client.upload(self.corpus[self.upload_files[i % len(self.upload_files)]])
+        return status
+
+    def generate_quiz(self, i):
+        body = {'session_id': self.session_ids[i % len(self.session_ids)], 'quiz_count': 5, 'quiz_type': 'objective'}
+        return self.client.request('POST', '/generate-quiz', body)[0]
+
+    def chat(self, i):
+        body = {'session_id': self.session_ids[i % len(self.session_ids)], 'question': QUESTIONS[i % len(QUESTIONS)]}
+        return self.client.request('POST', '/chat', body)[0]
+
+    def feedback(self, i):
+        body = {'question': QUESTIONS[i % len(QUESTIONS)], 'user_answer': LONG_ANSWER, 'correct_answer': '엔트로피는 감소하지 않는다.'}
+        return self.client.request('POST', '/feedback', body)[0]
+
+    def wrongnotes(self, i):
+        if i % 2:
+            return self.client.request('GET', '/wrongnotes?limit=20')[0]
+        notes = [
+            {'question': f'문제 {n}', 'user_answer': '선택지2', 'correct_answer': '선택지1', 'explanation': LONG_ANSWER}
+            for n in range(10)
+        ]
+        body = {'session_id': self.session_ids[i % len(self.session_ids)], 'wrong_notes': notes}
+        return self.client.request('POST', '/wrongnotes/bulk', body)[0]
+
+    def pdf(self, i):
+        body = {
+            'summary': {'sections': [{'title': f'섹션 {n}', 'content': LONG_ANSWER * 5} for n in range(10)]},
+            'quiz_results': [
+                {'question': f'문제 {n}', 'userAnswer': '선택지2', 'correctAnswer': '선택지1'} for n in range(20)
+            ],
+            'wrong_notes': {'wrong_answers': [
+                {'question_number': n, 'user_answer': '선택지2', 'correct_answer': '선택지1', 'explanation': LONG_ANSWER}
+                for n in range(10)
+            ]}
+        }
+        return self.client.request('POST', '/pdf', body)[0]
+
+    def mixed(self, i):
+        # 업로드는 드물고 채팅/채점/조회가 잦은 실제 사용 패턴에 가깝게
+        choices = [self.chat] * 4 + [self.feedback] * 3 + [self.wrongnotes] * 2 + [self.generate_quiz, self.pdf, self.upload]
+        return random.Random(i).choice(choices)(i)
+
+    def get(self, name):
+        return getattr(self, name.replace('-', '_'))
+
+
+def run_scenario(name, func, concurrency, total, server_pid):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i):
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            ok = func(i) < 400
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors += 1
+
+    with RssSampler(server_pid) as sampler:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(total)))
+        wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'scenario': name,
+        'requests': total,
+        'concurrency': concurrency,
+        'errors': errors,
+        'throughput': total / wall if wall else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'peak_rss_mb': sampler.peak / (1024 * 1024) if sampler.peak else None,
+    }
+
+
+def start_server(args):
+    env = dict(os.environ)
+    os.makedirs(os.path.join(BENCH_DIR, '.bench'), exist_ok=True)
+    command = [
+        sys.executable, os.path.join(BENCH_DIR, 'fake_server.py'),
+        '--port', str(args.port),
+        '--latency', str(args.latency),
+        '--token-rate', str(args.token_rate),
+        '--error-rate', str(args.error_rate),
+    ]
+    log = open(os.path.join(BENCH_DIR, '.bench', 'server.log'), 'w')
+    process = subprocess.Popen(command, cwd=os.path.dirname(BENCH_DIR), env=env, stdout=log, stderr=subprocess.STDOUT)
+    client = Client(f'http://127.0.0.1:{args.port}')
+    for _ in range(100):
+        try:
+            if client.request('GET', '/health')[0] == 200:
+                return process
+        except OSError:
+            pass
+        if process.poll() is not None:
+            break
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError('가짜 Gemini 서버를 시작하지 못했습니다. benchmarks/.bench/server.log를 확인하세요.')
+
+
+def prepare(client, corpus, seed_files):
+    """벤치마크 사용자로 로그인하고 시나리오에서 사용할 세션 문서 업로드"""
+    account = {'name': 'bench', 'email': 'bench@learningflow.local', 'password': 'bench-password'}
+    client.json('POST', '/auth/signup', account)
+    status, payload = client.json('POST', '/auth/login', {'email': account['email'], 'password': account['password']})
+    if status != 200:
+        raise RuntimeError(f'로그인 실패: {status} {payload}')
+    client.token = payload['access_token']
+
+    session_ids = []
+    for name in seed_files:
+        status, job = client.upload(corpus[name])
+        if status != 200:
+            raise RuntimeError(f'준비용 업로드 실패: {name} {job}')
+        session_ids.append(job['result']['sessionId'])
+    return session_ids
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=50, help='시나리오당 요청 수')
+    parser.add_argument('--latency', type=float, default=0.5, help='가짜 Gemini 응답 지연(초)')
+    parser.add_argument('--token-rate', type=float, default=100, help='가짜 Gemini 초당 출력 토큰 수')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='가짜 Gemini 오류 비율')
+    parser.add_argument('--port', type=int, default=8200)
+    parser.add_argument('--base-url', help='이미 실행 중인 서버 주소 (지정하면 서버를 띄우지 않음)')
+    parser.add_argument('--server-pid', type=int, help='--base-url 서버의 PID (RSS 측정용)')
+    parser.add_argument('--corpus-dir', default=os.path.join(BENCH_DIR, '.bench', 'corpus'))
+    parser.add_argument('--upload-files', nargs='+', default=['small.pdf', 'small.txt', 'medium.txt'])
+    parser.add_argument('--seed-files', nargs='+', default=['medium.txt', 'medium.pdf'])
+    parser.add_argument('--json', help='결과를 저장할 JSON 파일 경로')
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.corpus_dir)
+    process = None
+    if args.base_url:
+        client = Client(args.base_url)
+        server_pid = args.server_pid
+    else:
+        process = start_server(args)
+        client = Client(f'http://127.0.0.1:{args.port}')
+        server_pid = process.pid
+
+    try:
+        session_ids = prepare(client, corpus, args.seed_files)
+        scenarios = Scenarios(client, session_ids, corpus, args.upload_files)
+        results = []
+        print(f"{'scenario':<14} {'n':>5} {'err':>4} {'req/s':>8} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'RSS(MB)':>8}")
+        for name in args.scenarios:
+            result = run_scenario(name, scenarios.get(name), args.concurrency, args.requests, server_pid)
+            results.append(result)
+            rss = f"{result['peak_rss_mb']:.0f}" if result['peak_rss_mb'] else '-'
+            print(f"{name:<14} {result['requests']:>5} {result['errors']:>4} {result['throughput']:>8.1f} "
+                  f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} {rss:>8}")
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'settings': {key: value for key, value in vars(args).items() if key != 'json'},
+                    'results': results
+                }, f, ensure_ascii=False, indent=2)
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""PDF 텍스트 추출 벤치마크: 기존 순차 추출 vs pdf_extract 엔진
+
+사용법 (backend 디렉토리에서):
+    python benchmarks/bench_pdf_extract.py
+    python benchmarks/bench_pdf_extract.py --pages 10 100 1000 --workers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PyPDF2
+
+from corpus import make_pdf
+from pdf_extract import extract_pdf_text
+
+
+def legacy_extract_text(file_path):
+    """기존 app.extract_text_from_pdf 구현 (비교 기준)"""
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        text = ""
+        for page in pdf_reader.pages:
+            page_text = page.extract_text()
+            if page_text:
+                text += page_text + "\n"
+    return text
+
+
+def timed(func, *args, repeat=3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'legacy(s)':>10} {'engine(s)':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            path = os.path.join(tmp, f'{pages}.pdf')
+            make_pdf(path, pages)
+            legacy_time, legacy_text = timed(legacy_extract_text, path, repeat=args.repeat)
+            engine_time, engine_text = timed(
+                lambda p: extract_pdf_text(p, workers=args.workers), path, repeat=args.repeat
+            )
+            assert engine_text == legacy_text, '추출 결과가 기존 구현과 다릅니다.'
+            print(f"{pages:>6} {legacy_time:>10.3f} {engine_time:>10.3f} {legacy_time / engine_time:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""벤치마크용 합성 문서 (PDF/TXT) 생성
+
+크기별로 small/medium/large를 만든다. large TXT는 MAP_REDUCE_THRESHOLD(기본 3만 자)를 넘어 분할 요약 경로를 탄다.
+"""
+import os
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+LINE = 'The quick brown fox jumps over the lazy dog while the lecture notes explain entropy. '
+KOREAN_PARAGRAPH = (
+    '엔트로피는 계의 무질서한 정도를 나타내는 물리량이다. 열역학 제2법칙에 따르면 고립계의 엔트로피는 '
+    '시간이 지나면서 감소하지 않는다. 정보 이론에서는 같은 개념을 불확실성의 척도로 사용한다.\n'
+)
+
+PDF_SIZES = {'small': 5, 'medium': 50, 'large': 300}  # 페이지 수
+TXT_SIZES = {'small': 2000, 'medium': 20000, 'large': 120000}  # 글자 수
+
+
+def make_pdf(path, pages, lines_per_page=45):
+    c = canvas.Canvas(path, pagesize=A4)
+    for page in range(pages):
+        y = 800
+        for line in range(lines_per_page):
+            c.drawString(40, y, f'{page + 1}-{line + 1} {LINE}')
+            y -= 17
+        c.showPage()
+    c.save()
+
+
+def make_txt(path, chars):
+    """섹션 제목과 문단으로 이루어진 한국어 텍스트 파일 생성"""
+    parts = []
+    length = 0
+    section = 0
+    while length < chars:
+        section += 1
+        block = f'{section}. 섹션 {section}\n' + KOREAN_PARAGRAPH * 4 + '\n'
+        parts.append(block)
+        length += len(block)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(''.join(parts)[:chars])
+
+
+def build_corpus(directory):
+    """directory에 크기별 문서를 만들고 {이름: 경로} 반환 (이미 있으면 재사용)"""
+    os.makedirs(directory, exist_ok=True)
+    files = {}
+    for size, pages in PDF_SIZES.items():
+        path = os.path.join(directory, f'{size}.pdf')
+        if not os.path.exists(path):
+            make_pdf(path, pages)
+        files[f'{size}.pdf'] = path
+    for size, chars in TXT_SIZES.items():
+        path = os.path.join(directory, f'{size}.txt')
+        if not os.path.exists(path):
+            make_txt(path, chars)
+        files[f'{size}.txt'] = path
+    return files
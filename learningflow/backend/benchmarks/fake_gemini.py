@@ -0,0 +1,120 @@
+"""네트워크 없이 Gemini 호출을 흉내 내는 벤치마크용 모델
+
+응답 시작까지의 지연(latency), 초당 출력 토큰 수(token_rate), 실패 비율(error_rate)을 조절할 수 있다.
+프롬프트 내용을 보고 app.py의 각 파서가 기대하는 형식(요약 JSON, 채점 JSON, 설명 JSON, 일반 텍스트)으로 응답한다.
+
+사용법:
+    import app as appmod
+    from fake_gemini import FakeGenerativeModel, install
+    install(appmod, FakeGenerativeModel(latency=0.8, token_rate=80, error_rate=0.01))
+"""
+import json
+import random
+import re
+import threading
+import time
+
+try:
+    from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable
+except ImportError:  # google-generativeai가 없는 환경
+    ResourceExhausted = ServiceUnavailable = RuntimeError
+
+CHARS_PER_TOKEN = 4  # 출력 시간 계산용 대략적인 토큰 길이
+STREAM_CHUNK_TOKENS = 20  # 스트리밍 응답 한 조각의 토큰 수
+
+SENTENCE = '이 부분은 문서의 핵심 개념을 설명하며, 예시와 함께 원리를 자세히 다룹니다.'
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """genai.GenerativeModel.generate_content와 같은 방식으로 호출할 수 있는 가짜 모델"""
+
+    def __init__(self, latency=0.5, token_rate=100.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.token_rate = token_rate
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+                error_type = self._random.choice((ResourceExhausted, ServiceUnavailable))
+        time.sleep(self.latency)
+        if failed:
+            raise error_type('fake gemini: 요청 한도 초과 또는 일시적 오류')
+
+        text = build_reply(str(prompt))
+        if stream:
+            return self._stream(text)
+        time.sleep(self._output_seconds(text))
+        return FakeResponse(text)
+
+    def _output_seconds(self, text):
+        if not self.token_rate:
+            return 0.0
+        return len(text) / CHARS_PER_TOKEN / self.token_rate
+
+    def _stream(self, text):
+        size = STREAM_CHUNK_TOKENS * CHARS_PER_TOKEN
+        for start in range(0, len(text), size):
+            piece = text[start:start + size]
+            time.sleep(self._output_seconds(piece))
+            yield FakeResponse(piece)
+
+
+def build_reply(prompt):
+    """프롬프트 종류에 맞는 응답 텍스트 생성"""
+    if '"fullSummary"' in prompt:
+        match = re.search(r'정확히 (\d+)개', prompt)
+        return json.dumps(fake_summary(int(match.group(1)) if match else 5), ensure_ascii=False)
+    if '"quizData"' in prompt:  # 퀴즈 전용 프롬프트
+        match = re.search(r'정확히 (\d+)개', prompt)
+        return json.dumps({'quizData': fake_summary(int(match.group(1)) if match else 5)['quizData']}, ensure_ascii=False)
+    if '"sections"' in prompt:
+        return json.dumps({
+            'sections': [{'mainTitle': f'부분 주제 {i}', 'content': [SENTENCE] * 3} for i in range(1, 4)],
+            'keywords': ['키워드1', '키워드2']
+        }, ensure_ascii=False)
+    if '"results"' in prompt:
+        count = len(re.findall(r'^\[\d+\]$', prompt, re.MULTILINE))
+        return json.dumps({'results': [
+            {'id': i, 'is_correct': i % 2 == 0, 'feedback': '핵심 내용을 일부 포함하고 있습니다.'}
+            for i in range(1, count + 1)
+        ]}, ensure_ascii=False)
+    if '"is_correct"' in prompt:
+        return json.dumps({'is_correct': False, 'feedback': '핵심 내용이 빠져 있습니다.'}, ensure_ascii=False)
+    if '"easy_explanation"' in prompt:
+        return json.dumps({'summary': SENTENCE, 'easy_explanation': SENTENCE, 'example': ''}, ensure_ascii=False)
+    if '번역' in prompt:
+        return SENTENCE * max(1, len(prompt) // (len(SENTENCE) * 2))
+    return ' '.join([SENTENCE] * 6)
+
+
+def fake_summary(quiz_count):
+    return {
+        'fullSummary': [{'mainTitle': f'{i}. 주제 {i}', 'content': [SENTENCE] * 4} for i in range(1, 6)],
+        'structuredSummary': [{'title': f'핵심 개념 {i}', 'content': SENTENCE} for i in range(1, 4)],
+        'keywords': ['엔트로피', '열역학', '확률', '정보량', '평형'],
+        'expectedQuestions': [{'question': f'예상 질문 {i}', 'answer': SENTENCE} for i in range(1, 4)],
+        'quizData': {'questions': [
+            {'id': i, 'question': f'문제 {i}', 'options': ['선택지1', '선택지2', '선택지3', '선택지4'], 'answer': '선택지1'}
+            for i in range(1, quiz_count + 1)
+        ]}
+    }
+
+
+def install(appmod, model):
+    """app 모듈이 모든 Gemini 호출에 model을 사용하도록 교체"""
+    appmod.GEMINI_ENABLED = True
+    appmod.load_model = lambda model_name=None: model  # 디스패처(get_model)는 그대로 거침
+    return model
@@ -0,0 +1,57 @@
+"""가짜 Gemini 모델을 연결한 백엔드 서버 (부하 테스트 대상)
+
+사용법 (backend 디렉토리에서):
+    python benchmarks/fake_server.py --port 8200 --latency 0.8 --token-rate 80 --error-rate 0.01
+    # gunicorn으로 실행할 때는 환경 변수로 설정
+    FAKE_GEMINI_LATENCY=0.8 gunicorn -c gunicorn.conf.py --pythonpath benchmarks "fake_server:create_fake_app()"
+
+DATABASE_URL을 지정하지 않으면 benchmarks/.bench/bench.db(SQLite)를 사용한다.
+"""
+import argparse
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(BENCH_DIR, '.bench', 'bench.db'))
+os.environ.setdefault('GEMINI_CACHE_SIZE', '0')  # 같은 문서를 반복 요청해도 매번 생성 경로를 측정
+
+
+def create_fake_app():
+    import app as appmod
+    from fake_gemini import FakeGenerativeModel, install
+
+    install(appmod, FakeGenerativeModel(
+        latency=float(os.getenv('FAKE_GEMINI_LATENCY', '0.5')),
+        token_rate=float(os.getenv('FAKE_GEMINI_TOKEN_RATE', '100')),
+        error_rate=float(os.getenv('FAKE_GEMINI_ERROR_RATE', '0'))
+    ))
+    app = appmod.create_app()
+    with app.app_context():
+        appmod.db.create_all()
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8200)
+    parser.add_argument('--latency', type=float, default=0.5, help='응답 시작까지의 지연(초)')
+    parser.add_argument('--token-rate', type=float, default=100, help='초당 출력 토큰 수 (0이면 즉시)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='429/503 오류 비율 (0~1)')
+    args = parser.parse_args()
+
+    os.environ['FAKE_GEMINI_LATENCY'] = str(args.latency)
+    os.environ['FAKE_GEMINI_TOKEN_RATE'] = str(args.token_rate)
+    os.environ['FAKE_GEMINI_ERROR_RATE'] = str(args.error_rate)
+    os.makedirs(os.path.join(BENCH_DIR, '.bench'), exist_ok=True)
+
+    app = create_fake_app()
+    print(f"🚀 가짜 Gemini 서버 시작: http://{args.host}:{args.port} "
+          f"(지연 {args.latency}s, {args.token_rate} tok/s, 오류 {args.error_rate:.0%})")
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""요약/퀴즈 JSON 저장용 압축 코덱
+
+저장 형식: [버전 1바이트][본문]
+- 0x01: zlib으로 압축한 UTF-8 JSON
+
+버전 바이트가 없는 값(이전 MEDIUMTEXT 컬럼에서 옮겨진 JSON 원문)도 그대로 읽을 수 있다.
+"""
+import json
+import zlib
+
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+FORMAT_ZLIB_JSON = 1
+COMPRESS_LEVEL = 6
+
+
+def encode_json(value):
+    """값을 JSON으로 직렬화한 뒤 압축하여 bytes 반환"""
+    raw = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return bytes([FORMAT_ZLIB_JSON]) + zlib.compress(raw, COMPRESS_LEVEL)
+
+
+def decode_json_text(blob):
+    """저장된 bytes를 JSON 문자열로 복원 (파싱하지 않음)"""
+    if blob[:1] == bytes([FORMAT_ZLIB_JSON]):
+        return zlib.decompress(blob[1:]).decode('utf-8')
+    # 버전 바이트가 없으면 압축 전 JSON 원문
+    return bytes(blob).decode('utf-8')
+
+
+class EncodedJSON:
+    """DB에서 읽은 압축 JSON. 처음 접근할 때 한 번만 압축을 풀고 파싱한다"""
+
+    __slots__ = ('blob', '_text', '_value', '_parsed')
+
+    def __init__(self, blob):
+        self.blob = blob
+        self._text = None
+        self._value = None
+        self._parsed = False
+
+    @property
+    def text(self):
+        """JSON 문자열 (압축만 풀고 파싱하지 않음)"""
+        if self._text is None:
+            self._text = decode_json_text(self.blob)
+        return self._text
+
+    @property
+    def value(self):
+        """파싱된 파이썬 값"""
+        if not self._parsed:
+            self._value = json.loads(self.text)
+            self._parsed = True
+        return self._value
+
+    def __len__(self):
+        return len(self.blob)
+
+
+class CompressedJSON(TypeDecorator):
+    """파이썬 값을 압축 JSON BLOB으로 저장하고, 읽을 때는 EncodedJSON으로 반환하는 컬럼 타입"""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, length=16777215):  # MySQL에서 MEDIUMBLOB (16MB)
+        super().__init__(length=length)
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, EncodedJSON):
+            return value.blob
+        return encode_json(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):  # 텍스트로 저장된 이전 데이터
+            value = value.encode('utf-8')
+        return EncodedJSON(value)
@@ -0,0 +1,157 @@
+"""업로드 파일 내용 주소 저장소
+
+파일은 조각 단위로 디스크에 쓰면서 SHA-256을 계산하고 <해시>.<확장자> 이름으로 저장한다.
+같은 내용은 한 번만 저장되며, 몇 개의 학습 세션이 참조하는지는 learning_sessions.content_hash로 센다.
+처리 중인 업로드는 pin/unpin으로 표시해 참조하는 세션이 아직 없어도 삭제되지 않게 한다.
+
+pin은 업로드 폴더의 .pins/에 파일로 남기므로 다른 워커 프로세스에서도 보인다.
+저장(store_stream)과 삭제 판단(app.release_upload)은 blob_lock 안에서 하므로, 기존 파일을 재사용하는 업로드와
+다른 워커의 삭제가 엇갈리지 않는다. fcntl이 없는 환경(Windows)에서는 잠금이 프로세스 안에서만 유효하다.
+"""
+import hashlib
+import itertools
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+CHUNK_BYTES = 1024 * 1024
+BLOB_NAME_RE = re.compile(r'^[0-9a-f]{64}\.[a-z0-9]+$')
+PIN_DIR = '.pins'
+LOCK_DIR = '.locks'
+PIN_MAX_AGE = 6 * 3600  # 이보다 오래된 pin은 비정상 종료한 워커가 남긴 것으로 보고 무시
+
+_pins = {}  # (폴더, 해시) -> 이 프로세스가 만든 pin 파일 경로 리스트
+_pins_lock = threading.Lock()
+_pin_counter = itertools.count()
+_local_lock = threading.Lock()  # fcntl이 없을 때 blob_lock 대신 사용
+
+
+def blob_filename(content_hash, extension):
+    return f'{content_hash}.{extension}'
+
+
+def is_blob_filename(filename):
+    """내용 해시로 지은 파일 이름인지 (이름이 같으면 내용도 같으므로 오래 캐시해도 됨)"""
+    return bool(BLOB_NAME_RE.match(filename))
+
+
+@contextmanager
+def blob_lock(folder, content_hash):
+    """같은 해시의 저장/pin과 삭제 판단을 워커 프로세스 사이에서 직렬화 (잠금 파일은 해시 앞 2자리별 최대 256개)"""
+    if fcntl is None:
+        with _local_lock:
+            yield
+        return
+    lock_dir = os.path.join(folder, LOCK_DIR)
+    os.makedirs(lock_dir, exist_ok=True)
+    with open(os.path.join(lock_dir, f'{content_hash[:2]}.lock'), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def store_stream(stream, folder, extension):
+    """스트림을 조각 단위로 저장하고 (해시, 경로, 크기) 반환. 같은 내용이 이미 있으면 기존 파일 사용
+
+    반환한 파일은 pin된 상태이므로 처리가 끝나면 unpin해야 한다.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    tmp_path = os.path.join(folder, f'.upload-{uuid.uuid4().hex}.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            while True:
+                chunk = stream.read(CHUNK_BYTES)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+        content_hash = digest.hexdigest()
+        path = os.path.join(folder, blob_filename(content_hash, extension))
+        # 기존 파일 확인과 pin 사이에 다른 워커가 파일을 지우지 못하도록 잠금 안에서 처리
+        with blob_lock(folder, content_hash):
+            if os.path.exists(path):
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, path)
+            pin(folder, content_hash)
+        return content_hash, path, size
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def pin(folder, content_hash):
+    """처리 중인 업로드 표시 (pin 파일로 남겨 다른 워커에서도 보임)"""
+    pin_dir = os.path.join(folder, PIN_DIR)
+    os.makedirs(pin_dir, exist_ok=True)
+    path = os.path.join(pin_dir, f'{content_hash}.{os.getpid()}.{next(_pin_counter)}')
+    open(path, 'w').close()
+    with _pins_lock:
+        _pins.setdefault((folder, content_hash), []).append(path)
+
+
+def unpin(folder, content_hash):
+    with _pins_lock:
+        paths = _pins.get((folder, content_hash))
+        if not paths:
+            return
+        path = paths.pop()
+        if not paths:
+            del _pins[(folder, content_hash)]
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _pid_alive(pid):
+    if fcntl is None:  # Windows의 os.kill(pid, 0)은 프로세스를 종료시키므로 확인하지 않음
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def is_pinned(folder, content_hash):
+    """어느 워커에서든 처리 중인 업로드가 있으면 True (종료된 워커가 남긴 pin은 정리)
+
+    삭제 여부를 판단할 때는 blob_lock 안에서 호출해야 한다.
+    """
+    pin_dir = os.path.join(folder, PIN_DIR)
+    try:
+        names = os.listdir(pin_dir)
+    except FileNotFoundError:
+        return False
+    now = time.time()
+    for name in names:
+        if not name.startswith(f'{content_hash}.'):
+            continue
+        path = os.path.join(pin_dir, name)
+        try:
+            stale = now - os.stat(path).st_mtime > PIN_MAX_AGE or not _pid_alive(int(name.split('.')[1]))
+        except (OSError, ValueError):
+            continue
+        if not stale:
+            return True
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    return False
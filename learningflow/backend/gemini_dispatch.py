@@ -0,0 +1,486 @@
+"""Gemini 호출 디스패처 (프로세스 전체 공용)
+
+모든 generate_content 호출은 이 디스패처를 거친다.
+- 동시 호출 수 제한: GEMINI_MAX_CONCURRENCY개까지. 그중 GEMINI_INTERACTIVE_RESERVE개는 대화형 호출 전용
+- 우선순위: 대화형(채팅, 설명, 채점, 퀴즈) 호출이 기다리는 동안에는 일괄(업로드 처리, 번역, 문제 은행) 호출을 시작하지 않음
+- 호출 속도 제한: 모델별 토큰 버킷 (GEMINI_RPM, 모델별 값은 GEMINI_RPM_OVERRIDES)
+- 429/5xx 오류는 지수 백오프 + 지터로 재시도. 429를 받으면 해당 모델의 버킷을 비워 다른 호출도 잠시 늦춤
+- 시간 예산(deadline): 대기열 대기, 재시도, 요청 timeout을 합쳐 예산 안에서 끝나도록 제한
+- 서킷 브레이커: 모델별 최근 호출의 실패율이 기준을 넘으면 일정 시간 동안 호출하지 않고 바로 실패
+- 헤지 요청: 지정한 시간 안에 응답이 없으면 같은 요청을 하나 더 보내 먼저 온 응답을 사용
+- 대기열 길이, 처리 중인 호출 수, 재시도 횟수, 브레이커 상태는 stats()로 조회 (/health)
+
+제한은 프로세스마다 적용되므로 gunicorn 워커가 여러 개이면 워커 수로 나눈 값을 설정한다.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
+
+try:
+    from google.api_core.exceptions import TooManyRequests, ServerError, ServiceUnavailable, DeadlineExceeded
+    # ResourceExhausted(429)는 TooManyRequests, ServiceUnavailable(503)/DeadlineExceeded(504)는 ServerError의 하위 클래스
+    API_ERRORS = (TooManyRequests, ServerError, ServiceUnavailable, DeadlineExceeded)
+    API_TIMEOUT_ERRORS = (DeadlineExceeded,)
+except ImportError:  # google-api-core가 없는 환경
+    TooManyRequests = None
+    API_ERRORS = API_TIMEOUT_ERRORS = ()
+
+try:
+    # GEMINI_TRANSPORT=rest(gevent 워커 기본값)에서는 timeout/연결 끊김이 requests 예외로 올라옴
+    import requests.exceptions
+    TRANSPORT_TIMEOUT_ERRORS = (requests.exceptions.Timeout,)  # ConnectTimeout, ReadTimeout
+    TRANSPORT_ERRORS = TRANSPORT_TIMEOUT_ERRORS + (requests.exceptions.ConnectionError,)
+except ImportError:
+    TRANSPORT_TIMEOUT_ERRORS = TRANSPORT_ERRORS = ()
+
+# 시간 초과로 보는 오류 (통계의 timeouts)
+TIMEOUT_ERRORS = API_TIMEOUT_ERRORS + TRANSPORT_TIMEOUT_ERRORS + (TimeoutError,)
+# 재시도하고 브레이커가 실패로 세는 오류 (4xx 요청 오류는 서버가 정상적으로 응답한 것으로 봄)
+RETRYABLE_ERRORS = API_ERRORS + TRANSPORT_ERRORS + (TimeoutError, ConnectionError)
+UPSTREAM_ERRORS = RETRYABLE_ERRORS
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+LANES = (INTERACTIVE, BULK)
+
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '8'))
+GEMINI_INTERACTIVE_RESERVE = int(os.getenv('GEMINI_INTERACTIVE_RESERVE', '2'))
+GEMINI_RPM = float(os.getenv('GEMINI_RPM', '600'))  # 모델별 분당 호출 수 (0이면 제한 없음)
+GEMINI_RPM_OVERRIDES = os.getenv('GEMINI_RPM_OVERRIDES', '')  # 예: gemini-2.0-flash=2000,gemini-1.5-pro=300
+GEMINI_QUEUE_TIMEOUT = float(os.getenv('GEMINI_QUEUE_TIMEOUT', '60'))  # 호출 슬롯/토큰을 기다리는 최대 시간(초)
+GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', '3'))
+GEMINI_RETRY_BASE = float(os.getenv('GEMINI_RETRY_BASE', '1.0'))  # 첫 재시도 대기 시간(초)
+GEMINI_RETRY_MAX = float(os.getenv('GEMINI_RETRY_MAX', '20'))
+
+GEMINI_BREAKER_WINDOW = int(os.getenv('GEMINI_BREAKER_WINDOW', '20'))  # 실패율을 계산할 최근 호출 수
+GEMINI_BREAKER_MIN_CALLS = int(os.getenv('GEMINI_BREAKER_MIN_CALLS', '10'))  # 이보다 호출이 적으면 열지 않음
+GEMINI_BREAKER_FAILURE_RATE = float(os.getenv('GEMINI_BREAKER_FAILURE_RATE', '0.5'))
+GEMINI_BREAKER_COOLDOWN = float(os.getenv('GEMINI_BREAKER_COOLDOWN', '30'))  # 열린 뒤 시험 호출까지 대기(초)
+
+
+class GeminiUnavailable(Exception):
+    """지금은 Gemini를 호출할 수 없음 (대기열 초과, 시간 예산 초과, 브레이커 열림)"""
+
+
+class GeminiBusy(GeminiUnavailable):
+    """대기 시간 안에 호출 슬롯이나 호출 토큰을 얻지 못함"""
+
+
+class GeminiTimeout(GeminiUnavailable):
+    """시간 예산 안에 응답을 받지 못함"""
+
+
+class CircuitOpen(GeminiUnavailable):
+    """최근 실패가 많아 브레이커가 열려 있음"""
+
+
+def parse_rpm_overrides(value):
+    """'모델=분당 호출 수,...' 형식 문자열을 dict로 변환"""
+    overrides = {}
+    for item in value.split(','):
+        if '=' in item:
+            name, rpm = item.split('=', 1)
+            overrides[name.strip()] = float(rpm)
+    return overrides
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, deadline):
+        """토큰 하나를 얻을 때까지 대기 (deadline을 넘기면 GeminiBusy)"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                raise GeminiBusy('Gemini 호출 한도에 도달했습니다. 잠시 후 다시 시도해 주세요.')
+            time.sleep(wait)
+
+    def drain(self):
+        """요청 한도 초과(429)를 받았을 때 쌓인 토큰을 버려 뒤따르는 호출을 늦춤"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0)
+
+
+class CircuitBreaker:
+    """최근 window번 호출 중 실패 비율이 failure_rate 이상이면 cooldown초 동안 호출을 막음
+
+    closed → (실패율 초과) → open → (cooldown 경과) → half_open: 시험 호출 1개만 허용
+    → 시험 호출이 성공하면 closed, 실패하면 다시 open
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, window=GEMINI_BREAKER_WINDOW, min_calls=GEMINI_BREAKER_MIN_CALLS,
+                 failure_rate=GEMINI_BREAKER_FAILURE_RATE, cooldown=GEMINI_BREAKER_COOLDOWN):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=window)  # True: 성공, False: 실패
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """호출해도 되는지 확인 (막혀 있으면 CircuitOpen)"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    raise CircuitOpen('AI 서버 응답이 원활하지 않아 잠시 요청을 중단했습니다. 잠시 후 다시 시도해 주세요.')
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpen('AI 서버 상태를 확인하는 중입니다. 잠시 후 다시 시도해 주세요.')
+                self._probing = True
+
+    def record(self, success):
+        """호출 결과 기록. success가 None이면 호출하지 못하고 포기한 것 (시험 호출 기회만 돌려줌)"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+                if success:
+                    self.state = self.CLOSED
+                    self._outcomes.clear()
+                    print("✅ Gemini 서킷 브레이커 닫힘 (시험 호출 성공)")
+                elif success is not None:
+                    self._open()
+                return
+            if success is None:
+                return
+            self._outcomes.append(success)
+            total = len(self._outcomes)
+            if (self.state == self.CLOSED and total >= self.min_calls
+                    and self._outcomes.count(False) / total >= self.failure_rate):
+                self._open()
+
+    def _open(self):
+        """브레이커 열기 (_lock 안에서 호출)"""
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        print(f"🚫 Gemini 서킷 브레이커 열림 ({self.cooldown:.0f}초 동안 호출 중단)")
+
+    def snapshot(self):
+        with self._lock:
+            total = len(self._outcomes)
+            return {
+                'state': self.state,
+                'failure_rate': round(self._outcomes.count(False) / total, 2) if total else 0.0,
+                'recent_calls': total,
+            }
+
+
+class Dispatcher:
+    """우선순위별 대기열, 동시 호출 수 제한, 모델별 호출 속도 제한, 재시도, 서킷 브레이커를 담당"""
+
+    def __init__(self, max_concurrency=GEMINI_MAX_CONCURRENCY, interactive_reserve=GEMINI_INTERACTIVE_RESERVE,
+                 rpm=GEMINI_RPM, rpm_overrides=None, queue_timeout=GEMINI_QUEUE_TIMEOUT,
+                 max_retries=GEMINI_MAX_RETRIES, retry_base=GEMINI_RETRY_BASE, retry_max=GEMINI_RETRY_MAX,
+                 breaker_factory=CircuitBreaker):
+        self.max_concurrency = max(1, max_concurrency)
+        self.interactive_reserve = min(max(0, interactive_reserve), self.max_concurrency - 1)
+        self.rpm = rpm
+        self.rpm_overrides = rpm_overrides if rpm_overrides is not None else parse_rpm_overrides(GEMINI_RPM_OVERRIDES)
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.breaker_factory = breaker_factory
+        self._cond = threading.Condition()
+        self._waiting = {lane: 0 for lane in LANES}
+        self._in_flight = {lane: 0 for lane in LANES}
+        self._buckets = {}
+        self._breakers = {}
+        self._hedge_executor = ThreadPoolExecutor(max_workers=self.max_concurrency * 2,
+                                                  thread_name_prefix='gemini-hedge')
+        self._stats = {
+            'calls': 0, 'failures': 0, 'retries': 0, 'rate_limited': 0, 'rejected': 0,
+            'timeouts': 0, 'circuit_rejected': 0, 'hedged': 0, 'hedge_wins': 0,
+            'max_queue_depth': 0, 'wait_seconds_total': 0.0,
+        }
+
+    def _count(self, name):
+        with self._cond:
+            self._stats[name] += 1
+
+    # --- 슬롯 (동시 호출 수, 우선순위) ---
+
+    def _can_start(self, lane):
+        in_flight = sum(self._in_flight.values())
+        if in_flight >= self.max_concurrency:
+            return False
+        if lane == BULK:
+            if self._waiting[INTERACTIVE]:
+                return False
+            if in_flight >= self.max_concurrency - self.interactive_reserve:
+                return False
+        return True
+
+    def _acquire_slot(self, lane, deadline):
+        with self._cond:
+            self._waiting[lane] += 1
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], sum(self._waiting.values()))
+            try:
+                while not self._can_start(lane):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise GeminiBusy('Gemini 호출 대기열이 가득 찼습니다. 잠시 후 다시 시도해 주세요.')
+                    self._cond.wait(remaining)
+                self._in_flight[lane] += 1
+            finally:
+                self._waiting[lane] -= 1
+                self._cond.notify_all()  # 대화형 대기가 끝나면 일괄 호출이 시작할 수 있음
+
+    def _release_slot(self, lane):
+        with self._cond:
+            self._in_flight[lane] -= 1
+            self._cond.notify_all()
+
+    # --- 호출 속도, 브레이커 ---
+
+    def _bucket(self, model_name):
+        rpm = self.rpm_overrides.get(model_name, self.rpm)
+        if not rpm:
+            return None
+        with self._cond:
+            bucket = self._buckets.get(model_name)
+            if bucket is None:
+                # 1분 한도의 1/10까지는 한꺼번에 보낼 수 있음
+                bucket = TokenBucket(rpm / 60.0, max(1.0, rpm / 10.0))
+                self._buckets[model_name] = bucket
+            return bucket
+
+    def _breaker(self, model_name):
+        with self._cond:
+            breaker = self._breakers.get(model_name)
+            if breaker is None:
+                breaker = self.breaker_factory()
+                self._breakers[model_name] = breaker
+            return breaker
+
+    # --- 재시도 ---
+
+    def _backoff(self, attempt):
+        # full jitter: 0 ~ min(최대, 기본 × 2^attempt) 사이에서 무작위
+        return random.uniform(0, min(self.retry_max, self.retry_base * (2 ** attempt)))
+
+    def _retry_delay(self, error, attempt, model_name, deadline):
+        """재시도 전에 기다릴 시간(초). 재시도하지 않으면 None"""
+        if not isinstance(error, RETRYABLE_ERRORS) or attempt >= self.max_retries:
+            return None
+        delay = self._backoff(attempt)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None  # 기다리면 시간 예산을 넘김
+        with self._cond:
+            self._stats['retries'] += 1
+            if TooManyRequests is not None and isinstance(error, TooManyRequests):
+                self._stats['rate_limited'] += 1
+        if TooManyRequests is not None and isinstance(error, TooManyRequests):
+            bucket = self._bucket(model_name)
+            if bucket is not None:
+                bucket.drain()
+        return delay
+
+    # --- 호출 ---
+
+    def _start(self, model_name, lane, deadline):
+        """브레이커 확인 후 슬롯과 토큰을 얻고, 요청에 쓸 수 있는 남은 시간(초) 반환 (예산이 없으면 None)
+
+        deadline은 time.monotonic() 기준 절대 시각이다. 대기는 GEMINI_QUEUE_TIMEOUT과 deadline 중 이른 쪽까지.
+        """
+        breaker = self._breaker(model_name)
+        try:
+            breaker.before_call()
+        except CircuitOpen:
+            self._count('circuit_rejected')
+            raise
+        started = time.monotonic()
+        wait_deadline = started + self.queue_timeout
+        if deadline is not None:
+            wait_deadline = min(wait_deadline, deadline)
+        slot_acquired = False
+        try:
+            self._acquire_slot(lane, wait_deadline)
+            slot_acquired = True
+            bucket = self._bucket(model_name)
+            if bucket is not None:
+                bucket.acquire(wait_deadline)
+        except GeminiBusy:
+            self._count('rejected')
+            breaker.record(None)
+            if slot_acquired:
+                self._release_slot(lane)
+            if deadline is not None and time.monotonic() >= deadline - 0.01:
+                raise GeminiTimeout('AI 응답 대기 시간이 초과되었습니다. 잠시 후 다시 시도해 주세요.')
+            raise
+        with self._cond:
+            self._stats['calls'] += 1
+            self._stats['wait_seconds_total'] += time.monotonic() - started
+        return None if deadline is None else max(0.001, deadline - time.monotonic())
+
+    def _finish(self, model_name, lane, error):
+        """호출 결과를 브레이커에 기록하고 슬롯 반환"""
+        upstream_failure = error is not None and isinstance(error, UPSTREAM_ERRORS)
+        self._breaker(model_name).record(not upstream_failure)
+        if upstream_failure and isinstance(error, TIMEOUT_ERRORS):
+            self._count('timeouts')
+        self._release_slot(lane)
+
+    def call(self, model_name, lane, func, deadline=None):
+        """func(남은 시간)을 제한 안에서 실행하고 결과 반환 (429/5xx는 시간 예산 안에서 재시도)"""
+        attempt = 0
+        while True:
+            timeout = self._start(model_name, lane, deadline)
+            try:
+                result = func(timeout)
+            except Exception as e:
+                self._finish(model_name, lane, e)
+                delay = self._retry_delay(e, attempt, model_name, deadline)
+                if delay is None:
+                    self._count('failures')
+                    raise
+            else:
+                self._finish(model_name, lane, None)
+                return result
+            print(f"🔁 Gemini 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}초 후)")
+            time.sleep(delay)  # 기다리는 동안에는 슬롯을 다른 호출에 양보
+            attempt += 1
+
+    def stream(self, model_name, lane, func, deadline=None):
+        """스트리밍 호출. 응답 조각을 모두 받을 때까지 슬롯을 유지하고, 첫 조각 전의 오류만 재시도"""
+        attempt = 0
+        while True:
+            timeout = self._start(model_name, lane, deadline)
+            first_received = False
+            error = None
+            try:
+                for chunk in func(timeout):
+                    first_received = True
+                    yield chunk
+            except Exception as e:
+                error = e
+            finally:
+                # 클라이언트가 중간에 연결을 끊은 경우(GeneratorExit)에도 슬롯 반환
+                self._finish(model_name, lane, error)
+            if error is None:
+                return
+            delay = None if first_received else self._retry_delay(error, attempt, model_name, deadline)
+            if delay is None:
+                self._count('failures')
+                raise error
+            print(f"🔁 Gemini 스트리밍 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}초 후)")
+            time.sleep(delay)
+            attempt += 1
+
+    def _can_hedge(self, model_name):
+        """대기 중인 호출이 없고 브레이커가 닫혀 있을 때만 추가 요청을 보냄"""
+        if self._breaker(model_name).state != CircuitBreaker.CLOSED:
+            return False
+        with self._cond:
+            return not any(self._waiting.values()) and sum(self._in_flight.values()) < self.max_concurrency
+
+    def hedged(self, model_name, lane, func, hedge_after, deadline=None):
+        """hedge_after초 안에 응답이 없으면 같은 요청을 한 번 더 보내고 먼저 성공한 결과 반환 (늦은 결과는 버림)"""
+        first = self._hedge_executor.submit(self.call, model_name, lane, func, deadline)
+        try:
+            return first.result(timeout=hedge_after)
+        except FutureTimeoutError:
+            pass
+
+        futures = [first]
+        if self._can_hedge(model_name):
+            self._count('hedged')
+            futures.append(self._hedge_executor.submit(self.call, model_name, lane, func, deadline))
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        error = None
+        try:
+            for future in as_completed(futures, timeout=remaining):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                if future is not first:
+                    self._count('hedge_wins')
+                return result
+        except FutureTimeoutError:
+            self._count('timeouts')
+            raise GeminiTimeout('AI 응답 대기 시간이 초과되었습니다. 잠시 후 다시 시도해 주세요.')
+        raise error
+
+    def circuit_open(self):
+        """닫혀 있지 않은 브레이커가 하나라도 있으면 True"""
+        with self._cond:
+            breakers = list(self._breakers.values())
+        return any(breaker.state != CircuitBreaker.CLOSED for breaker in breakers)
+
+    def stats(self):
+        """대기열/처리 중 호출 수, 누적 통계, 모델별 브레이커 상태"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats['queued'] = dict(self._waiting)
+            stats['in_flight'] = dict(self._in_flight)
+            breakers = dict(self._breakers)
+        wait_seconds = stats.pop('wait_seconds_total')
+        stats['avg_wait_ms'] = round(wait_seconds / stats['calls'] * 1000, 1) if stats['calls'] else 0.0
+        stats['max_concurrency'] = self.max_concurrency
+        stats['circuit'] = {name: breaker.snapshot() for name, breaker in breakers.items()}
+        return stats
+
+
+class GovernedModel:
+    """GenerativeModel의 generate_content를 디스패처를 거쳐 호출하는 래퍼 (나머지 속성은 원래 모델 것을 사용)
+
+    budget(초)이 있으면 generate_content를 부를 때부터 시간 예산을 재고, 남은 시간을 요청 timeout으로 넘긴다.
+    hedge_after(초)가 있으면 스트리밍이 아닌 호출을 헤지 요청으로 보낸다.
+    """
+
+    def __init__(self, model, dispatcher, model_name, lane=INTERACTIVE, budget=None, hedge_after=None):
+        self._model = model
+        self._dispatcher = dispatcher
+        self._model_name = model_name
+        self._lane = lane
+        self._budget = budget
+        self._hedge_after = hedge_after
+
+    def generate_content(self, *args, stream=False, **kwargs):
+        def invoke(timeout):
+            call_kwargs = dict(kwargs)
+            if timeout is not None:
+                call_kwargs['request_options'] = dict(call_kwargs.get('request_options') or {}, timeout=timeout)
+            if stream:
+                call_kwargs['stream'] = True
+            return self._model.generate_content(*args, **call_kwargs)
+
+        deadline = time.monotonic() + self._budget if self._budget else None
+        if stream:
+            return self._dispatcher.stream(self._model_name, self._lane, invoke, deadline)
+        if self._hedge_after:
+            return self._dispatcher.hedged(self._model_name, self._lane, invoke, self._hedge_after, deadline)
+        return self._dispatcher.call(self._model_name, self._lane, invoke, deadline)
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
@@ -0,0 +1,43 @@
+"""gunicorn 설정 (모든 값은 환경 변수로 변경 가능)
+
+워커 클래스
+- gthread (기본): 워커마다 스레드 GUNICORN_THREADS개. Gemini 호출은 I/O 대기라 다른 스레드가 계속 요청을 처리한다.
+- gevent: pip install gevent 후 GUNICORN_WORKER_CLASS=gevent. Gemini 클라이언트를 REST 전송으로 바꿔
+  호출 중에도 같은 워커의 다른 요청이 처리되도록 한다.
+
+명령: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', str(multiprocessing.cpu_count() * 2 + 1)))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '200'))  # gevent 워커당 동시 연결 수
+
+# 요약 생성/SSE 스트림은 수십 초 걸릴 수 있으므로 기본 30초보다 넉넉하게
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '180'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# 메모리 누수 대비 주기적으로 워커 교체 (0이면 교체하지 않음)
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.getenv('GUNICORN_ERROR_LOG', '-')
+
+# 앱은 워커마다 fork 이후에 로드 (Gemini gRPC 채널과 DB 커넥션은 fork 이후에 만들어야 안전)
+preload_app = False
+
+if worker_class == 'gevent':
+    # gRPC 전송은 gevent와 협력하지 않으므로 REST 전송 사용
+    os.environ.setdefault('GEMINI_TRANSPORT', 'rest')
+
+# 업로드 작업 상태를 워커끼리 공유 (jobs.py 참고)
+if workers > 1:
+    os.environ.setdefault('JOB_STATE_DIR', os.path.join(os.getcwd(), 'job_state'))
+
+# PDF 추출 프로세스 풀은 워커마다 만들어지므로 전체가 CPU 수 정도가 되도록 워커당 크기를 나눔 (pdf_extract.py 참고)
+os.environ.setdefault('PDF_EXTRACT_WORKERS', str(max(1, multiprocessing.cpu_count() // workers)))
@@ -1,4 +1,9 @@
-"""데이터베이스 초기화 스크립트"""
+"""데이터베이스 초기화 스크립트
+
+MySQL 데이터베이스를 만들고(DATABASE_URL을 지정했으면 건너뜀) 모든 테이블을 생성한다.
+운영 서버(gunicorn wsgi:app)는 테이블을 만들지 않으므로 새 데이터베이스에서는 서버를 띄우기 전에 실행한다.
+명령: py -3.12 init_db.py
+"""
 import pymysql
 from dotenv import load_dotenv
 import os
@@ -12,7 +17,8 @@ mysql_host = os.getenv('MYSQL_HOST', 'localhost')
 mysql_port = int(os.getenv('MYSQL_PORT', '3306'))
 mysql_database = os.getenv('MYSQL_DATABASE', 'learningflow')
 
-try:
+
+def create_database():
     # MySQL 서버에 연결 (데이터베이스 없이)
     connection = pymysql.connect(
         host=mysql_host,
@@ -20,19 +26,36 @@ try:
         user=mysql_user,
         password=mysql_password
     )
-    
+
     cursor = connection.cursor()
-    
+
     # 데이터베이스 생성
     cursor.execute(f"CREATE DATABASE IF NOT EXISTS {mysql_database} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
     print(f"✅ 데이터베이스 '{mysql_database}' 생성 완료")
-    
+
     cursor.close()
     connection.close()
-    
-    print("\n이제 Flask 서버를 실행하면 자동으로 테이블이 생성됩니다.")
-    print("명령: py -3.12 app.py")
-    
+
+
+def create_tables():
+    # 데이터베이스가 준비된 뒤에 앱을 불러옴 (이미 있는 테이블은 건너뜀)
+    from app import create_app
+    from models import db
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+    print("✅ 데이터베이스 테이블 생성 완료")
+
+
+try:
+    if not os.getenv('DATABASE_URL'):
+        create_database()
+    create_tables()
+
+    print("\n이제 서버를 실행할 수 있습니다.")
+    print("명령: gunicorn -c gunicorn.conf.py wsgi:app (개발 중에는 py -3.12 app.py)")
+
 except pymysql.err.OperationalError as e:
     print(f"❌ MySQL 연결 실패: {e}")
     print("\n다음을 확인해주세요:")
@@ -0,0 +1,119 @@
+"""업로드 후처리(텍스트 추출, 번역, 요약 생성)를 백그라운드에서 실행하는 작업 큐
+
+작업은 등록한 프로세스에서 실행된다. gunicorn처럼 워커 프로세스가 여러 개이면
+JOB_STATE_DIR을 지정해 작업 상태를 파일로 공유해야 다른 워커에서도 조회할 수 있다.
+"""
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '4'))
+JOB_TTL_SECONDS = int(os.getenv('JOB_TTL_SECONDS', '3600'))  # 완료된 작업 결과 보관 시간
+JOB_STATE_DIR = os.getenv('JOB_STATE_DIR') or None  # 워커 간 작업 상태 공유 디렉토리
+
+if JOB_STATE_DIR:
+    os.makedirs(JOB_STATE_DIR, exist_ok=True)
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='upload-job')
+_jobs = {}
+_lock = threading.Lock()
+
+
+def _state_path(job_id):
+    return os.path.join(JOB_STATE_DIR, f'{job_id}.json')
+
+
+def _write_state(job):
+    """작업 상태를 공유 디렉토리에 기록 (_lock 안에서 호출)"""
+    if not JOB_STATE_DIR:
+        return
+    path = _state_path(job['id'])
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ 작업 상태 기록 실패 [{job['id']}]: {e}")
+
+
+def _read_state(job_id):
+    """다른 워커가 기록한 작업 상태 조회 (없으면 None)"""
+    if not JOB_STATE_DIR or not job_id.isalnum():
+        return None
+    try:
+        with open(_state_path(job_id), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _purge_expired():
+    """보관 시간이 지난 완료/실패 작업 정리 (_lock 안에서 호출)"""
+    now = time.time()
+    expired = [
+        job_id for job_id, job in _jobs.items()
+        if job['status'] in ('done', 'failed') and now - job['updated_at'] > JOB_TTL_SECONDS
+    ]
+    for job_id in expired:
+        del _jobs[job_id]
+        if JOB_STATE_DIR:
+            try:
+                os.remove(_state_path(job_id))
+            except OSError:
+                pass
+
+
+def update_job(job_id, **fields):
+    """작업 상태 갱신"""
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return
+        job.update(fields)
+        job['updated_at'] = time.time()
+        _write_state(job)
+
+
+def get_job(job_id):
+    """작업 상태 조회 (없으면 None)"""
+    with _lock:
+        job = _jobs.get(job_id)
+        if job:
+            return dict(job)
+    return _read_state(job_id)
+
+
+def _run(job_id, func, args, kwargs):
+    update_job(job_id, status='running')
+    try:
+        result = func(job_id, *args, **kwargs)
+        update_job(job_id, status='done', stage='done', result=result)
+    except Exception as e:
+        print(f"❌ 작업 실패 [{job_id}]: {type(e).__name__}: {e}")
+        traceback.print_exc()
+        update_job(job_id, status='failed', error=str(e))
+
+
+def submit_job(func, *args, **kwargs):
+    """func(job_id, *args, **kwargs)를 워커 풀에 등록하고 작업 ID 반환"""
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    with _lock:
+        _purge_expired()
+        _jobs[job_id] = {
+            'id': job_id,
+            'status': 'queued',
+            'stage': 'queued',
+            'result': None,
+            'error': None,
+            'created_at': now,
+            'updated_at': now,
+        }
+        _write_state(_jobs[job_id])
+    _executor.submit(_run, job_id, func, args, kwargs)
+    return job_id
@@ -0,0 +1,103 @@
+"""긴 문서를 조각으로 나누고 조각별 작업을 제한된 병렬도로 실행하는 도구"""
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+# 짧은 줄 중에서 "1. 개요", "2.3 결과", "제 3 장", "Chapter 4", "IV. 결론" 같은 형태를 섹션 제목으로 간주
+SECTION_HEADING = re.compile(
+    r'^\s*(?:제\s*\d+\s*[장절편부]|(?:chapter|part|section)\s+\d+|\d+(?:\.\d+)*[.)]?\s+\S|[IVX]+\.\s+\S)',
+    re.IGNORECASE
+)
+MAX_HEADING_LENGTH = 80
+
+# 조각이 절반 이상 찼을 때 해시가 걸리는 문단/줄에서 끊어, 앞부분이 수정돼도 뒤쪽 조각 경계가 그대로 유지되게 함
+BLOCK_ANCHOR_EVERY = 4  # 문단 약 4개 중 1개
+LINE_ANCHOR_EVERY = 32  # 줄 약 32개 중 1개
+
+
+def _is_anchor(text, every):
+    text = text.strip()
+    return bool(text) and zlib.crc32(text.encode('utf-8')) % every == 0
+
+
+def _is_heading(line):
+    return len(line.strip()) <= MAX_HEADING_LENGTH and bool(SECTION_HEADING.match(line))
+
+
+def _split_blocks(text):
+    """텍스트를 (섹션 시작 여부, 블록) 리스트로 분리. 블록은 섹션 제목 또는 빈 줄에서 끊긴다"""
+    blocks = []
+    current = []
+    current_is_section = False
+    for line in text.splitlines(keepends=True):
+        starts_section = _is_heading(line)
+        if current and (starts_section or not line.strip()):
+            blocks.append((current_is_section, ''.join(current)))
+            current = []
+        if not current:
+            current_is_section = starts_section
+        current.append(line)
+    if current:
+        blocks.append((current_is_section, ''.join(current)))
+    return blocks
+
+
+def _split_long_block(block, max_chars):
+    """max_chars보다 긴 블록을 줄 경계(그래도 길면 글자 수)로 분리"""
+    pieces = []
+    current = ''
+    for line in block.splitlines(keepends=True):
+        while len(line) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ''
+            pieces.append(line[:max_chars])
+            line = line[max_chars:]
+        anchor_break = len(current) >= max_chars // 2 and _is_anchor(line, LINE_ANCHOR_EVERY)
+        if current and (anchor_break or len(current) + len(line) > max_chars):
+            pieces.append(current)
+            current = ''
+        current += line
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_into_chunks(text, max_chars):
+    """텍스트를 max_chars 이하의 조각 리스트로 분리
+
+    섹션 제목 경계를 가장 우선하고, 그다음 문단(빈 줄), 줄 경계 순으로 끊는다.
+    조각이 절반 이상 찼을 때 새 섹션이 시작되거나 앵커 문단이 나오면 그 자리에서 끊는다.
+    경계가 내용으로 정해지므로 문서 일부가 바뀌어도 나머지 조각은 이전과 같게 나뉜다 (조각 요약 캐시 재사용).
+    """
+    chunks = []
+    current = ''
+    for is_section, block in _split_blocks(text):
+        pieces = _split_long_block(block, max_chars) if len(block) > max_chars else [block]
+        for index, piece in enumerate(pieces):
+            half_full = len(current) >= max_chars // 2
+            section_break = half_full and is_section and index == 0
+            anchor_break = half_full and index == 0 and _is_anchor(piece, BLOCK_ANCHOR_EVERY)
+            if current and (section_break or anchor_break or len(current) + len(piece) > max_chars):
+                chunks.append(current)
+                current = ''
+            current += piece
+    if current.strip():
+        chunks.append(current)
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+def map_concurrently(func, items, workers):
+    """func(index, item)을 최대 workers개씩 병렬 실행하고 입력 순서대로 결과 반환 (실패한 항목은 None)"""
+    if not items:
+        return []
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items)))) as pool:
+        futures = [pool.submit(func, index, item) for index, item in enumerate(items)]
+        for index, future in enumerate(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"⚠️ {index + 1}번째 조각 처리 실패: {type(e).__name__}: {e}")
+                results.append(None)
+    return results
@@ -0,0 +1,77 @@
+"""learning_session_data 압축 저장 마이그레이션 스크립트
+
+- summary_data/quiz_data/wrong_notes_data 컬럼을 MEDIUMTEXT에서 MEDIUMBLOB으로 변경 (MySQL)
+- 버전 바이트가 없는 이전 JSON 원문을 압축 형식(blob_codec)으로 다시 저장
+
+여러 번 실행해도 안전하다. 이미 압축된 값은 건너뛴다.
+명령: py -3.12 migrate_compress_blobs.py [--batch-size 500]
+"""
+import json
+import sys
+
+from sqlalchemy import text
+
+from app import create_app
+from blob_codec import FORMAT_ZLIB_JSON, encode_json
+from models import db
+
+app = create_app()
+
+DATA_COLUMNS = ('summary_data', 'quiz_data', 'wrong_notes_data')
+
+
+def _needs_encoding(value):
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return True
+    return bytes(value[:1]) != bytes([FORMAT_ZLIB_JSON])
+
+
+def migrate(batch_size=500):
+    with app.app_context():
+        engine = db.engine
+
+        if engine.dialect.name == 'mysql':
+            with engine.begin() as conn:
+                for name in DATA_COLUMNS:
+                    conn.execute(text(f"ALTER TABLE learning_session_data MODIFY {name} MEDIUMBLOB NULL"))
+            print("✅ 컬럼 형식 변경 완료 (MEDIUMBLOB)")
+
+        columns = ', '.join(DATA_COLUMNS)
+        converted = 0
+        last_id = 0
+        while True:
+            with engine.begin() as conn:
+                rows = conn.execute(text(
+                    f"SELECT session_id, {columns} FROM learning_session_data "
+                    "WHERE session_id > :last_id ORDER BY session_id LIMIT :limit"
+                ), {'last_id': last_id, 'limit': batch_size}).fetchall()
+                if not rows:
+                    break
+
+                for row in rows:
+                    updates = {}
+                    for name, value in zip(DATA_COLUMNS, row[1:]):
+                        if not _needs_encoding(value):
+                            continue
+                        raw = value if isinstance(value, str) else bytes(value).decode('utf-8')
+                        updates[name] = encode_json(json.loads(raw))
+                    if updates:
+                        assignments = ', '.join(f"{name} = :{name}" for name in updates)
+                        conn.execute(
+                            text(f"UPDATE learning_session_data SET {assignments} WHERE session_id = :session_id"),
+                            {**updates, 'session_id': row[0]}
+                        )
+                        converted += 1
+                last_id = rows[-1][0]
+            print(f"📦 {last_id}번 세션까지 확인, {converted}건 압축")
+
+        print("✅ 마이그레이션 완료")
+
+
+if __name__ == '__main__':
+    size = 500
+    if '--batch-size' in sys.argv:
+        size = int(sys.argv[sys.argv.index('--batch-size') + 1])
+    migrate(batch_size=size)
@@ -0,0 +1,98 @@
+"""업로드 파일 내용 주소 저장 마이그레이션 스크립트
+
+- learning_sessions에 content_hash 컬럼과 인덱스 추가
+- 기존 업로드 파일의 SHA-256을 계산해 <해시>.<확장자>로 옮기고 세션의 file_path/content_hash 갱신
+- 세션 ID로 저장된 추출 텍스트/검색 인덱스를 해시 키로 이동
+
+여러 번 실행해도 안전하다. 파일이 없는 세션은 건너뛴다.
+명령: py -3.12 migrate_content_hash.py
+"""
+import hashlib
+import os
+
+from sqlalchemy import inspect, text
+
+from app import create_app, UPLOAD_FOLDER
+from blob_store import CHUNK_BYTES, blob_filename
+from models import db, LearningSession
+from text_store import TEXT_FOLDER
+
+app = create_app()
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def move_text(session_id, content_hash):
+    """세션 ID 키의 텍스트/인덱스를 해시 키로 이동 (해시 키 파일이 이미 있으면 삭제만)"""
+    for suffix in ('.txt.gz', '.idx.gz'):
+        old_path = os.path.join(TEXT_FOLDER, f'{session_id}{suffix}')
+        new_path = os.path.join(TEXT_FOLDER, f'{content_hash}{suffix}')
+        if not os.path.exists(old_path):
+            continue
+        if os.path.exists(new_path):
+            os.remove(old_path)
+        else:
+            os.replace(old_path, new_path)
+
+
+def migrate():
+    with app.app_context():
+        engine = db.engine
+        columns = {column['name'] for column in inspect(engine).get_columns('learning_sessions')}
+        if 'content_hash' not in columns:
+            with engine.begin() as conn:
+                conn.execute(text("ALTER TABLE learning_sessions ADD COLUMN content_hash VARCHAR(64) NULL"))
+            print("✅ content_hash 컬럼 추가")
+        for index in LearningSession.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+        sessions = LearningSession.query.filter(LearningSession.content_hash.is_(None)).order_by(LearningSession.id).all()
+        migrated = 0
+        missing = 0
+        old_paths = set()
+        for session in sessions:
+            if not os.path.exists(session.file_path):
+                missing += 1
+                continue
+            content_hash = file_sha256(session.file_path)
+            extension = session.file_type or session.file_path.rsplit('.', 1)[-1].lower()
+            new_path = os.path.join(UPLOAD_FOLDER, blob_filename(content_hash, extension))
+            if not os.path.exists(new_path):
+                # 같은 파일을 다른 세션이 아직 참조할 수 있으므로 복사 후 마지막에 정리
+                with open(session.file_path, 'rb') as src, open(new_path, 'wb') as dst:
+                    while True:
+                        chunk = src.read(CHUNK_BYTES)
+                        if not chunk:
+                            break
+                        dst.write(chunk)
+            move_text(session.id, content_hash)
+            if session.file_path != new_path:
+                old_paths.add(session.file_path)
+            session.file_path = new_path
+            session.content_hash = content_hash
+            migrated += 1
+        db.session.commit()
+        print(f"📦 세션 {migrated}건 이동 (파일 없음 {missing}건)")
+
+        # 옮긴 세션의 이전 파일 중 더 이상 어떤 세션도 참조하지 않는 파일 정리
+        referenced = {path for (path,) in db.session.query(LearningSession.file_path).all()}
+        removed = 0
+        for path in old_paths - referenced:
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+        print(f"🧹 이전 파일 {removed}개 삭제")
+        print("✅ 마이그레이션 완료")
+
+
+if __name__ == '__main__':
+    migrate()
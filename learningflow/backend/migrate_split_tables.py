@@ -0,0 +1,111 @@
+"""learning_sessions 테이블 분리 마이그레이션 스크립트
+
+- learning_sessions에 사용자별 조회용 복합 인덱스 추가
+- summary_data/quiz_data/wrong_notes_data를 learning_session_data 테이블로 이동 (updated_at은 세션 생성 시각으로 채움)
+- is_wrong=1인 오답 행을 wrong_answers 테이블로 옮기고 learning_sessions에서 삭제
+- wrong_answers에 파일명 사본 컬럼 추가 (파일 세션이 삭제되어도 오답노트에 파일명 표시)
+
+여러 번 실행해도 안전하다. --drop-old-columns를 주면 옮긴 뒤 이전 컬럼을 삭제한다.
+명령: py -3.12 migrate_split_tables.py [--drop-old-columns]
+"""
+import sys
+
+from sqlalchemy import inspect, text
+
+from app import create_app
+from models import db, LearningSession
+
+app = create_app()
+
+OLD_DATA_COLUMNS = ('summary_data', 'quiz_data', 'wrong_notes_data')
+OLD_WRONG_COLUMNS = ('question', 'user_answer', 'correct_answer', 'explanation')
+OWN_INDEXES = ('ix_learning_sessions_user_wrong_created',)
+FILENAME_COLUMNS = ('custom_filename', 'original_filename')
+
+
+def migrate(drop_old_columns=False):
+    with app.app_context():
+        engine = db.engine
+
+        # 새 테이블 생성 (이미 있으면 건너뜀)
+        db.create_all()
+
+        # 기존 테이블에는 create_all이 인덱스를 추가하지 않으므로 직접 생성
+        # (이 마이그레이션이 추가하는 인덱스만. content_hash 인덱스는 migrate_content_hash.py에서 컬럼과 함께 생성)
+        for index in LearningSession.__table__.indexes:
+            if index.name in OWN_INDEXES:
+                index.create(bind=engine, checkfirst=True)
+        print("✅ 테이블/인덱스 준비 완료")
+
+        # 이전 버전의 이 마이그레이션으로 만든 wrong_answers에는 파일명 사본 컬럼이 없음
+        wrong_columns = {column['name'] for column in inspect(engine).get_columns('wrong_answers')}
+        with engine.begin() as conn:
+            for name in FILENAME_COLUMNS:
+                if name not in wrong_columns:
+                    conn.execute(text(f"ALTER TABLE wrong_answers ADD COLUMN {name} VARCHAR(255) NULL"))
+                    print(f"➕ wrong_answers.{name} 컬럼 추가")
+
+        columns = {column['name'] for column in inspect(engine).get_columns('learning_sessions')}
+        has_old_data = all(name in columns for name in OLD_DATA_COLUMNS)
+        has_old_wrong = all(name in columns for name in OLD_WRONG_COLUMNS)
+
+        with engine.begin() as conn:
+            if has_old_data:
+                moved = conn.execute(text("""
+                    INSERT INTO learning_session_data (session_id, summary_data, quiz_data, wrong_notes_data, updated_at)
+                    SELECT s.id, s.summary_data, s.quiz_data, s.wrong_notes_data, COALESCE(s.created_at, CURRENT_TIMESTAMP)
+                    FROM learning_sessions s
+                    WHERE s.is_wrong = 0
+                      AND (s.summary_data IS NOT NULL OR s.quiz_data IS NOT NULL OR s.wrong_notes_data IS NOT NULL)
+                      AND NOT EXISTS (SELECT 1 FROM learning_session_data d WHERE d.session_id = s.id)
+                """)).rowcount
+                print(f"📦 요약/퀴즈/오답 데이터 {moved}건 이동")
+
+            # updated_at 기본값은 파이썬 쪽에서만 적용되므로, 이전 버전의 이 마이그레이션으로 옮긴 행은 비어 있음
+            filled = conn.execute(text("""
+                UPDATE learning_session_data
+                SET updated_at = COALESCE(
+                    (SELECT s.created_at FROM learning_sessions s WHERE s.id = learning_session_data.session_id),
+                    CURRENT_TIMESTAMP)
+                WHERE updated_at IS NULL
+            """)).rowcount
+            print(f"🕒 세션 데이터 수정 시각 {filled}건 채움")
+
+            if has_old_wrong:
+                # 이전 오답 행은 파일 정보만 복사해 두었으므로, 같은 파일의 가장 최근 업로드 세션에 연결
+                moved = conn.execute(text("""
+                    INSERT INTO wrong_answers (user_id, session_id, custom_filename, original_filename,
+                                               question, user_answer, correct_answer, explanation, created_at)
+                    SELECT w.user_id,
+                           (SELECT b.id FROM learning_sessions b
+                             WHERE b.user_id = w.user_id AND b.is_wrong = 0 AND b.file_path = w.file_path
+                               AND b.created_at <= w.created_at
+                             ORDER BY b.created_at DESC, b.id DESC LIMIT 1),
+                           w.custom_filename, w.original_filename,
+                           w.question, w.user_answer, w.correct_answer, w.explanation, w.created_at
+                    FROM learning_sessions w
+                    WHERE w.is_wrong = 1
+                """)).rowcount
+                conn.execute(text("DELETE FROM learning_sessions WHERE is_wrong = 1"))
+                print(f"📝 오답 {moved}건 이동")
+
+            # 파일명 사본이 없는 오답은 연결된 세션의 파일명으로 채움
+            filled = conn.execute(text("""
+                UPDATE wrong_answers
+                SET custom_filename = (SELECT s.custom_filename FROM learning_sessions s WHERE s.id = wrong_answers.session_id),
+                    original_filename = (SELECT s.original_filename FROM learning_sessions s WHERE s.id = wrong_answers.session_id)
+                WHERE custom_filename IS NULL AND session_id IS NOT NULL
+            """)).rowcount
+            print(f"🏷️ 오답 파일명 {filled}건 채움")
+
+            if drop_old_columns:
+                for name in OLD_DATA_COLUMNS + OLD_WRONG_COLUMNS:
+                    if name in columns:
+                        conn.execute(text(f"ALTER TABLE learning_sessions DROP COLUMN {name}"))
+                print("🧹 이전 컬럼 삭제 완료")
+
+        print("✅ 마이그레이션 완료")
+
+
+if __name__ == '__main__':
+    migrate(drop_old_columns='--drop-old-columns' in sys.argv)
@@ -1,6 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-from sqlalchemy import Text
+from sqlalchemy.orm import deferred
+from blob_codec import CompressedJSON
 
 db = SQLAlchemy()
 
@@ -25,9 +26,13 @@ class User(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
-# 파일 업로드부터 오답노트까지 모든 정보를 담는 통합 테이블
+# 업로드한 파일(학습 세션) 정보. 큰 데이터와 오답은 별도 테이블에 저장
 class LearningSession(db.Model):
     __tablename__ = 'learning_sessions'
+    __table_args__ = (
+        # 사용자별 목록 조회 (user_id + is_wrong 조건, created_at/id 최신순)
+        db.Index('ix_learning_sessions_user_wrong_created', 'user_id', 'is_wrong', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -36,24 +41,22 @@ class LearningSession(db.Model):
     custom_filename = db.Column(db.String(255), nullable=False)  # 사용자 지정 파일명
     original_filename = db.Column(db.String(255), nullable=False)  # 원본 파일명
     file_path = db.Column(db.String(500), nullable=False)
+    content_hash = db.Column(db.String(64), nullable=True, index=True)  # 파일 내용 SHA-256 (같은 내용의 세션끼리 파일 공유)
     file_size = db.Column(db.Integer)
     file_type = db.Column(db.String(10))
     category = db.Column(db.String(50), nullable=True)  # 카테고리 (과학, 수학, 영어, 논문 등)
     
-    # 퀴즈/오답 정보
-    question = db.Column(db.Text, nullable=True)  # 문제 (오답일 때만)
-    user_answer = db.Column(db.Text, nullable=True)  # 사용자 답변
-    correct_answer = db.Column(db.Text, nullable=True)  # 정답
-    explanation = db.Column(db.Text, nullable=True)  # 해설
-    is_wrong = db.Column(db.Boolean, default=False)  # 오답 여부
-    summary_data = db.Column(Text(length=16777215), nullable=True)  # MEDIUMTEXT (16MB) - 긴 요약 지원
-    quiz_data = db.Column(Text(length=16777215), nullable=True)
-    wrong_notes_data = db.Column(Text(length=16777215), nullable=True)
+    is_wrong = db.Column(db.Boolean, default=False)  # 이전 스키마 호환용 (오답은 wrong_answers 테이블로 이동)
     is_saved = db.Column(db.Boolean, default=False)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    def to_dict(self):
+    # 요약/퀴즈/오답 데이터는 상세 조회 때만 불러옴
+    data = db.relationship('LearningSessionData', uselist=False, lazy='select', cascade='all, delete-orphan')
+    wrong_answers = db.relationship('WrongAnswer', back_populates='session', lazy='select')
+    
+    def to_list_dict(self):
+        """목록용 요약 정보 (큰 데이터 제외)"""
         return {
             'id': self.id,
             'custom_filename': self.custom_filename,
@@ -61,14 +64,69 @@ class LearningSession(db.Model):
             'file_size': self.file_size,
             'file_type': self.file_type,
             'category': self.category,
+            'is_saved': self.is_saved,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+    
+    def to_dict(self):
+        data = self.data
+        return {
+            **self.to_list_dict(),
+            'summary_data': data.json_text('summary_data') if data else None,
+            'quiz_data': data.json_text('quiz_data') if data else None,
+            'wrong_notes_data': data.json_text('wrong_notes_data') if data else None
+        }
+
+# 학습 세션별로 저장한 요약/퀴즈/오답노트 JSON (압축 BLOB, 접근할 때 불러와 압축 해제)
+class LearningSessionData(db.Model):
+    __tablename__ = 'learning_session_data'
+    
+    session_id = db.Column(db.Integer, db.ForeignKey('learning_sessions.id', ondelete='CASCADE'), primary_key=True)
+    summary_data = deferred(db.Column(CompressedJSON(), nullable=True))  # MEDIUMBLOB (16MB) - 긴 요약 지원
+    quiz_data = deferred(db.Column(CompressedJSON(), nullable=True))
+    wrong_notes_data = deferred(db.Column(CompressedJSON(), nullable=True))
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def json_text(self, column):
+        """컬럼 값을 JSON 문자열로 반환 (없으면 None)"""
+        encoded = getattr(self, column)
+        return encoded.text if encoded is not None else None
+
+# 문제별 오답 기록
+class WrongAnswer(db.Model):
+    __tablename__ = 'wrong_answers'
+    __table_args__ = (
+        db.Index('ix_wrong_answers_user_created', 'user_id', 'created_at', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # 파일이 삭제되어도 오답 기록은 남김
+    session_id = db.Column(db.Integer, db.ForeignKey('learning_sessions.id', ondelete='SET NULL'), nullable=True, index=True)
+    # 저장할 때의 파일명 사본 (파일 세션이 삭제된 뒤에도 표시)
+    custom_filename = db.Column(db.String(255), nullable=True)
+    original_filename = db.Column(db.String(255), nullable=True)
+    
+    question = db.Column(db.Text, nullable=True)  # 문제
+    user_answer = db.Column(db.Text, nullable=True)  # 사용자 답변
+    correct_answer = db.Column(db.Text, nullable=True)  # 정답
+    explanation = db.Column(db.Text, nullable=True)  # 해설
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    session = db.relationship('LearningSession', back_populates='wrong_answers', lazy='joined')
+    
+    def to_dict(self):
+        session = self.session
+        return {
+            'id': self.id,
+            'session_id': self.session_id,
+            'custom_filename': session.custom_filename if session else self.custom_filename,
+            'original_filename': session.original_filename if session else self.original_filename,
             'question': self.question,
             'user_answer': self.user_answer,
             'correct_answer': self.correct_answer,
             'explanation': self.explanation,
-            'is_wrong': self.is_wrong,
-            'summary_data': self.summary_data,
-            'quiz_data': self.quiz_data,
-            'wrong_notes_data': self.wrong_notes_data,
-            'is_saved': self.is_saved,
+            'is_wrong': True,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
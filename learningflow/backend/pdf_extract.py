@@ -0,0 +1,204 @@
+"""PDF 텍스트 추출 엔진 (페이지 범위 병렬 처리, 페이지 스트리밍, 페이지별 타임아웃, 페이지 캐시)
+
+load_page/save_page를 넘기면 페이지 내용 해시(page_fingerprint)별로 추출 텍스트를 재사용해
+일부만 수정된 PDF는 바뀐 페이지만 다시 추출한다.
+"""
+import hashlib
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+import PyPDF2
+from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+# 프로세스(워커)당 풀 크기. gunicorn.conf.py는 전체가 CPU 수 정도가 되도록 CPU 수 ÷ 워커 수로 지정한다.
+PDF_EXTRACT_WORKERS = int(os.getenv('PDF_EXTRACT_WORKERS', str(os.cpu_count() or 1)))
+PDF_PAGE_TIMEOUT = float(os.getenv('PDF_PAGE_TIMEOUT', '10'))  # 페이지당 최대 추출 시간(초)
+PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', '16'))  # 이보다 작으면 단일 프로세스로 처리
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class PageTimeout(Exception):
+    pass
+
+
+def _get_pool():
+    """프로세스 풀은 처음 필요할 때 한 번만 생성하여 재사용"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PDF_EXTRACT_WORKERS)
+        return _pool
+
+
+def _on_alarm(signum, frame):
+    raise PageTimeout()
+
+
+def _can_use_alarm():
+    """SIGALRM 타임아웃은 메인 스레드에서만 설정할 수 있음 (Windows에는 없음)"""
+    return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+
+def _extract_page(page, page_timeout):
+    """한 페이지 추출. SIGALRM을 쓸 수 있으면 페이지별 타임아웃 적용"""
+    if not (page_timeout and _can_use_alarm()):
+        return page.extract_text() or ''
+
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, page_timeout)
+    try:
+        return page.extract_text() or ''
+    except PageTimeout:
+        return None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _extract_pages(file_path, indices, page_timeout):
+    """워커 프로세스: indices 페이지의 텍스트 리스트 반환 (시간 초과 페이지는 None)"""
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [_extract_page(pdf_reader.pages[i], page_timeout) for i in indices]
+
+
+def count_pages(file_path):
+    with open(file_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+def _hash_pdf_object(digest, obj, seen):
+    """PDF 객체를 참조를 따라가며 해시에 반영 (스트림은 내용까지, /Parent는 제외)"""
+    if isinstance(obj, IndirectObject):
+        ref = (obj.idnum, obj.generation)
+        if ref in seen:
+            digest.update(f'@{seen[ref]};'.encode('utf-8'))  # 이미 반영한 객체는 처음 반영한 순서로 표시
+            return
+        seen[ref] = len(seen)
+        obj = obj.get_object()
+    if isinstance(obj, StreamObject):
+        data = obj.get_data()
+        digest.update(f'stream{len(data)}:'.encode('utf-8'))
+        digest.update(data)
+    if isinstance(obj, DictionaryObject):
+        digest.update(b'<<')
+        for key in sorted(obj.keys()):
+            if key in ('/Parent', '/Length'):
+                continue
+            digest.update(f'{key} '.encode('utf-8'))
+            _hash_pdf_object(digest, obj.raw_get(key), seen)
+        digest.update(b'>>')
+    elif isinstance(obj, ArrayObject):
+        digest.update(b'[')
+        for item in obj:
+            _hash_pdf_object(digest, item, seen)
+        digest.update(b']')
+    elif not isinstance(obj, StreamObject):
+        digest.update(f'{obj!r};'.encode('utf-8'))
+
+
+def page_fingerprint(page):
+    """페이지 내용 스트림과 리소스 전체(폼 XObject, 글꼴, 이미지를 재귀적으로)로 만든 SHA-256
+
+    텍스트를 추출하지 않고 계산한다. 같은 해시의 페이지는 어느 문서, 어느 위치에 있든 추출 결과가 같다고 본다.
+    """
+    digest = hashlib.sha256()
+    contents = page.get_contents()
+    digest.update(contents.get_data() if contents is not None else b'')
+    seen = {}
+    for key in ('/Resources', '/Rotate'):
+        digest.update(f'{key} '.encode('utf-8'))
+        value = page.raw_get(key) if key in page else None
+        if value is not None:
+            _hash_pdf_object(digest, value, seen)
+    return digest.hexdigest()
+
+
+def _page_groups(indices, workers):
+    # 워커당 여러 조각으로 나눠 느린 구간이 있어도 부하가 고르게 분산되도록 함
+    chunk = max(4, -(-len(indices) // (workers * 4)))
+    return [indices[start:start + chunk] for start in range(0, len(indices), chunk)]
+
+
+def iter_pdf_pages(file_path, workers=None, page_timeout=None, load_page=None, save_page=None):
+    """PDF 페이지 텍스트를 페이지 순서대로 하나씩 반환하는 제너레이터
+
+    추출할 페이지가 적으면 현재 프로세스에서, 많으면 프로세스 풀에 나눠 추출한다.
+    단, 현재 스레드에서 페이지별 타임아웃을 걸 수 없으면(업로드 작업 스레드 등) 페이지가 적어도 풀에서 추출한다.
+    제한 시간을 넘긴 페이지는 빈 문자열로 건너뛴다.
+    load_page(해시)가 텍스트를 반환하는 페이지는 추출하지 않고, 새로 추출한 페이지는 save_page(해시, 텍스트)로 저장한다.
+    """
+    workers = workers or PDF_EXTRACT_WORKERS
+    page_timeout = PDF_PAGE_TIMEOUT if page_timeout is None else page_timeout
+
+    cached = {}
+    fingerprints = None
+
+    def finish(index, page_text):
+        if page_text is None:
+            print(f"⚠️ {index + 1}페이지 추출 시간 초과 - 건너뜀")
+            return ''
+        if save_page and fingerprints:
+            save_page(fingerprints[index], page_text)
+        return page_text
+
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        page_count = len(pdf_reader.pages)
+        if load_page:
+            fingerprints = [page_fingerprint(page) for page in pdf_reader.pages]
+            for index, fingerprint in enumerate(fingerprints):
+                page_text = load_page(fingerprint)
+                if page_text is not None:
+                    cached[index] = page_text
+            print(f"📄 페이지 캐시: {page_count}쪽 중 {len(cached)}쪽 재사용, {page_count - len(cached)}쪽 추출")
+        missing = [index for index in range(page_count) if index not in cached]
+
+        in_process = workers <= 1 or len(missing) < PARALLEL_MIN_PAGES
+        if in_process and (not page_timeout or _can_use_alarm()):
+            for index, page in enumerate(pdf_reader.pages):
+                yield cached[index] if index in cached else finish(index, _extract_page(page, page_timeout))
+            return
+
+    if not missing:
+        for index in range(page_count):
+            yield cached[index]
+        return
+
+    pool = _get_pool()
+    groups = _page_groups(missing, max(1, workers))
+    futures = [pool.submit(_extract_pages, file_path, group, page_timeout) for group in groups]
+    extracted = {}
+    try:
+        next_group = 0
+        for index in range(page_count):
+            if index in cached:
+                yield cached[index]
+                continue
+            while index not in extracted:
+                group, future = groups[next_group], futures[next_group]
+                next_group += 1
+                try:
+                    # 워커 안의 페이지별 타임아웃이 동작하지 않는 환경을 위한 조각 단위 상한
+                    texts = future.result(timeout=page_timeout * len(group) if page_timeout else None)
+                except FutureTimeoutError:
+                    print(f"⚠️ {group[0] + 1}~{group[-1] + 1}페이지 추출 시간 초과 - 건너뜀")
+                    texts = [None] * len(group)
+                extracted.update(zip(group, texts))
+            yield finish(index, extracted.pop(index))
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def extract_pdf_text(file_path, workers=None, page_timeout=None, load_page=None, save_page=None):
+    """PDF 전체 텍스트 추출 (페이지마다 줄바꿈, 빈 페이지 제외)"""
+    return ''.join(
+        f'{page_text}\n'
+        for page_text in iter_pdf_pages(file_path, workers, page_timeout, load_page, save_page)
+        if page_text
+    )
@@ -0,0 +1,196 @@
+"""문서별 문제 은행 (업로드 후 백그라운드에서 미리 생성한 퀴즈 문제 모음)
+
+문제는 유형(objective/truefalse/short)별로 QUESTION_BANK_DIR/<문서 키>.json.gz에 저장한다.
+퀴즈 요청은 저장된 문제에서 무작위로 뽑아 바로 응답하고, 문제가 목표 개수보다 적으면
+백그라운드에서 채운다. 같은 문서를 동시에 두 번 채우지 않는다.
+
+워커 프로세스가 여러 개여도 파일 수정 시각을 비교해 다른 워커가 채운 문제를 다시 읽는다.
+"""
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+QUESTION_BANK_DIR = os.getenv('QUESTION_BANK_DIR', 'question_banks')
+QUESTION_BANK_SIZE = int(os.getenv('QUESTION_BANK_SIZE', '30'))  # 유형별 목표 문제 수
+QUESTION_BANK_BATCH = int(os.getenv('QUESTION_BANK_BATCH', '10'))  # 한 번의 생성 호출로 요청할 문제 수
+QUESTION_BANK_WORKERS = int(os.getenv('QUESTION_BANK_WORKERS', '2'))
+QUESTION_BANK_RETRY_SECONDS = 60  # 채우기에 실패한 문서는 이 시간 동안 다시 시도하지 않음
+QUESTION_BANK_SATURATED_SECONDS = 3600  # 새 문제가 더 나오지 않은 유형은 이 시간 동안 채우지 않음
+
+QUIZ_TYPES = ('objective', 'truefalse', 'short')
+
+
+def _normalize(question):
+    return ' '.join(str(question.get('question', '')).split()).lower()
+
+
+class QuestionBank:
+    """문서 키별 문제 은행 (스레드 안전)
+
+    version이 바뀌면(프롬프트/모델 변경) 이전에 저장된 문제는 없는 것으로 본다.
+    """
+
+    def __init__(self, folder=QUESTION_BANK_DIR, version=None, target_size=QUESTION_BANK_SIZE,
+                 batch_size=QUESTION_BANK_BATCH, workers=QUESTION_BANK_WORKERS):
+        self.folder = folder
+        self.version = str(version)
+        self.target_size = target_size
+        self.batch_size = batch_size
+        self._banks = {}  # key -> (파일 수정 시각, {유형: [문제]})
+        self._filling = set()
+        self._failed_at = {}
+        self._saturated_at = {}  # (key, 유형) -> 새 문제가 나오지 않은 시각
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='question-bank')
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, key):
+        key = str(key)
+        if not key.isalnum():
+            raise ValueError(f'잘못된 문제 은행 키: {key}')
+        return os.path.join(self.folder, f'{key}.json.gz')
+
+    def _load(self, key):
+        """문제 은행 조회 (_lock 안에서 호출). 다른 프로세스가 파일을 바꿨으면 다시 읽음"""
+        path = self._path(key)
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            self._banks.pop(key, None)
+            return {}
+        entry = self._banks.get(key)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 문제 은행 읽기 실패 [{key}]: {e}")
+            return {}
+        bank = stored.get('questions', {}) if stored.get('version') == self.version else {}
+        self._banks[key] = (mtime, bank)
+        return bank
+
+    def _save(self, key, bank):
+        """문제 은행 저장 (_lock 안에서 호출)"""
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+                json.dump({'version': self.version, 'questions': bank}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._banks[key] = (os.stat(path).st_mtime, bank)
+        except OSError as e:
+            print(f"⚠️ 문제 은행 저장 실패 [{key}]: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def counts(self, key):
+        """유형별 저장된 문제 수"""
+        with self._lock:
+            bank = self._load(key)
+            return {quiz_type: len(bank.get(quiz_type, [])) for quiz_type in QUIZ_TYPES}
+
+    def add(self, key, quiz_type, questions):
+        """문제 추가 (같은 질문은 제외). 새로 추가된 개수 반환"""
+        with self._lock:
+            bank = dict(self._load(key))
+            pool = list(bank.get(quiz_type, []))
+            seen = {_normalize(question) for question in pool}
+            added = 0
+            for question in questions or []:
+                if not isinstance(question, dict) or not question.get('question'):
+                    continue
+                normalized = _normalize(question)
+                if normalized in seen:
+                    continue
+                seen.add(normalized)
+                pool.append({k: v for k, v in question.items() if k != 'id'})
+                added += 1
+            if added:
+                bank[quiz_type] = pool
+                self._save(key, bank)
+            return added
+
+    def sample(self, key, quiz_type, count):
+        """저장된 문제에서 count개를 무작위로 뽑아 반환 (부족하면 None)"""
+        with self._lock:
+            pool = self._load(key).get(quiz_type, [])
+            if len(pool) < count:
+                return None
+            picked = random.sample(pool, count)
+        return [dict(question, id=index) for index, question in enumerate(picked, 1)]
+
+    def _saturated(self, key, quiz_type):
+        """최근 채우기에서 새 문제가 나오지 않은 유형인지 (_lock 안에서 호출)"""
+        return time.time() - self._saturated_at.get((key, quiz_type), 0) < QUESTION_BANK_SATURATED_SECONDS
+
+    def needs_fill(self, key, count=0):
+        """유형 중 하나라도 목표 개수(또는 요청 개수의 2배)보다 적으면 True (더 채울 수 없는 유형은 제외)"""
+        wanted = max(self.target_size, count * 2)
+        counts = self.counts(key)
+        with self._lock:
+            return any(size < wanted and not self._saturated(key, quiz_type) for quiz_type, size in counts.items())
+
+    def schedule_fill(self, key, generate, count=0):
+        """문제가 부족하면 백그라운드에서 채우기 시작 (이미 채우는 중이거나 최근 실패했으면 무시)
+
+        generate(quiz_type, count, existing_questions)는 새 문제 리스트를 반환해야 한다.
+        """
+        with self._lock:
+            if key in self._filling or time.time() - self._failed_at.get(key, 0) < QUESTION_BANK_RETRY_SECONDS:
+                return False
+            self._filling.add(key)
+        if not self.needs_fill(key, count):
+            with self._lock:
+                self._filling.discard(key)
+            return False
+        self._executor.submit(self._fill, key, generate, max(self.target_size, count * 2))
+        return True
+
+    def _fill(self, key, generate, wanted):
+        print(f"🏦 문제 은행 채우기 시작 [{key[:12]}]")
+        failed = False
+        try:
+            for quiz_type in QUIZ_TYPES:
+                while True:
+                    with self._lock:
+                        pool = list(self._load(key).get(quiz_type, []))
+                        saturated = self._saturated(key, quiz_type)
+                    if len(pool) >= wanted or saturated:
+                        break
+                    try:
+                        questions = generate(quiz_type, min(self.batch_size, wanted - len(pool)), pool)
+                    except Exception as e:
+                        print(f"⚠️ 문제 은행 생성 실패 [{key[:12]}/{quiz_type}]: {type(e).__name__}: {e}")
+                        failed = True
+                        break
+                    if not self.add(key, quiz_type, questions):
+                        # 중복 문제만 나오면 이 유형은 한동안 채우지 않음 (퀴즈 요청마다 다시 채우지 않도록)
+                        print(f"🏦 문제 은행 [{key[:12]}/{quiz_type}] 새 문제 없음 - {len(pool)}개에서 중단")
+                        with self._lock:
+                            self._saturated_at[(key, quiz_type)] = time.time()
+                        break
+            print(f"🏦 문제 은행 채우기 완료 [{key[:12]}] {self.counts(key)}")
+        finally:
+            with self._lock:
+                self._filling.discard(key)
+                if failed:
+                    self._failed_at[key] = time.time()
+                else:
+                    self._failed_at.pop(key, None)
+
+    def delete(self, key):
+        """문서의 문제 은행 삭제"""
+        with self._lock:
+            self._banks.pop(key, None)
+            for quiz_type in QUIZ_TYPES:
+                self._saturated_at.pop((key, quiz_type), None)
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
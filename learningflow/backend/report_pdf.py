@@ -0,0 +1,252 @@
+"""학습 결과 리포트 PDF 생성
+
+한글 폰트와 스타일은 프로세스마다 한 번만 준비해 재사용한다.
+
+폰트 선택 순서
+1. REPORT_FONT_PATH (TTF/TTC, TTC는 REPORT_FONT_INDEX로 글꼴 선택)
+2. 운영체제별 기본 한글 폰트 (나눔고딕, Noto Sans CJK, 맑은 고딕, Apple SD 고딕)
+3. 내장 CID 폰트 HYSMyeongJo-Medium (파일에 글꼴을 넣지 않고 PDF 뷰어의 한글 폰트 사용)
+
+TTF 폰트는 리포트에 사용된 글자만 서브셋으로 포함하므로 폰트 파일 전체가 PDF에 들어가지 않는다.
+REPORT_FONT_EMBED=none이면 폰트를 포함하지 않는 CID 폰트를 바로 사용한다.
+
+렌더링한 리포트는 SpooledTemporaryFile에 쓰며, REPORT_SPOOL_MAX_BYTES를 넘으면 디스크로 옮겨진다.
+REPORT_CACHE_DIR을 지정하면 저장된 학습 세션의 리포트를 버전별로 디스크에 보관한다.
+"""
+import os
+import shutil
+import tempfile
+import threading
+from xml.sax.saxutils import escape
+
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+
+REPORT_FONT_PATH = os.getenv('REPORT_FONT_PATH') or None
+REPORT_FONT_INDEX = int(os.getenv('REPORT_FONT_INDEX', '0'))
+REPORT_FONT_EMBED = os.getenv('REPORT_FONT_EMBED', 'subset').lower()  # subset 또는 none
+
+REPORT_SPOOL_MAX_BYTES = int(os.getenv('REPORT_SPOOL_MAX_BYTES', str(1024 * 1024)))  # 이보다 큰 리포트는 임시 파일로
+REPORT_CACHE_DIR = os.getenv('REPORT_CACHE_DIR') or None
+COPY_CHUNK_BYTES = 64 * 1024
+
+REPORT_FONT_NAME = 'ReportKorean'
+CID_FALLBACK_FONT = 'HYSMyeongJo-Medium'
+
+# (경로, TTC 글꼴 번호)
+FONT_CANDIDATES = [
+    ('/usr/share/fonts/truetype/nanum/NanumGothic.ttf', 0),
+    ('/usr/share/fonts/nanum/NanumGothic.ttf', 0),
+    ('/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc', 1),  # 1: KR
+    ('/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc', 1),
+    ('C:/Windows/Fonts/malgun.ttf', 0),  # 맑은 고딕
+    ('/System/Library/Fonts/AppleSDGothicNeo.ttc', 0),
+]
+
+_lock = threading.Lock()
+_font_name = None
+_styles = None
+
+
+def _register_ttf(path, index):
+    pdfmetrics.registerFont(TTFont(REPORT_FONT_NAME, path, subfontIndex=index))
+    return REPORT_FONT_NAME
+
+
+def resolve_report_font():
+    """리포트용 한글 폰트를 한 번만 등록하고 폰트 이름 반환"""
+    global _font_name
+    with _lock:
+        if _font_name:
+            return _font_name
+
+        candidates = []
+        if REPORT_FONT_EMBED != 'none':
+            if REPORT_FONT_PATH:
+                candidates.append((REPORT_FONT_PATH, REPORT_FONT_INDEX))
+            candidates.extend(FONT_CANDIDATES)
+
+        for path, index in candidates:
+            if not os.path.exists(path):
+                continue
+            try:
+                _font_name = _register_ttf(path, index)
+                print(f"✅ 리포트 폰트 등록: {path}")
+                return _font_name
+            except Exception as e:
+                print(f"⚠️ 리포트 폰트 로드 실패 ({path}): {e}")
+
+        pdfmetrics.registerFont(UnicodeCIDFont(CID_FALLBACK_FONT))
+        _font_name = CID_FALLBACK_FONT
+        print(f"📝 리포트 폰트: 내장 CID 폰트 {CID_FALLBACK_FONT} 사용")
+        return _font_name
+
+
+def get_report_styles():
+    """제목/소제목/본문 스타일 (처음 호출할 때 한 번만 생성)"""
+    global _styles
+    if _styles is not None:
+        return _styles
+    font_name = resolve_report_font()
+    with _lock:
+        if _styles is None:
+            styles = getSampleStyleSheet()
+            _styles = {
+                'title': ParagraphStyle(
+                    'CustomTitle',
+                    parent=styles['Heading1'],
+                    fontName=font_name,
+                    fontSize=24,
+                    spaceAfter=30,
+                    alignment=TA_CENTER
+                ),
+                'heading': ParagraphStyle(
+                    'CustomHeading',
+                    parent=styles['Heading2'],
+                    fontName=font_name,
+                    fontSize=16,
+                    spaceAfter=12,
+                    spaceBefore=12
+                ),
+                'body': ParagraphStyle(
+                    'CustomBody',
+                    parent=styles['Normal'],
+                    fontName=font_name,
+                    fontSize=11,
+                    leading=16,
+                    spaceAfter=10
+                ),
+            }
+        return _styles
+
+
+def _text(value):
+    """사용자 입력을 Paragraph 마크업에 안전하게 넣을 수 있도록 변환"""
+    return escape(str(value)).replace('\n', '<br/>')
+
+
+def build_report_story(summary_data, quiz_data, wrong_notes_data):
+    """요약 → 퀴즈 → 오답노트 순서의 리포트 내용 생성"""
+    styles = get_report_styles()
+    title_style, heading_style, body_style = styles['title'], styles['heading'], styles['body']
+    story = []
+
+    # 제목
+    story.append(Paragraph("학습 결과 리포트", title_style))
+    story.append(Spacer(1, 0.3*inch))
+
+    # 1. 요약 섹션
+    if summary_data:
+        story.append(Paragraph("요약", heading_style))
+        story.append(Spacer(1, 0.1*inch))
+
+        for section in summary_data.get('sections', []):
+            section_title = section.get('title', '')
+            section_content = section.get('content', '')
+
+            if section_title:
+                story.append(Paragraph(f"<b>{_text(section_title)}</b>", body_style))
+            if section_content:
+                story.append(Paragraph(_text(section_content), body_style))
+            story.append(Spacer(1, 0.15*inch))
+
+    story.append(PageBreak())
+
+    # 2. 퀴즈 섹션
+    if quiz_data:
+        story.append(Paragraph("퀴즈", heading_style))
+        story.append(Spacer(1, 0.1*inch))
+
+        for idx, quiz_item in enumerate(quiz_data, 1):
+            question = quiz_item.get('question', '')
+            user_answer = quiz_item.get('userAnswer', '')
+            correct_answer = quiz_item.get('correctAnswer', '')
+
+            if question:
+                story.append(Paragraph(f"<b>문제 {idx}. {_text(question)}</b>", body_style))
+                story.append(Paragraph(f"내 답: {_text(user_answer)}", body_style))
+                story.append(Paragraph(f"정답: {_text(correct_answer)}", body_style))
+                story.append(Spacer(1, 0.2*inch))
+
+    story.append(PageBreak())
+
+    # 3. 오답노트 섹션
+    if wrong_notes_data:
+        story.append(Paragraph("오답노트", heading_style))
+        story.append(Spacer(1, 0.1*inch))
+
+        wrong_answers = wrong_notes_data.get('wrong_answers', [])
+        if wrong_answers:
+            for idx, item in enumerate(wrong_answers, 1):
+                question_num = item.get('question_number', idx)
+                user_answer = item.get('user_answer', '')
+                correct_answer = item.get('correct_answer', '')
+                explanation = item.get('explanation', '')
+
+                story.append(Paragraph(f"<b>문제 {_text(question_num)}</b>", body_style))
+                story.append(Paragraph(f"내 답: {_text(user_answer)}", body_style))
+                story.append(Paragraph(f"정답: {_text(correct_answer)}", body_style))
+                if explanation:
+                    story.append(Paragraph(f"해설: {_text(explanation)}", body_style))
+                story.append(Spacer(1, 0.2*inch))
+        else:
+            story.append(Paragraph("모든 문제를 맞췄습니다!", body_style))
+
+    return story
+
+
+def render_report(output, summary_data, quiz_data, wrong_notes_data):
+    """리포트 PDF를 output(파일 경로 또는 쓰기 가능한 파일 객체)에 생성"""
+    doc = SimpleDocTemplate(output, pagesize=A4)
+    doc.build(build_report_story(summary_data, quiz_data, wrong_notes_data))
+
+
+def render_report_file(summary_data, quiz_data, wrong_notes_data):
+    """리포트를 임시 파일에 생성하고 (처음 위치로 되감은 파일, 크기) 반환. 파일은 호출한 쪽에서 닫는다"""
+    output = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_MAX_BYTES)
+    try:
+        render_report(output, summary_data, quiz_data, wrong_notes_data)
+        size = output.tell()
+        output.seek(0)
+        return output, size
+    except Exception:
+        output.close()
+        raise
+
+
+def report_cache_path(session_id, version):
+    """세션 리포트 캐시 파일 경로 (REPORT_CACHE_DIR이 없으면 None)"""
+    if not REPORT_CACHE_DIR:
+        return None
+    return os.path.join(REPORT_CACHE_DIR, str(int(session_id)), f'{version}.pdf')
+
+
+def save_report_cache(path, output):
+    """렌더링한 리포트를 캐시에 저장하고 같은 세션의 이전 버전 삭제 (output은 처음 위치로 되감음)"""
+    directory = os.path.dirname(path)
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            shutil.copyfileobj(output, f, COPY_CHUNK_BYTES)
+        os.replace(tmp_path, path)
+        for name in os.listdir(directory):
+            if name.endswith('.pdf') and os.path.join(directory, name) != path:
+                os.remove(os.path.join(directory, name))
+    except OSError as e:
+        print(f"⚠️ 리포트 캐시 저장 실패: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    output.seek(0)
+
+
+def delete_report_cache(session_id):
+    """세션의 리포트 캐시 삭제"""
+    if REPORT_CACHE_DIR:
+        shutil.rmtree(os.path.join(REPORT_CACHE_DIR, str(int(session_id))), ignore_errors=True)
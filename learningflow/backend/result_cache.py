@@ -0,0 +1,125 @@
+"""Gemini 생성 결과 캐시 (문서 해시 기반, LRU + TTL, 선택적 디스크 저장)"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_cache_key(*parts):
+    """텍스트와 생성 파라미터를 묶어 SHA-256 키 생성"""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = str(part).encode('utf-8')
+        # 길이를 함께 넣어 ('ab', 'c')와 ('a', 'bc')가 같은 키가 되지 않도록 함
+        digest.update(len(data).to_bytes(8, 'big'))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """JSON으로 직렬화 가능한 결과를 저장하는 스레드 안전 캐시
+
+    메모리에는 max_entries개까지 LRU로 보관하고, cache_dir가 주어지면
+    디스크에도 같은 개수만큼 저장하여 서버 재시작 후에도 재사용한다.
+    값은 JSON 문자열로 보관하므로 꺼낼 때마다 새 객체가 반환된다.
+    """
+
+    def __init__(self, max_entries=256, ttl_seconds=86400, cache_dir=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()  # key -> (expires_at, json 문자열)
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def _read_disk(self, key):
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('expires_at', 0) < time.time():
+            self._remove_disk(key)
+            return None
+        os.utime(path)  # 최근 사용 시각 갱신 (디스크 LRU 기준)
+        return entry['expires_at'], entry['value']
+
+    def _write_disk(self, key, expires_at, payload):
+        path = self._disk_path(key)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'expires_at': expires_at, 'value': payload}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._evict_disk()
+        except OSError as e:
+            print(f"⚠️ 캐시 디스크 저장 실패: {e}")
+
+    def _remove_disk(self, key):
+        try:
+            os.remove(self._disk_path(key))
+        except OSError:
+            pass
+
+    def _evict_disk(self):
+        entries = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir)
+            if name.endswith('.json')
+        ]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda path: os.path.getmtime(path))
+        for path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def get(self, key):
+        """캐시된 결과 반환 (없거나 만료되었으면 None)"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= now:
+                    self._entries.move_to_end(key)
+                    return json.loads(entry[1])
+                del self._entries[key]
+            if not self.cache_dir:
+                return None
+            entry = self._read_disk(key)
+            if entry is None:
+                return None
+            self._store_memory(key, entry)
+            return json.loads(entry[1])
+
+    def set(self, key, value):
+        """결과 저장"""
+        payload = json.dumps(value, ensure_ascii=False)
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._store_memory(key, (expires_at, payload))
+            if self.cache_dir:
+                self._write_disk(key, expires_at, payload)
+
+    def _store_memory(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.cache_dir:
+                for name in os.listdir(self.cache_dir):
+                    if name.endswith('.json'):
+                        self._remove_disk(name[:-5])
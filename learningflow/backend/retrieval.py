@@ -0,0 +1,157 @@
+"""문서 조각 BM25 검색 인덱스 (채팅 질문에 관련된 부분만 프롬프트에 넣기 위함)"""
+import gzip
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from array import array
+
+from map_reduce import split_into_chunks
+
+INDEX_VERSION = 1
+CHUNK_CHARS = 1000
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+WORD_PATTERN = re.compile(r'\w+')
+HANGUL_PATTERN = re.compile(r'[가-힣]')
+
+
+def tokenize(text):
+    """소문자 단어 토큰 + 한글 단어의 2글자 조각 (조사가 붙은 단어도 매칭되도록)"""
+    tokens = []
+    for word in WORD_PATTERN.findall(text.lower()):
+        tokens.append(word)
+        if len(word) > 2 and HANGUL_PATTERN.search(word):
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class ChunkIndex:
+    """조각 위치와 BM25 역색인을 array로 보관하는 인덱스
+
+    postings는 CSR 형태: 단어 t의 항목은 doc_ids/term_freqs[term_offsets[t]:term_offsets[t + 1]]
+    """
+
+    def __init__(self, vocab, term_offsets, doc_ids, term_freqs, chunk_starts, chunk_ends, doc_lengths):
+        self.vocab = vocab  # 단어 -> 단어 ID
+        self.term_offsets = term_offsets
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        self.chunk_starts = chunk_starts
+        self.chunk_ends = chunk_ends
+        self.doc_lengths = doc_lengths
+        self.avg_length = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0
+
+    @classmethod
+    def build(cls, text, chunk_chars=CHUNK_CHARS):
+        chunk_starts = array('I')
+        chunk_ends = array('I')
+        doc_lengths = array('I')
+        postings = {}  # 단어 -> [(조각 ID, 빈도)]
+
+        position = 0
+        for doc_id, chunk in enumerate(split_into_chunks(text, chunk_chars)):
+            start = text.find(chunk, position)
+            position = start + len(chunk)
+            chunk_starts.append(start)
+            chunk_ends.append(position)
+
+            counts = {}
+            tokens = tokenize(chunk)
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            doc_lengths.append(len(tokens))
+            for token, freq in counts.items():
+                postings.setdefault(token, []).append((doc_id, freq))
+
+        vocab = {}
+        term_offsets = array('I', [0])
+        doc_ids = array('I')
+        term_freqs = array('I')
+        for term_id, (token, entries) in enumerate(postings.items()):
+            vocab[token] = term_id
+            for doc_id, freq in entries:
+                doc_ids.append(doc_id)
+                term_freqs.append(freq)
+            term_offsets.append(len(doc_ids))
+
+        return cls(vocab, term_offsets, doc_ids, term_freqs, chunk_starts, chunk_ends, doc_lengths)
+
+    _ARRAY_FIELDS = ('term_offsets', 'doc_ids', 'term_freqs', 'chunk_starts', 'chunk_ends', 'doc_lengths')
+
+    def save(self, path):
+        meta = {
+            'version': INDEX_VERSION,
+            'itemsize': array('I').itemsize,
+            'vocab': sorted(self.vocab, key=self.vocab.get),
+            'lengths': {name: len(getattr(self, name)) for name in self._ARRAY_FIELDS},
+        }
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+            f.write(json.dumps(meta, ensure_ascii=False).encode('utf-8') + b'\n')
+            for name in self._ARRAY_FIELDS:
+                f.write(getattr(self, name).tobytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """저장된 인덱스 로드 (없거나 형식이 다르면 None)"""
+        try:
+            with gzip.open(path, 'rb') as f:
+                meta = json.loads(f.readline())
+                if meta.get('version') != INDEX_VERSION or meta.get('itemsize') != array('I').itemsize:
+                    return None
+                arrays = {}
+                for name in cls._ARRAY_FIELDS:
+                    values = array('I')
+                    values.frombytes(f.read(meta['lengths'][name] * values.itemsize))
+                    arrays[name] = values
+        except (OSError, ValueError, KeyError):
+            return None
+        vocab = {token: term_id for term_id, token in enumerate(meta['vocab'])}
+        return cls(vocab, **arrays)
+
+    def search(self, query, top_k=5):
+        """질문과 관련도가 높은 조각의 (시작, 끝) 위치를 관련도 순으로 반환"""
+        chunk_count = len(self.doc_lengths)
+        scores = {}
+        for token in set(tokenize(query)):
+            term_id = self.vocab.get(token)
+            if term_id is None:
+                continue
+            start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+            doc_freq = end - start
+            idf = math.log(1 + (chunk_count - doc_freq + 0.5) / (doc_freq + 0.5))
+            for i in range(start, end):
+                doc_id = self.doc_ids[i]
+                freq = self.term_freqs[i]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_id] / (self.avg_length or 1))
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (BM25_K1 + 1) / (freq + norm)
+
+        best = heapq.nlargest(top_k, scores, key=scores.get)
+        return [(self.chunk_starts[doc_id], self.chunk_ends[doc_id]) for doc_id in best]
+
+
+def build_chat_context(text, question, index=None, max_chars=8000, top_k=8):
+    """질문 관련 조각만 모아 채팅 프롬프트용 문맥 생성 (매칭되는 조각이 없으면 문서 앞부분 사용)"""
+    if len(text) <= max_chars:
+        return text
+    index = index or ChunkIndex.build(text)
+    spans = index.search(question, top_k)
+    if not spans:
+        return text[:max_chars]
+
+    # 관련도 순으로 max_chars까지 고른 뒤, 읽기 쉽게 문서 순서로 정렬
+    selected = []
+    used = 0
+    for start, end in spans:
+        if used + (end - start) > max_chars:
+            continue
+        selected.append((start, end))
+        used += end - start
+    if not selected:
+        return text[:max_chars]
+    return '\n...\n'.join(text[start:end].strip() for start, end in sorted(selected))
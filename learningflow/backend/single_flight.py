@@ -0,0 +1,131 @@
+"""진행 중인 동일 요청 합치기 (single-flight)
+
+같은 키의 작업이 이미 실행 중이면 새로 실행하지 않고, 먼저 시작한 작업이 끝나기를 기다려 결과를 함께 받는다.
+결과 캐시는 끝난 작업만 재사용하므로, 같은 문서가 거의 동시에 여러 번 업로드되면 캐시만으로는 중복 호출을 막지 못한다.
+
+SINGLE_FLIGHT_DIR을 지정하면 잠금 파일(fcntl.flock)로 워커 프로세스 사이에서도 같은 키를 한 번만 실행한다.
+다른 프로세스가 만든 결과는 lookup(결과 캐시 조회)으로 받으므로 GEMINI_CACHE_DIR도 함께 지정해야 한다.
+잠금 파일은 키의 해시로 SINGLE_FLIGHT_LOCKS개 중 하나를 골라 쓰므로 파일 수가 늘어나지 않는다.
+잠금은 기다리지 않는 방식(LOCK_NB)으로 시도하며, 호출자가 준 시간(timeout) 안에 얻지 못하면
+(다른 키가 같은 잠금 파일을 쓰는 경우 포함) 합치지 않고 직접 실행한다. 기다리는 동안에도 결과 캐시를 확인한다.
+fcntl이 없는 환경(Windows)에서는 프로세스 안에서만 합친다.
+"""
+import copy
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+SINGLE_FLIGHT_DIR = os.getenv('SINGLE_FLIGHT_DIR') or None  # 워커 간 잠금 파일 디렉토리
+SINGLE_FLIGHT_LOCKS = int(os.getenv('SINGLE_FLIGHT_LOCKS', '4096'))
+SINGLE_FLIGHT_TIMEOUT = float(os.getenv('SINGLE_FLIGHT_TIMEOUT', '120'))  # 다른 워커의 잠금을 기다리는 최대 시간(초)
+LOCK_POLL_MIN = 0.05
+LOCK_POLL_MAX = 0.5
+
+
+class SingleFlight:
+    """키별로 실행 중인 작업을 하나만 유지하는 실행기 (스레드 안전)"""
+
+    def __init__(self, name, lock_dir=SINGLE_FLIGHT_DIR, lock_count=SINGLE_FLIGHT_LOCKS):
+        self.name = name
+        self.lock_dir = os.path.join(lock_dir, name) if lock_dir and fcntl else None
+        self.lock_count = max(1, lock_count)
+        self._calls = {}  # key -> Future
+        self._lock = threading.Lock()
+        self._stats = {'leaders': 0, 'followers': 0, 'shared_across_workers': 0, 'lock_timeouts': 0}
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+
+    def do(self, key, func, lookup=None, timeout=None):
+        """key의 작업을 한 번만 실행하고 결과 반환 (같은 키가 실행 중이면 그 결과를 기다림)
+
+        func가 예외를 던지면 기다리던 호출에도 같은 예외를 전달한다.
+        lookup은 이미 끝난 결과(다른 프로세스가 만든 결과 포함)를 찾는 함수이며, 없으면 None을 반환해야 한다.
+        기다린 호출은 결과의 복사본을 받으므로 결과를 수정해도 서로 영향을 주지 않는다.
+        timeout은 다른 워커의 잠금을 기다리는 최대 시간(초, 기본 SINGLE_FLIGHT_TIMEOUT)으로, 보통 호출의 시간 예산을 넘긴다.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self._stats['leaders'] += 1
+            else:
+                self._stats['followers'] += 1
+
+        if not leader:
+            print(f"🔗 진행 중인 동일 요청 결과 대기 [{self.name}/{key[:12]}]")
+            return copy.deepcopy(future.result())
+
+        try:
+            result = self._run(key, func, lookup, SINGLE_FLIGHT_TIMEOUT if timeout is None else timeout)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            # 호출한 쪽이 결과를 수정해도 기다리던 호출에 섞이지 않도록, 보관하는 결과는 반환 전에 떼어 둔 복사본
+            future.set_result(copy.deepcopy(result))
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def _run(self, key, func, lookup, timeout):
+        """(다른 프로세스가 같은 키를 실행 중이면 끝날 때까지 기다린 뒤) 끝난 결과가 없을 때만 func 실행
+
+        timeout 안에 잠금을 얻지 못하면 합치지 않고 func를 직접 실행한다.
+        """
+        if self.lock_dir is None:
+            return self._lookup_or_call(func, lookup)
+        stripe = zlib.crc32(key.encode('utf-8')) % self.lock_count
+        with open(os.path.join(self.lock_dir, f'{stripe}.lock'), 'a') as lock_file:
+            deadline = time.monotonic() + max(0.0, timeout)
+            delay = LOCK_POLL_MIN
+            while True:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    pass
+                # 잠금을 가진 워커가 결과를 저장했으면 잠금이 풀리기를 기다리지 않고 사용
+                result = lookup() if lookup is not None else None
+                if result is not None:
+                    with self._lock:
+                        self._stats['shared_across_workers'] += 1
+                    return result
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    with self._lock:
+                        self._stats['lock_timeouts'] += 1
+                    print(f"⏱️ 다른 워커의 잠금 대기 시간 초과, 합치지 않고 실행 [{self.name}/{key[:12]}]")
+                    return func()
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, LOCK_POLL_MAX)
+            try:
+                return self._lookup_or_call(func, lookup, shared=True)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _lookup_or_call(self, func, lookup, shared=False):
+        # 캐시를 확인한 뒤 이 함수에 들어오기 전에 다른 스레드/프로세스가 결과를 저장했을 수 있음
+        result = lookup() if lookup is not None else None
+        if result is not None:
+            if shared:
+                with self._lock:
+                    self._stats['shared_across_workers'] += 1
+            return result
+        return func()
+
+    def stats(self):
+        """합쳐진 요청 수 (leaders: 직접 실행, followers: 실행 중인 결과를 기다림, lock_timeouts: 잠금 대기 초과로 직접 실행)와 실행 중인 키 수"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls)
+        return stats
@@ -0,0 +1,78 @@
+"""문서별 추출 텍스트 저장소 (gzip 압축 사이드카 파일)
+
+키는 업로드 파일의 내용 해시(blob_store)이며, 해시가 없는 이전 세션은 세션 ID를 키로 사용한다.
+PDF 페이지별 추출 텍스트는 페이지 내용 해시(pdf_extract.page_fingerprint)를 키로 PAGE_FOLDER에 따로 보관한다.
+페이지 텍스트는 여러 문서가 공유하는 캐시이므로 언제 지워도 다시 추출된다.
+"""
+import gzip
+import os
+import threading
+
+TEXT_FOLDER = os.getenv('TEXT_STORE_FOLDER', 'texts')
+PAGE_FOLDER = os.path.join(TEXT_FOLDER, 'pages')
+
+os.makedirs(PAGE_FOLDER, exist_ok=True)
+
+
+def _key(key):
+    key = str(key)
+    if not key.isalnum():
+        raise ValueError(f'잘못된 텍스트 키: {key}')
+    return key
+
+
+def _text_path(key):
+    return os.path.join(TEXT_FOLDER, f'{_key(key)}.txt.gz')
+
+
+def index_path(key):
+    """문서의 채팅 검색 인덱스 파일 경로"""
+    return os.path.join(TEXT_FOLDER, f'{_key(key)}.idx.gz')
+
+
+def _page_path(page_hash):
+    return os.path.join(PAGE_FOLDER, f'{_key(page_hash)}.txt.gz')
+
+
+def _write(path, text):
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _read(path):
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def save_text(key, text):
+    """문서의 추출 텍스트를 압축 저장"""
+    _write(_text_path(key), text)
+
+
+def load_text(key):
+    """문서의 추출 텍스트 반환 (없으면 None)"""
+    return _read(_text_path(key))
+
+
+def save_page_text(page_hash, text):
+    """PDF 페이지 하나의 추출 텍스트 저장"""
+    _write(_page_path(page_hash), text)
+
+
+def load_page_text(page_hash):
+    """PDF 페이지 하나의 추출 텍스트 반환 (없으면 None)"""
+    return _read(_page_path(page_hash))
+
+
+def delete_text(key):
+    """문서의 추출 텍스트와 검색 인덱스 삭제"""
+    for path in (_text_path(key), index_path(key)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
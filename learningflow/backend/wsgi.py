@@ -0,0 +1,8 @@
+"""운영 서버 진입점
+
+명령: gunicorn -c gunicorn.conf.py wsgi:app
+테이블은 만들지 않으므로 새 데이터베이스에서는 먼저 python init_db.py를 실행한다.
+"""
+from app import create_app
+
+app = create_app()
@@ -22,3 +22,57 @@ apiClient.interceptors.request.use(
 );
 
 export default apiClient;
+
+// 업로드 처리 작업이 끝날 때까지 /jobs/<id>를 폴링하여 결과 반환
+export const waitForJob = async <T = any>(jobId: string, intervalMs = 1000): Promise<T> => {
+  for (;;) {
+    const { data } = await apiClient.get(`/jobs/${jobId}`);
+    if (data.status === 'done') {
+      return data.result as T;
+    }
+    if (data.status === 'failed') {
+      throw new Error(data.error || '파일 처리 중 오류가 발생했습니다.');
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+};
+
+// SSE(text/event-stream) 응답을 보내는 POST 엔드포인트 호출. 이벤트가 도착할 때마다 onEvent 호출
+export const postEventStream = async (
+  path: string,
+  body: unknown,
+  onEvent: (event: string, data: any) => void
+): Promise<void> => {
+  const token = localStorage.getItem('access_token');
+  const response = await fetch(`${apiClient.defaults.baseURL}${path}`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    body: JSON.stringify(body),
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`요청 실패 (${response.status})`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const messages = buffer.split('\n\n');
+    buffer = messages.pop() || '';
+    for (const message of messages) {
+      let event = 'message';
+      let data = '';
+      for (const line of message.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  }
+};
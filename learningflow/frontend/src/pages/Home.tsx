@@ -1,7 +1,7 @@
 import { useState, useRef, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { motion, AnimatePresence, Variants } from 'framer-motion';
-import apiClient from '../api/index';
+import apiClient, { waitForJob } from '../api/index';
 import { isAxiosError } from 'axios';
 
 const ALLOWED_FILE_TYPES = '.pdf,.txt';
@@ -113,25 +113,29 @@ const Home = () => {
     formData.append('category', category); // 카테고리 추가
 
     try {
-      const response = await apiClient.post<SummaryResult>('/upload', formData, {
+      const response = await apiClient.post('/upload', formData, {
         headers: {
           'Content-Type': 'multipart/form-data',
         },
       });
-      const sessionId = (response.data as any).sessionId;
+      // 서버는 작업 ID를 바로 반환하고, 요약 결과는 작업이 끝난 뒤 조회
+      const summaryResult = await waitForJob<SummaryResult>(response.data.jobId);
+      const sessionId = (summaryResult as any).sessionId;
       if (sessionId) {
         localStorage.setItem('learningflow_session_id', String(sessionId));
       }
       localStorage.removeItem('learningflow_wrong_notes');
-      localStorage.setItem('learningflow_summary', JSON.stringify(response.data));
-      localStorage.setItem('learningflow_custom_filename', fileName.trim() || response.data?.pdfUrl || '');
+      localStorage.setItem('learningflow_summary', JSON.stringify(summaryResult));
+      localStorage.setItem('learningflow_custom_filename', fileName.trim() || (summaryResult as any).pdfUrl || '');
       
       // 요약 페이지로 결과와 함께 이동
-      navigate('/summary', { state: { summaryResult: response.data } });
+      navigate('/summary', { state: { summaryResult } });
 
     } catch (err: unknown) {
       if (isAxiosError(err) && err.response) {
         setError(err.response.data.message || '파일 처리 중 서버에서 오류가 발생했습니다.');
+      } else if (err instanceof Error && !isAxiosError(err)) {
+        setError(err.message);
       } else {
         setError('파일 업로드 또는 요약 생성에 실패했습니다. 네트워크 연결을 확인해주세요.');
       }
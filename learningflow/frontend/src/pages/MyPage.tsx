@@ -20,6 +20,8 @@ interface UploadedFile {
 const MyPage = () => {
   const [user, setUser] = useState<any>(null);
   const [uploadedFiles, setUploadedFiles] = useState<UploadedFile[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [selectedSession, setSelectedSession] = useState<UploadedFile | null>(null);
   const [showDetailModal, setShowDetailModal] = useState(false);
@@ -38,7 +40,8 @@ const MyPage = () => {
         
         try {
           const response = await apiClient.get('/mypage/files');
-          setUploadedFiles(response.data);
+          setUploadedFiles(response.data.items);
+          setNextCursor(response.data.next_cursor);
         } catch (error) {
           console.error('파일 목록 로드 실패:', error);
         }
@@ -55,6 +58,26 @@ const MyPage = () => {
     };
   }, [navigate]);
 
+  const handleLoadMore = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const response = await apiClient.get('/mypage/files', { params: { cursor: nextCursor } });
+      setUploadedFiles(prev => [...prev, ...response.data.items]);
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      console.error('파일 목록 로드 실패:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // 목록에는 요약/퀴즈/오답 데이터가 없으므로 필요할 때 상세 정보를 불러옴
+  const loadFileDetail = async (file: UploadedFile): Promise<UploadedFile> => {
+    const response = await apiClient.get(`/mypage/files/${file.id}`);
+    return { ...file, ...response.data };
+  };
+
   const handleDeleteFile = async (fileId: number) => {
     if (!confirm('정말 이 파일을 삭제하시겠습니까?')) {
       return;
@@ -80,8 +103,14 @@ const MyPage = () => {
     }
   };
 
-  const openDetailModal = (file: UploadedFile) => {
-    setSelectedSession(file);
+  const openDetailModal = async (file: UploadedFile) => {
+    try {
+      setSelectedSession(await loadFileDetail(file));
+    } catch (error) {
+      console.error('저장 내용 로드 실패:', error);
+      alert('저장 내용을 불러오지 못했습니다.');
+      return;
+    }
     setCurrentPage('summary');
     setShowDetailModal(true);
     document.body.style.overflow = 'hidden';
@@ -95,7 +124,7 @@ const MyPage = () => {
   };
 
   const hasDetail = (file: UploadedFile) => {
-    return !!(file.summary_data || file.quiz_data || file.wrong_notes_data);
+    return !!(file.is_saved || file.summary_data || file.quiz_data || file.wrong_notes_data);
   };
 
   const handleDownloadPdf = async () => {
@@ -112,6 +141,7 @@ const MyPage = () => {
       console.log('Wrong Notes:', wrongNotes);
 
       const response = await apiClient.post('/pdf', {
+        session_id: selectedSession.id,
         summary: summary,
         keywords: summary?.keywords || [],
         quiz_results: quiz?.quizzes?.map((q: any) => ({
@@ -142,9 +172,10 @@ const MyPage = () => {
     }
   };
 
-  const handleDownloadPdfFromList = async (file: UploadedFile) => {
+  const handleDownloadPdfFromList = async (listedFile: UploadedFile) => {
     setDownloadingPdf(true);
     try {
+      const file = await loadFileDetail(listedFile);
       const summary = parseJSONSafe(file.summary_data);
       const quiz = parseJSONSafe(file.quiz_data);
       const wrongNotes = parseJSONSafe(file.wrong_notes_data);
@@ -154,6 +185,7 @@ const MyPage = () => {
       console.log('Wrong Notes:', wrongNotes);
 
       const response = await apiClient.post('/pdf', {
+        session_id: file.id,
         summary: summary,
         keywords: summary?.keywords || [],
         quiz_results: quiz?.quizzes?.map((q: any) => ({
@@ -289,6 +321,15 @@ const MyPage = () => {
                       </div>
                     </motion.div>
                   ))}
+                  {nextCursor && (
+                    <button
+                      onClick={handleLoadMore}
+                      disabled={loadingMore}
+                      className="w-full py-3 rounded-xl bg-gray-100 dark:bg-gray-700 text-gray-700 dark:text-gray-200 hover:bg-gray-200 dark:hover:bg-gray-600 transition-colors text-sm font-medium"
+                    >
+                      {loadingMore ? '불러오는 중...' : '더 보기'}
+                    </button>
+                  )}
                 </div>
               )}
             </div>
@@ -1,12 +1,13 @@
 import { useState, useRef, useEffect } from 'react';
 import { useNavigate, useLocation } from 'react-router-dom';
-import apiClient from '../api';
+import apiClient, { waitForJob } from '../api';
 import { DocumentTextIcon, ArrowDownTrayIcon, ArrowLeftIcon, ArrowUpTrayIcon, ChatBubbleLeftRightIcon, PaperAirplaneIcon } from '@heroicons/react/24/outline';
 
 const PDFView = () => {
     const [loading, setLoading] = useState(false);
     const [uploadedPdfUrl, setUploadedPdfUrl] = useState('');
     const [uploadedPdfText, setUploadedPdfText] = useState('');
+    const [uploadedSessionId, setUploadedSessionId] = useState<number | null>(null);
     const [chatMessages, setChatMessages] = useState<Array<{role: 'user' | 'assistant', content: string, showQuizPrompt?: boolean, quizGenerated?: boolean}>>([]);
     const [chatInput, setChatInput] = useState('');
     const [isChatLoading, setIsChatLoading] = useState(false);
@@ -21,6 +22,9 @@ const PDFView = () => {
     const location = useLocation();
     const pdfUrl = location.state?.pdfUrl || uploadedPdfUrl || '';
     const pdfText = location.state?.pdfText || uploadedPdfText || '';
+    const sessionId = location.state?.sessionId || uploadedSessionId;
+    // 로그인 세션이 있으면 서버에 저장된 문서를 세션 ID로 참조
+    const documentRef = sessionId ? { session_id: sessionId } : { pdfText: pdfText };
 
     useEffect(() => {
         if (chatEndRef.current) {
@@ -99,14 +103,16 @@ const PDFView = () => {
             });
 
             console.log('✅ 업로드 응답:', response.data);
+            const result = await waitForJob(response.data.jobId);
 
             // 업로드 성공 후 PDF URL과 텍스트 저장
-            if (response.data.pdfUrl) {
-                setUploadedPdfUrl(`http://localhost:8000${response.data.pdfUrl}`);
+            if (result.pdfUrl) {
+                setUploadedPdfUrl(`http://localhost:8000${result.pdfUrl}`);
             }
-            if (response.data.pdfText) {
-                setUploadedPdfText(response.data.pdfText);
+            if (result.pdfText) {
+                setUploadedPdfText(result.pdfText);
             }
+            setUploadedSessionId(result.sessionId || null);
             
             setShowSuccessModal(true);
             setTimeout(() => setShowSuccessModal(false), 2000);
@@ -174,7 +180,7 @@ const PDFView = () => {
         try {
             const response = await apiClient.post('/chat', { 
                 question: userMessage,
-                pdfText: pdfText
+                ...documentRef
             });
             
             setChatMessages(prev => [...prev, { 
@@ -203,7 +209,7 @@ const PDFView = () => {
         try {
             const response = await apiClient.post('/chat', {
                 question: `다음 내용을 바탕으로 2개의 퀴즈 문제를 만들어주세요. 각 문제는 객관식 4지선다로 만들어주세요:\n\n${message.content}`,
-                pdfText: pdfText
+                ...documentRef
             });
 
             // 퀴즈 생성됨으로 표시
@@ -28,8 +28,11 @@ const QuizSelect = () => {
     setLoading(true);
     try {
       // 선택한 개수로 퀴즈 재생성 요청
+      // 로그인 세션이 있으면 서버에 저장된 문서를 세션 ID로 참조
       const response = await apiClient.post('/generate-quiz', {
-        text: summaryResult.summary,
+        ...(summaryResult.sessionId
+          ? { session_id: summaryResult.sessionId }
+          : { text: summaryResult.pdfText || '' }),
         quiz_count: count,
         quiz_type: selectedType
       });
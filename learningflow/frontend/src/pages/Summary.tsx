@@ -1,7 +1,7 @@
 import { useLocation, useNavigate } from 'react-router-dom';
 import { useEffect, useState, useMemo, useRef } from 'react';
 import { DocumentTextIcon, LightBulbIcon, ArrowRightIcon, QuestionMarkCircleIcon, ChatBubbleLeftRightIcon, XMarkIcon, PaperAirplaneIcon } from '@heroicons/react/24/outline';
-import axios from 'axios';
+import { postEventStream } from '../api';
 
 const Summary = () => {
   const location = useLocation();
@@ -15,6 +15,7 @@ const Summary = () => {
   const [expandedQuestion, setExpandedQuestion] = useState<number | null>(null);
   const [pdfUrl, setPdfUrl] = useState<string | null>(null);
   const [pdfText, setPdfText] = useState<string>('');
+  const [sessionId, setSessionId] = useState<number | null>(null);
   const [translatedText, setTranslatedText] = useState<string | null>(null);
   
   // 챗봇 상태
@@ -34,6 +35,7 @@ const Summary = () => {
       setExpectedQuestions(summaryResult.expectedQuestions || []);
       setPdfUrl(summaryResult.pdfUrl || null);
       setPdfText(summaryResult.pdfText || '');
+      setSessionId(summaryResult.sessionId || null);
       setTranslatedText(summaryResult.translatedText || null);
       setIsPageLoading(false);
     } else {
@@ -57,15 +59,31 @@ const Summary = () => {
     setIsChatLoading(true);
 
     try {
-      const response = await axios.post('http://localhost:8000/chat', {
-        question: userMessage,
-        pdfText: pdfText
-      });
+      // 로그인 세션이 있으면 서버에 저장된 문서를 세션 ID로 참조
+      const body = sessionId
+        ? { question: userMessage, session_id: sessionId }
+        : { question: userMessage, pdfText: pdfText };
 
-      setChatMessages(prev => [...prev, { 
-        role: 'assistant', 
-        content: response.data.answer 
-      }]);
+      // 답변은 SSE로 생성되는 대로 이어 붙여 표시
+      let started = false;
+      await postEventStream('/chat/stream', body, (event, data) => {
+        if (event === 'error') {
+          throw new Error(data.message);
+        }
+        if (event !== 'message') return;
+        if (!started) {
+          started = true;
+          setIsChatLoading(false);
+          setChatMessages(prev => [...prev, { role: 'assistant', content: data.text }]);
+          return;
+        }
+        setChatMessages(prev => {
+          const next = [...prev];
+          const last = next[next.length - 1];
+          next[next.length - 1] = { ...last, content: last.content + data.text };
+          return next;
+        });
+      });
     } catch (error) {
       console.error('채팅 오류:', error);
       setChatMessages(prev => [...prev, { 